@@ -0,0 +1,118 @@
+# admin.py - Operator page: per-stage latency, caches, scheduler, recent traces and profiles
+
+import hmac
+
+import streamlit as st
+import config
+import profiling
+import tracing
+from qa_engine import get_engine, is_ready, start_warmup
+
+# Pipeline order, so the table reads like a request's life
+STAGES = ["transcription_queue", "transcription", "history_lookup", "cache_lookup", "embedding",
+          "retrieval", "prompt", "queue", "generation", "coalesced", "ttft", "render", "total"]
+
+def app():
+    st.title("🛠️ Legal Ease Admin")
+    if not authorized():
+        st.stop()
+    # Also starts the /metrics endpoint for this server process
+    start_warmup()
+    if config.METRICS_PORT:
+        st.caption(f"Prometheus metrics: http://{config.METRICS_HOST}:{config.METRICS_PORT}/metrics")
+    st.button("Refresh")
+
+    show_stage_latency()
+    show_engine_stats()
+    show_recent_traces()
+    show_profiling()
+
+def authorized():
+    """True once this session has entered the admin password"""
+    if not config.ADMIN_PASSWORD:
+        st.error("The admin page is disabled. Set LEGAL_EASE_ADMIN_PASSWORD to enable it.")
+        return False
+    if st.session_state.get("admin_authorized"):
+        return True
+    password = st.text_input("Admin password", type="password")
+    if not password:
+        return False
+    if not hmac.compare_digest(password.encode(), config.ADMIN_PASSWORD.encode()):
+        st.error("Wrong password.")
+        return False
+    st.session_state.admin_authorized = True
+    return True
+
+def show_stage_latency():
+    """Table of p50/p95/p99 per stage across every traced question"""
+    st.markdown("### Stage Latency")
+    summary = tracing.tracer.summary()
+    if not summary:
+        st.info("No questions answered yet.")
+        return
+    order = {stage: i for i, stage in enumerate(STAGES)}
+    rows = [
+        {"stage": stage, "count": s["count"], "p50 ms": round(s["p50"] * 1000, 1),
+         "p95 ms": round(s["p95"] * 1000, 1), "p99 ms": round(s["p99"] * 1000, 1)}
+        for stage, s in sorted(summary.items(), key=lambda item: order.get(item[0], len(order)))
+    ]
+    st.dataframe(rows, hide_index=True)
+
+def show_engine_stats():
+    """Cache, coalescing, embedding and scheduler counters of the shared engine"""
+    st.markdown("### Engine")
+    if not is_ready():
+        st.info("⏳ The QA engine is still loading.")
+        return
+    engine = get_engine()
+    components = {"Answer cache": engine.answer_cache, "Semantic cache": engine.semantic_cache,
+                  "Embeddings": engine.embeddings, "LLM scheduler": engine.scheduler}
+    columns = st.columns(3)
+    columns[0].markdown("**In-flight coalescing**")
+    columns[0].json(engine.flights.stats())
+    for i, (name, component) in enumerate(components.items(), 1):
+        if hasattr(component, "stats"):
+            with columns[i % 3]:
+                st.markdown(f"**{name}**")
+                st.json(component.stats())
+    with st.expander("Engine latency (seconds)"):
+        st.json(engine.latency_summary())
+
+def show_recent_traces():
+    """Latest traces with their spans"""
+    st.markdown("### Recent Questions")
+    traces = list(tracing.tracer.recent)[::-1]
+    if not traces:
+        st.info("No traces yet.")
+        return
+    rows = [
+        {"trace": t.id, "page": t.page, "view": t.attrs.get("view") or t.attrs.get("input", ""),
+         "question": t.attrs.get("question", "")[:80], "cache": t.attrs.get("cache", ""),
+         "k": t.attrs.get("k"), "prompt tokens": t.attrs.get("prompt_tokens"),
+         "total ms": round((t.seconds or 0) * 1000, 1)}
+        for t in traces
+    ]
+    st.dataframe(rows, hide_index=True)
+    selected = st.selectbox("Inspect trace", [t.id for t in traces])
+    trace = next(t for t in traces if t.id == selected)
+    st.json(trace.to_dict())
+    with st.expander("Prometheus text"):
+        st.code(tracing.tracer.prometheus(), language="text")
+
+def show_profiling():
+    """Arm the per-run profiler and download the speedscope files it saved"""
+    st.markdown("### Profiling")
+    st.caption(f"Add ?{config.PROFILE_QUERY_PARAM}=1 to a chat or explorer URL to profile that run, "
+               "or profile whichever runs come next. Open the files at https://www.speedscope.app")
+    runs = st.number_input("Page runs to profile", min_value=1, max_value=50, value=5)
+    if st.button("Profile next runs"):
+        profiling.arm(runs)
+    if profiling.armed():
+        st.info(f"🔬 Profiling the next {profiling.armed()} page runs.")
+    for profile in profiling.list_profiles()[:10]:
+        with open(profile["path"], "rb") as f:
+            st.download_button(f"{profile['name']} ({profile['bytes'] // 1024} KB)", f.read(),
+                               file_name=profile["name"], mime="application/json", key=profile["name"])
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,194 @@
+# amendment_index.py - Which amendments changed which articles, Parts and Schedules
+#
+# Built by ingest.py next to the article index (amendments.json) from the
+# editorial footnotes of the Constitution text, e.g.
+#   "1. Ins. by the Constitution (Eighty-sixth Amendment) Act, 2002, s. 2."
+# Each footnote is attributed to the article, Part, Schedule or Preamble whose
+# text carries its marker ("1[21A. Right to education", "2***"), since a page's
+# footnotes are printed after whichever article ends the page; a footnote whose
+# marker was not found goes to the provision it follows. Both directions are
+# stored: amendment -> changes, and article / Part / Schedule -> amendments, so
+# either lookup is one dict access.
+
+import json
+import os
+import re
+import threading
+
+import config
+from article_index import article_documents, normalize_article_id
+
+_ORDINALS = {
+    "first": 1, "second": 2, "third": 3, "fourth": 4, "fifth": 5, "sixth": 6, "seventh": 7,
+    "eighth": 8, "ninth": 9, "tenth": 10, "eleventh": 11, "twelfth": 12, "thirteenth": 13,
+    "fourteenth": 14, "fifteenth": 15, "sixteenth": 16, "seventeenth": 17, "eighteenth": 18,
+    "nineteenth": 19, "twentieth": 20, "thirtieth": 30, "fortieth": 40, "fiftieth": 50,
+    "sixtieth": 60, "seventieth": 70, "eightieth": 80, "ninetieth": 90, "hundredth": 100,
+}
+_TENS = {"twenty": 20, "thirty": 30, "forty": 40, "fifty": 50, "sixty": 60, "seventy": 70,
+         "eighty": 80, "ninety": 90}
+
+_FOOTNOTE = re.compile(r"^(?:\d+\.\s*)?(?:Ins|Subs|Omitted|Added|Rep|Renumbered|The words|Cl)\b", re.IGNORECASE)
+# The action word nearest before each "Constitution (... Amendment) Act, YEAR"
+_CHANGE = re.compile(r"\b(ins|subs|omitted|added|rep|renumbered)\w*\.?[^()]*?"
+                     r"Constitution\s*\(\s*([A-Za-z0-9\- ]+?)\s+Amendment\s*\)\s*Act,?\s*(\d{4})?",
+                     re.IGNORECASE)
+# A footnote marker in the text: the footnote number before "[" or "***"
+_MARKER = re.compile(r"(?<![\d.])(\d{1,3})\s*(?=\[|\*{3})")
+_FOOTNOTE_NUMBER = re.compile(r"\s*(\d+)\.")
+_ACTIONS = {"ins": "inserted", "added": "inserted", "subs": "substituted", "omitted": "omitted",
+            "rep": "omitted", "renumbered": "renumbered"}
+
+def amendment_number(name):
+    """Return 86 for 'Eighty-sixth', 101 for 'One Hundred and First', or None"""
+    digits = re.match(r"\s*(\d+)", name)
+    if digits:
+        return int(digits.group(1))
+    total = 0
+    for word in re.findall(r"[a-z]+", name.lower()):
+        if word in ("and", "one"):
+            continue
+        if word == "hundred":
+            total += 100
+        elif word in _ORDINALS:
+            total += _ORDINALS[word]
+        elif word in _TENS:
+            total += _TENS[word]
+        else:
+            return None
+    return total or None
+
+def parse_footnote(line):
+    """Return [(amendment, year, action)] for an amendment footnote line"""
+    if not _FOOTNOTE.match(line.strip()):
+        return []
+    changes = []
+    for match in _CHANGE.finditer(line):
+        number = amendment_number(match.group(2))
+        if number:
+            year = int(match.group(3)) if match.group(3) else None
+            changes.append((number, year, _ACTIONS[match.group(1).lower()]))
+    return changes
+
+def _target(metadata):
+    if metadata.get("article"):
+        return "article", metadata["article"]
+    if metadata.get("schedule"):
+        return "schedule", metadata["schedule"]
+    if metadata.get("part"):
+        return "part", metadata["part"]
+    return "preamble", "Preamble"
+
+class AmendmentIndex:
+    """Amendment -> changed provisions, and provision -> amendments"""
+
+    def __init__(self, amendments, targets):
+        self.amendments = amendments
+        self.targets = targets
+
+    @classmethod
+    def from_chunks(cls, chunks):
+        """Collect the amendment footnotes of ingested chunks ({'text', 'metadata'})"""
+        amendments, targets = {}, {}
+        # Footnote number -> the provision whose text carried its marker; numbering restarts each page
+        markers = {}
+        for chunk in chunks:
+            here = _target(chunk["metadata"]) + (chunk["metadata"].get("part", ""),)
+            for line in chunk["text"].splitlines():
+                footnote = parse_footnote(line)
+                if not footnote:
+                    for marker in _MARKER.findall(line):
+                        markers[marker] = here
+                    continue
+                label = _FOOTNOTE_NUMBER.match(line)
+                kind, target, part = markers.pop(label.group(1), here) if label else here
+                for number, year, action in footnote:
+                    entry = amendments.setdefault(str(number), {"year": year, "changes": []})
+                    entry["year"] = entry["year"] or year
+                    change = {"kind": kind, "id": target, "part": part, "action": action}
+                    if change not in entry["changes"]:
+                        entry["changes"].append(change)
+                    record = {"amendment": number, "year": year, "action": action}
+                    keys = [f"{kind}:{target}"]
+                    if kind == "article" and part:
+                        # Part-level history includes the changes to its articles
+                        keys.append(f"part:{part}")
+                    for key in keys:
+                        history = targets.setdefault(key, [])
+                        item = dict(record, article=target) if key.startswith("part:") and kind == "article" else record
+                        if item not in history:
+                            history.append(item)
+        for history in targets.values():
+            history.sort(key=lambda item: item["amendment"])
+        return cls(dict(sorted(amendments.items(), key=lambda item: int(item[0]))), targets)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["amendments"], data["targets"])
+
+    def save(self, path):
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"amendments": self.amendments, "targets": self.targets}, f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    def __len__(self):
+        return len(self.amendments)
+
+    def year(self, number):
+        entry = self.amendments.get(str(number))
+        return entry["year"] if entry else None
+
+    def changes(self, number):
+        """Provisions changed by an amendment: [{'kind', 'id', 'part', 'action'}]"""
+        entry = self.amendments.get(str(number))
+        return entry["changes"] if entry else []
+
+    def changed_articles(self, number):
+        return list(dict.fromkeys(c["id"] for c in self.changes(number) if c["kind"] == "article"))
+
+    def article_history(self, article_id):
+        """Amendments that changed an article: [{'amendment', 'year', 'action'}]"""
+        return self.targets.get(f"article:{normalize_article_id(article_id)}", [])
+
+    def part_history(self, part):
+        """Amendments that changed a Part or any of its articles"""
+        return self.targets.get(f"part:{part}", [])
+
+    def schedule_history(self, schedule):
+        return self.targets.get(f"schedule:{schedule}", [])
+
+def load_amendment_index(path):
+    """Load the amendment index if ingestion has produced one"""
+    return AmendmentIndex.load(path) if os.path.exists(path) else None
+
+# ------------------ Process-wide Instance ------------------
+_shared = None
+_shared_lock = threading.Lock()
+
+def get_amendment_index():
+    """Return the process-wide amendment index, or None until ingestion has produced one"""
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                from local_index import version_file
+
+                _shared = load_amendment_index(version_file(config.LOCAL_INDEX_DIR, config.AMENDMENT_INDEX_FILE))
+    return _shared
+
+def reload_amendment_index():
+    """Drop the process-wide amendment index so the next access reads the re-ingested one"""
+    global _shared
+    with _shared_lock:
+        _shared = None
+
+def amendment_documents(number):
+    """Source chunks of the articles an amendment changed, or None to fall back to vector search"""
+    index = get_amendment_index()
+    articles = index.changed_articles(number) if index else []
+    if not articles or len(articles) > config.AMENDMENT_CONTEXT_ARTICLES:
+        return None
+    return article_documents(*articles)
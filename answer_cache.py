@@ -0,0 +1,129 @@
+# answer_cache.py - Persistent exact-match answer cache shared by all sessions
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    key TEXT PRIMARY KEY,
+    profile TEXT NOT NULL,
+    prompt TEXT NOT NULL,
+    model TEXT NOT NULL,
+    index_version TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    sources TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS answers_last_access ON answers (last_access);
+CREATE INDEX IF NOT EXISTS answers_index_version ON answers (index_version);
+"""
+
+def normalize_prompt(text):
+    """Lower-case and collapse whitespace so trivially different prompts share a key"""
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+def cache_key(profile, prompt, model, index_version, grounding=None):
+    """Key an answer by prompt profile, normalized prompt, model name and index version
+
+    `grounding` is a digest of the documents an answer was generated from when
+    they were given explicitly (e.g. an article's own text) instead of retrieved.
+    """
+    parts = [profile, normalize_prompt(prompt), model, index_version]
+    if grounding:
+        parts.append(grounding)
+    return hashlib.sha1("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+class AnswerCache:
+    """SQLite-backed answer cache with LRU eviction, TTL and hit/miss counters"""
+
+    def __init__(self, path, max_entries=5000, ttl_seconds=7 * 24 * 3600):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # One connection shared across Streamlit's script threads, guarded by the lock
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def get(self, profile, prompt, model, index_version, grounding=None):
+        """Return {'answer', 'sources'} for a fresh entry, or None"""
+        key = cache_key(profile, prompt, model, index_version, grounding)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT answer, sources, created_at FROM answers WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[2] > self.ttl_seconds:
+                if row is not None:
+                    self._conn.execute("DELETE FROM answers WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE answers SET last_access = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return {"answer": row[0], "sources": json.loads(row[1])}
+
+    def put(self, profile, prompt, model, index_version, answer, sources=(), grounding=None):
+        """Store an answer; sources are plain dicts with page_content and metadata"""
+        key = cache_key(profile, prompt, model, index_version, grounding)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, profile, normalize_prompt(prompt), model, index_version,
+                 answer, json.dumps(list(sources)), now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        if count <= self.max_entries:
+            return
+        # Trim a little below the cap so eviction doesn't run on every insert
+        excess = count - int(self.max_entries * 0.9)
+        self._conn.execute(
+            "DELETE FROM answers WHERE key IN (SELECT key FROM answers ORDER BY last_access LIMIT ?)",
+            (excess,),
+        )
+
+    def invalidate(self, index_version):
+        """Drop every entry built against an index version other than the current one"""
+        with self._lock:
+            deleted = self._conn.execute(
+                "DELETE FROM answers WHERE index_version != ?", (index_version,)
+            ).rowcount
+            self._conn.commit()
+        return deleted
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._conn.execute("DELETE FROM answers")
+            self._conn.commit()
+
+    def stats(self):
+        """Return entry count, hits, misses and hit rate for this process"""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,123 @@
+# article_index.py - Direct article-number lookups that bypass vector search
+#
+# Built by ingest.py into each version of the vector index (articles.json). Maps article
+# identifiers such as 21, 51A, 243ZH or 323B to their exact source chunks.
+
+import json
+import os
+import re
+import threading
+
+import config
+
+_ARTICLE_ID = re.compile(r"^(?:art(?:icle)?\.?\s*)?(\d{1,3})\s*([a-z]{0,2})$", re.IGNORECASE)
+
+def normalize_article_id(value):
+    """Return the canonical form of an article identifier ('article 51 a' -> '51A'), or None"""
+    match = _ARTICLE_ID.match(str(value).strip())
+    if not match:
+        return None
+    return f"{int(match.group(1))}{match.group(2).upper()}"
+
+def article_key(article_id):
+    """Sort key for article identifiers: 21 < 21A < 243 < 243Z < 243ZA"""
+    match = re.match(r"^(\d+)([A-Z]*)$", article_id.upper())
+    if not match:
+        return (10 ** 6, 0, article_id)
+    return (int(match.group(1)), len(match.group(2)), match.group(2))
+
+class ArticleIndex:
+    """Dictionary from article identifier to title, Part and source chunks"""
+
+    def __init__(self, articles):
+        self.articles = articles
+
+    @classmethod
+    def from_chunks(cls, chunks):
+        """Group ingested chunks ({'id', 'text', 'metadata'}) by their Article metadata"""
+        articles = {}
+        for chunk in chunks:
+            article_id = chunk["metadata"].get("article")
+            if not article_id:
+                continue
+            entry = articles.setdefault(article_id, {
+                "title": chunk["metadata"].get("title", ""),
+                "part": chunk["metadata"].get("part", ""),
+                "chunks": [],
+            })
+            entry["chunks"].append({"id": chunk["id"], "text": chunk["text"], "metadata": chunk["metadata"]})
+        for entry in articles.values():
+            entry["chunks"].sort(key=lambda c: c["metadata"].get("chunk", 0))
+        return cls(dict(sorted(articles.items(), key=lambda item: article_key(item[0]))))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def save(self, path):
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.articles, f, separators=(",", ":"))
+        os.replace(tmp, path)
+
+    def __contains__(self, article_id):
+        return normalize_article_id(article_id) in self.articles
+
+    def __len__(self):
+        return len(self.articles)
+
+    def get(self, article_id):
+        """Return {'title', 'part', 'chunks'} for an article, or None"""
+        return self.articles.get(normalize_article_id(article_id))
+
+    def text(self, article_id):
+        """Return the verbatim text of an article, or None"""
+        entry = self.get(article_id)
+        if entry is None:
+            return None
+        return "\n\n".join(chunk["text"] for chunk in entry["chunks"])
+
+    def documents(self, *article_ids):
+        """Return the source chunks of one or more articles as LangChain documents"""
+        from langchain_core.documents import Document
+
+        docs = []
+        for article_id in article_ids:
+            entry = self.get(article_id)
+            if entry is not None:
+                docs.extend(Document(page_content=c["text"], metadata=c["metadata"], id=c["id"])
+                            for c in entry["chunks"])
+        return docs
+
+def load_article_index(path):
+    """Load the article index if ingestion has produced one"""
+    return ArticleIndex.load(path) if os.path.exists(path) else None
+
+# ------------------ Process-wide Instance ------------------
+_shared = None
+_shared_lock = threading.Lock()
+
+def get_article_index():
+    """Return the process-wide article index, or None until ingestion has produced one"""
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                from local_index import version_file
+
+                _shared = load_article_index(version_file(config.LOCAL_INDEX_DIR, config.ARTICLE_INDEX_FILE))
+    return _shared
+
+def reload_article_index():
+    """Drop the process-wide article index so the next access reads the re-ingested one"""
+    global _shared
+    with _shared_lock:
+        _shared = None
+
+def article_documents(*article_ids):
+    """Exact source chunks for the given articles, or None to fall back to vector search"""
+    index = get_article_index()
+    if index is None or not all(article_id in index for article_id in article_ids):
+        return None
+    return index.documents(*article_ids)
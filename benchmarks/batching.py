@@ -0,0 +1,74 @@
+# benchmarks/batching.py - Query-embedding throughput with and without micro-batching
+#
+# Usage:
+#   python -m benchmarks.batching                               # torch backend
+#   python -m benchmarks.batching --backend onnx-int8 --concurrency 1,8,32
+#   python -m benchmarks.batching --max-wait-ms 2 --output batching.json
+#
+# N threads stand in for N Streamlit sessions, each embedding distinct
+# catalogue prompts back to back (no LRU, so every call reaches the model).
+
+import argparse
+import threading
+import time
+
+import config
+from benchmarks.common import percentiles, report
+from benchmarks.embeddings import build_backend
+from catalogue import iter_prompts
+from embeddings import MicroBatchingEmbeddings
+
+def run(embedder, prompts, concurrency, per_thread):
+    latencies = []
+    lock = threading.Lock()
+
+    def session(offset):
+        samples = []
+        for i in range(per_thread):
+            started = time.perf_counter()
+            embedder.embed_query(prompts[(offset * per_thread + i) % len(prompts)])
+            samples.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(samples)
+
+    threads = [threading.Thread(target=session, args=(n,)) for n in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {"queries_per_second": len(latencies) / elapsed, "latency": percentiles(latencies)}
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure micro-batched query embedding throughput")
+    parser.add_argument("--backend", default="torch", choices=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--model", default=config.EMBEDDING_MODEL, help="model for the torch backend")
+    parser.add_argument("--onnx-dir", default=config.ONNX_MODEL_DIR)
+    parser.add_argument("--concurrency", default="1,4,16,32", help="comma-separated session counts")
+    parser.add_argument("--per-thread", type=int, default=50, help="queries per session")
+    parser.add_argument("--max-wait-ms", type=float, default=config.EMBEDDING_BATCH_WAIT_MS or 5)
+    parser.add_argument("--max-batch-size", type=int, default=config.EMBEDDING_BATCH_MAX_SIZE)
+    parser.add_argument("--output", help="save results as JSON")
+    args = parser.parse_args()
+
+    base = build_backend(args.backend, args.model, args.onnx_dir)
+    prompts = [prompt for _, prompt in iter_prompts()]
+    base.embed_documents(prompts[:8])  # warm up
+
+    results = {"backend": args.backend, "max_wait_ms": args.max_wait_ms, "max_batch_size": args.max_batch_size}
+    for concurrency in [int(n) for n in args.concurrency.split(",")]:
+        batcher = MicroBatchingEmbeddings(base, max_wait=args.max_wait_ms / 1000, max_batch_size=args.max_batch_size)
+        direct = run(base, prompts, concurrency, args.per_thread)
+        batched = run(batcher, prompts, concurrency, args.per_thread)
+        stats = batcher.stats()
+        results[f"sessions={concurrency}"] = {
+            "direct": direct,
+            "batched": dict(batched, mean_batch_size=stats["mean_batch_size"],
+                            batch_sizes=stats["batch_sizes"], wait_p95_ms=stats["wait_p95_ms"]),
+            "speedup": batched["queries_per_second"] / direct["queries_per_second"],
+        }
+    report(results, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+# benchmarks/common.py - Helpers shared by the benchmark scripts
+
+import json
+import time
+
+def percentiles(samples):
+    """Return count, mean, p50, p95 and p99 (in milliseconds) of a list of seconds"""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def pick(q):
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": sum(ordered) / len(ordered) * 1000,
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+    }
+
+def timed(fn, *args, **kwargs):
+    """Call fn and return (result, seconds)"""
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+def report(results, output=None):
+    """Print results as JSON and optionally save them for comparison across commits"""
+    text = json.dumps(results, indent=2)
+    print(text)
+    if output:
+        with open(output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
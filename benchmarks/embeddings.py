@@ -0,0 +1,147 @@
+# benchmarks/embeddings.py - PyTorch vs. ONNX (fp32 / int8) MiniLM embedders
+#
+# Usage:
+#   python embeddings.py export                                  # once, writes models/...
+#   python -m benchmarks.embeddings --index-dir index            # all three backends
+#   python -m benchmarks.embeddings --backends torch,onnx-int8 --output embeddings.json
+#
+# Each backend runs in its own subprocess so load time and peak RSS are not
+# polluted by the others. Query vectors are compared with the torch backend
+# (which embedded the index) and searched against the ingested index to check
+# that retrieval returns the same chunks. Exits non-zero if a backend falls
+# outside the tolerance documented in embeddings.py.
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import config
+from benchmarks.common import percentiles, report, timed
+
+TOLERANCE = {"torch": 1.0, "onnx": 0.9999, "onnx-int8": 0.98}
+
+def load_queries(index_dir, limit):
+    """Advanced Search style queries from the article index, else the catalogue prompts"""
+    from local_index import version_file
+
+    path = version_file(index_dir, "articles.json") if index_dir else ""
+    if os.path.exists(path):
+        from article_index import ArticleIndex
+        from benchmarks.hybrid import build_queries
+
+        return [query for query, _ in build_queries(ArticleIndex.load(path), limit)][:limit]
+    from catalogue import iter_prompts
+
+    return [prompt for _, prompt in iter_prompts()][:limit]
+
+# ------------------ Worker (one backend per process) ------------------
+def build_backend(name, model, onnx_dir):
+    if name == "torch":
+        from langchain_community.embeddings import HuggingFaceEmbeddings
+
+        return HuggingFaceEmbeddings(model_name=model)
+    from embeddings import OnnxMiniLMEmbeddings
+
+    return OnnxMiniLMEmbeddings(onnx_dir, quantized=name == "onnx-int8")
+
+def worker(args):
+    queries = load_queries(args.index_dir, args.queries)
+    backend, load_seconds = timed(build_backend, args.worker, args.model, args.onnx_dir)
+    _, first_seconds = timed(backend.embed_query, queries[0])
+
+    vectors, latencies = [], []
+    for query in queries:
+        vector, seconds = timed(backend.embed_query, query)
+        vectors.append(vector)
+        latencies.append(seconds)
+
+    batch = (queries * (args.batch_size // len(queries) + 1))[: args.batch_size]
+    started = time.perf_counter()
+    backend.embed_documents(batch)
+    batch_seconds = time.perf_counter() - started
+
+    np.save(args.vectors_out, np.asarray(vectors, dtype=np.float32))
+    print(json.dumps({
+        "load_seconds": load_seconds,
+        "first_query_ms": first_seconds * 1000,
+        "query_latency": percentiles(latencies),
+        "batch_texts_per_second": len(batch) / batch_seconds,
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }))
+
+def run_worker(name, args, vectors_out):
+    command = [sys.executable, "-m", "benchmarks.embeddings", "--worker", name,
+               "--model", args.model, "--onnx-dir", args.onnx_dir, "--queries", str(args.queries),
+               "--batch-size", str(args.batch_size), "--vectors-out", vectors_out]
+    if args.index_dir:
+        command += ["--index-dir", args.index_dir]
+    completed = subprocess.run(command, capture_output=True, text=True, check=True)
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+# ------------------ Comparison ------------------
+def top_rows(index_vectors, queries, k):
+    scores = queries @ index_vectors.T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the torch and ONNX MiniLM embedders")
+    parser.add_argument("--backends", default="torch,onnx,onnx-int8", help="comma-separated backends")
+    parser.add_argument("--model", default=config.EMBEDDING_MODEL, help="model for the torch backend")
+    parser.add_argument("--onnx-dir", default=config.ONNX_MODEL_DIR, help="directory written by embeddings.py export")
+    parser.add_argument("--index-dir", default=config.LOCAL_INDEX_DIR if os.path.isdir(config.LOCAL_INDEX_DIR) else None,
+                        help="ingested index to check retrieval against")
+    parser.add_argument("--queries", type=int, default=200, help="number of queries")
+    parser.add_argument("--batch-size", type=int, default=256, help="texts in the throughput batch")
+    parser.add_argument("--k", type=int, default=config.TOP_K)
+    parser.add_argument("--output", help="save results as JSON")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--vectors-out", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args)
+        return
+
+    backends = args.backends.split(",")
+    results, vectors = {}, {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in backends:
+            path = os.path.join(tmp, f"{name}.npy")
+            results[name] = run_worker(name, args, path)
+            vectors[name] = np.load(path)
+
+    index_vectors = None
+    if args.index_dir:
+        from local_index import LocalVectorIndex
+
+        index_vectors = np.asarray(LocalVectorIndex.load(args.index_dir).vectors, dtype=np.float32)
+
+    failures = []
+    if "torch" in vectors:
+        reference = vectors["torch"]
+        reference_rows = top_rows(index_vectors, reference, args.k) if index_vectors is not None else None
+        for name in backends:
+            cosine = np.sum(vectors[name] * reference, axis=1) / (
+                np.linalg.norm(vectors[name], axis=1) * np.linalg.norm(reference, axis=1))
+            results[name]["cosine_vs_torch"] = {"min": float(cosine.min()), "mean": float(cosine.mean())}
+            if cosine.min() < TOLERANCE.get(name, 1.0) - 1e-6:
+                failures.append(f"{name}: min cosine {cosine.min():.5f} < {TOLERANCE[name]}")
+            if reference_rows is not None:
+                rows = top_rows(index_vectors, vectors[name], args.k)
+                overlap = [len(set(a) & set(b)) / args.k for a, b in zip(rows, reference_rows)]
+                results[name][f"overlap@{args.k}"] = float(np.mean(overlap))
+                results[name]["top1_agreement"] = float(np.mean(rows[:, 0] == reference_rows[:, 0]))
+    report(results, args.output)
+    if failures:
+        sys.exit("Outside tolerance: " + "; ".join(failures))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# benchmarks/hybrid.py - Recall@k and latency of dense, BM25 and hybrid retrieval
+#
+# Usage:
+#   python -m benchmarks.hybrid --index-dir index            # MiniLM over the ingested index
+#   python -m benchmarks.hybrid --index-dir index --standin  # fake embeddings, no torch
+#
+# Queries are built from the article index the way the explorer's Advanced Search
+# is used ("Article 356 Provisions in case of failure...") plus title-only queries;
+# a hit is any chunk belonging to the queried article. Prompt characters stuffed
+# at each k are reported because generation time grows with the context size.
+
+import argparse
+
+from article_index import ArticleIndex
+from benchmarks.common import percentiles, report, timed
+from bm25 import BM25Index, reciprocal_rank_fusion
+from local_index import LocalVectorIndex, LocalVectorStore, version_file
+
+def build_queries(articles, limit):
+    queries = []
+    for article_id, entry in list(articles.articles.items())[:limit]:
+        if entry["title"]:
+            queries.append((f"Article {article_id} {entry['title']}", article_id))
+            queries.append((entry["title"], article_id))
+    return queries
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare dense, BM25 and hybrid retrieval")
+    parser.add_argument("--index-dir", required=True, help="directory written by ingest.py")
+    parser.add_argument("--standin", action="store_true", help="use deterministic fake embeddings")
+    parser.add_argument("--limit", type=int, default=500, help="max articles to query")
+    parser.add_argument("--ks", default="3,6,12", help="comma-separated k values")
+    parser.add_argument("--output", help="save results as JSON")
+    args = parser.parse_args()
+
+    if args.standin:
+        from langchain_core.embeddings import DeterministicFakeEmbedding
+        embeddings = DeterministicFakeEmbedding(size=384)
+    else:
+        import config
+        from langchain_community.embeddings import HuggingFaceEmbeddings
+        embeddings = HuggingFaceEmbeddings(model_name=config.EMBEDDING_MODEL)
+
+    store = LocalVectorStore(LocalVectorIndex.load(args.index_dir), embeddings)
+    bm25 = BM25Index.load(args.index_dir)
+    articles = ArticleIndex.load(version_file(args.index_dir, "articles.json"))
+    queries = build_queries(articles, args.limit)
+    ks = [int(k) for k in args.ks.split(",")]
+    depth = max(ks)
+
+    retrievers = {
+        "dense": lambda q: store.similarity_search(q, depth),
+        "bm25": lambda q: bm25.documents(q, depth),
+        "hybrid": lambda q: reciprocal_rank_fusion([store.similarity_search(q, depth), bm25.documents(q, depth)], depth),
+    }
+    results = {"queries": len(queries), "chunks": len(bm25.ids)}
+    for name, retrieve in retrievers.items():
+        hits = {k: 0 for k in ks}
+        context = {k: 0 for k in ks}
+        latencies = []
+        for query, article_id in queries:
+            docs, seconds = timed(retrieve, query)
+            latencies.append(seconds)
+            for k in ks:
+                if any(doc.metadata.get("article") == article_id for doc in docs[:k]):
+                    hits[k] += 1
+                context[k] += sum(len(doc.page_content) for doc in docs[:k])
+        results[name] = {
+            "latency": percentiles(latencies),
+            "recall": {f"@{k}": hits[k] / len(queries) for k in ks},
+            "mean_context_chars": {f"@{k}": context[k] / len(queries) for k in ks},
+        }
+    report(results, args.output)
+
+if __name__ == "__main__":
+    main()
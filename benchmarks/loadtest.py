@@ -0,0 +1,202 @@
+# benchmarks/loadtest.py - Headless multi-session load test of the Streamlit pages
+#
+# Usage:
+#   python -m benchmarks.loadtest                              # ramp 1, 2, 4, 8, 16 sessions
+#   python -m benchmarks.loadtest --levels 1,8,32 --latency 0.5 --output load.json
+#
+# Every simulated user is driven through Streamlit's AppTest, so each page run
+# goes through the real rerun-everything script model with its own
+# session_state: home.py, then questions typed into chat.py (chat_history grows
+# as it would), then explorer.py view switches, selections and button clicks.
+# The QA engine is the process-wide stand-in engine, as one server process
+# would share it. Reports per-interaction latency, the server's RSS over time
+# and the first session count at which p95 latency degrades past the threshold.
+
+import argparse
+import os
+import random
+import resource
+import threading
+import time
+
+from benchmarks.common import percentiles, report
+from benchmarks.qa_workload import CHAT_QUESTIONS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+VIEWS = ["Parts Overview", "Fundamental Rights", "Directive Principles",
+         "Constitutional Bodies", "Amendments", "Search by Article"]
+
+def rss_mb():
+    """Current resident set size of this process"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # Peak RSS is the best portable fallback (kilobytes on Linux, bytes on macOS)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+class RssSampler:
+    """Samples RSS on a background thread"""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.samples.append((round(time.perf_counter() - self._started, 2), round(rss_mb(), 1)))
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+# ------------------ Simulated User ------------------
+def allow_concurrent_apptests():
+    """Let AppTest instances run concurrently in one process (patches this harness process only)"""
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+
+    # Each AppTest run installs a mock Runtime singleton and resets it to None when
+    # it finishes, which breaks any other session still running: keep serving the
+    # most recent mock instead.
+    last = {}
+
+    def instance(cls):
+        if cls._instance is not None:
+            last["runtime"] = cls._instance
+            return cls._instance
+        if "runtime" in last:
+            return last["runtime"]
+        raise RuntimeError("Runtime hasn't been created!")
+
+    Runtime.instance = classmethod(instance)
+    Runtime.exists = classmethod(lambda cls: cls._instance is not None or "runtime" in last)
+
+    # Every AppTest compiles the page with its own ScriptCache, and concurrent
+    # ast.parse calls are not thread-safe on some CPython versions.
+    compile_lock = threading.Lock()
+    get_bytecode = ScriptCache.get_bytecode
+
+    def locked_get_bytecode(self, script_path):
+        with compile_lock:
+            return get_bytecode(self, script_path)
+
+    ScriptCache.get_bytecode = locked_get_bytecode
+
+def simulated_user(seed, questions, explorer_clicks, record, timeout):
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed)
+
+    def timed(name, run):
+        started = time.perf_counter()
+        at = run()
+        record(name, time.perf_counter() - started, bool(at.exception))
+        return at
+
+    timed("home.load", lambda: AppTest.from_file(os.path.join(ROOT, "home.py"), default_timeout=timeout).run())
+
+    chat = timed("chat.load", lambda: AppTest.from_file(os.path.join(ROOT, "chat.py"), default_timeout=timeout).run())
+    for _ in range(questions):
+        chat.text_input[0].input(rng.choice(CHAT_QUESTIONS))
+        timed("chat.ask", lambda: chat.button[0].click().run())
+
+    explorer = timed("explorer.load",
+                     lambda: AppTest.from_file(os.path.join(ROOT, "explorer.py"), default_timeout=timeout).run())
+    for _ in range(explorer_clicks):
+        view = rng.choice(VIEWS)
+        timed("explorer.view", lambda: explorer.sidebar.radio[0].set_value(view).run())
+        if explorer.selectbox:
+            box = explorer.selectbox[0]
+            box.set_value(rng.choice(box.options))
+        timed("explorer.click", lambda: explorer.button[0].click().run())
+
+def run_level(sessions, args):
+    samples = {}
+    errors = {}
+    lock = threading.Lock()
+
+    def record(name, seconds, failed):
+        with lock:
+            samples.setdefault(name, []).append(seconds)
+            if failed:
+                errors[name] = errors.get(name, 0) + 1
+
+    def user(n):
+        try:
+            simulated_user(args.seed * 1000 + n, args.questions, args.clicks, record, args.timeout)
+        except Exception as e:
+            record(f"crash.{type(e).__name__}", 0.0, True)
+
+    threads = [threading.Thread(target=user, args=(n,)) for n in range(sessions)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+        # Users arrive over a short window rather than in lock-step
+        time.sleep(args.ramp / max(sessions, 1))
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    everything = [s for name, values in samples.items() if not name.startswith("crash.") for s in values]
+    return {
+        "sessions": sessions,
+        "seconds": elapsed,
+        "interactions": len(everything),
+        "interactions_per_second": len(everything) / elapsed if elapsed else 0.0,
+        "errors": errors,
+        "latency": percentiles(everything),
+        "by_interaction": {name: percentiles(values) for name, values in sorted(samples.items())},
+        "rss_mb_after": round(rss_mb(), 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive simulated Streamlit sessions against stand-ins")
+    parser.add_argument("--levels", default="1,2,4,8,16", help="comma-separated concurrent session counts")
+    parser.add_argument("--questions", type=int, default=3, help="chat questions per user")
+    parser.add_argument("--clicks", type=int, default=3, help="explorer view switches and clicks per user")
+    parser.add_argument("--latency", type=float, default=0.2, help="fake LLM latency before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=500.0)
+    parser.add_argument("--ramp", type=float, default=1.0, help="seconds over which each level's users arrive")
+    parser.add_argument("--degrade-factor", type=float, default=2.0,
+                        help="p95 growth over the single-session p95 that counts as degraded")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds allowed per page run")
+    parser.add_argument("--sample-interval", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="save results as JSON")
+    args = parser.parse_args()
+
+    import qa_engine
+    from standins import build_standin_engine
+
+    allow_concurrent_apptests()
+    # One shared engine, as in a server process; pages find it through get_engine()
+    qa_engine.set_engine(build_standin_engine(latency=args.latency, tokens_per_second=args.tokens_per_second))
+    qa_engine.start_warmup()
+
+    results = {"rss_mb_start": round(rss_mb(), 1), "levels": []}
+    with RssSampler(args.sample_interval) as sampler:
+        for sessions in [int(level) for level in args.levels.split(",")]:
+            results["levels"].append(run_level(sessions, args))
+    results["rss_timeline"] = sampler.samples
+    results["rss_mb_peak"] = max((mb for _, mb in sampler.samples), default=rss_mb())
+
+    baseline = results["levels"][0]["latency"].get("p95_ms")
+    results["degraded_at_sessions"] = next(
+        (level["sessions"] for level in results["levels"][1:]
+         if baseline and level["latency"].get("p95_ms", 0) > args.degrade_factor * baseline), None)
+    report(results, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+# benchmarks/qa_workload.py - Replay a realistic question workload against the QA engine
+#
+# Usage:
+#   python -m benchmarks.qa_workload                                  # stand-ins, 12 sample chunks
+#   python -m benchmarks.qa_workload --index-dir index --sessions 16  # seeded from the ingested index
+#   python -m benchmarks.qa_workload --index-dir index --embedder onnx
+#   python -m benchmarks.qa_workload --output after.json --baseline before.json
+#
+# The workload mixes the explorer's catalogue prompts (every template in
+# catalogue.py) with a corpus of free-form chat questions, including
+# paraphrases, drawn with Zipf-like popularity so some topics trend. Pinecone
+# and Groq are replaced by a local vector store and the deterministic fake LLM
+# with configurable latency, so runs are reproducible offline. Per-stage
+# percentiles come from the tracing layer; results are saved as JSON and can be
+# compared with a previous run.
+
+import argparse
+import json
+import platform
+import random
+import resource
+import subprocess
+import tempfile
+import threading
+import time
+from collections import Counter
+
+import tracing
+from answer_cache import AnswerCache
+from benchmarks.common import percentiles, report
+from catalogue import iter_prompts
+from semantic_cache import SemanticCache
+from standins import build_standin_engine
+
+CHAT_QUESTIONS = [
+    "What does Article 21 of the Indian Constitution say?",
+    "Explain the right to life and personal liberty",
+    "What is the right to life under the Constitution?",
+    "What is equality before law?",
+    "Explain Article 14 in simple words",
+    "What freedoms does Article 19 guarantee?",
+    "Can the freedom of speech be restricted?",
+    "Is freedom of speech absolute in India?",
+    "What is the right to education?",
+    "At what age is education free and compulsory?",
+    "How can I approach the Supreme Court if my rights are violated?",
+    "What is a writ petition under Article 32?",
+    "What are the Directive Principles of State Policy?",
+    "Are Directive Principles enforceable in court?",
+    "What is the uniform civil code?",
+    "What are the fundamental duties of citizens?",
+    "List the fundamental duties",
+    "How is the President of India elected?",
+    "What are the powers of the President?",
+    "Who appoints the Chief Justice of India?",
+    "What does the Election Commission do?",
+    "How are elections to Parliament conducted?",
+    "What is a national emergency?",
+    "When can the President declare an emergency?",
+    "What is President's rule in a state?",
+    "Explain Article 356",
+    "How can the Constitution be amended?",
+    "What is the procedure to amend the Constitution under Article 368?",
+    "What is the basic structure doctrine?",
+    "What was the 42nd Amendment?",
+    "Why is the 42nd Amendment called the mini constitution?",
+    "What changed with the 44th Amendment?",
+    "What are the Union, State and Concurrent Lists?",
+    "Which subjects are in the State List?",
+    "What does the Seventh Schedule contain?",
+    "What is the Preamble of the Constitution?",
+    "What do the words socialist and secular in the Preamble mean?",
+    "What are the qualifications to become a Member of Parliament?",
+    "What is the role of the Governor?",
+    "How are Panchayats organised under Part IX?",
+]
+
+def build_workload(requests, chat_share, zipf_s, seed):
+    """Return [(profile, question)] drawn with Zipf-like popularity from both pools"""
+    rng = random.Random(seed)
+    pools = {
+        "explorer": [prompt for _, prompt in iter_prompts()],
+        "chat": list(CHAT_QUESTIONS),
+    }
+    weights = {}
+    for profile, pool in pools.items():
+        rng.shuffle(pool)
+        weights[profile] = [1 / (rank + 1) ** zipf_s for rank in range(len(pool))]
+    workload = []
+    for _ in range(requests):
+        profile = "chat" if rng.random() < chat_share else "explorer"
+        workload.append((profile, rng.choices(pools[profile], weights[profile])[0]))
+    return workload
+
+def build_engine(args, cache_dir):
+    from langchain_core.embeddings import DeterministicFakeEmbedding
+
+    if args.embedder == "standin":
+        embeddings = DeterministicFakeEmbedding(size=384)
+    else:
+        # Real MiniLM vectors make the semantic cache and retrieval behave as in production
+        from embeddings import build_embeddings
+        embeddings = build_embeddings(args.embedder)
+    kwargs = {"embeddings": embeddings}
+    if args.index_dir:
+        from local_index import LocalVectorIndex, LocalVectorStore
+
+        kwargs["vectorstore"] = LocalVectorStore(LocalVectorIndex.load(args.index_dir), embeddings)
+    if not args.no_cache:
+        kwargs["answer_cache"] = AnswerCache(f"{cache_dir}/answers.sqlite3")
+        kwargs["semantic_cache"] = SemanticCache()
+    return build_standin_engine(latency=args.latency, tokens_per_second=args.tokens_per_second, **kwargs)
+
+def replay(engine, workload, sessions, stream, think_seconds, seed):
+    latencies = {"chat": [], "explorer": []}
+    errors = Counter()
+    position = iter(range(len(workload)))
+    lock = threading.Lock()
+
+    def session(n):
+        rng = random.Random(seed + n)
+        while True:
+            with lock:
+                i = next(position, None)
+            if i is None:
+                return
+            profile, question = workload[i]
+            started = time.perf_counter()
+            try:
+                with tracing.trace("benchmark", profile=profile):
+                    if stream:
+                        for _ in engine.stream(profile, question):
+                            pass
+                    else:
+                        engine.invoke(profile, question)
+            except Exception as e:
+                with lock:
+                    errors[type(e).__name__] += 1
+                continue
+            with lock:
+                latencies[profile].append(time.perf_counter() - started)
+            if think_seconds:
+                time.sleep(rng.expovariate(1 / think_seconds))
+
+    threads = [threading.Thread(target=session, args=(n,)) for n in range(sessions)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, time.perf_counter() - started
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline):
+    """Ratios of throughput and p95 latencies against a previous run"""
+    deltas = {"baseline_commit": baseline["meta"].get("commit")}
+    if baseline.get("throughput_rps"):
+        deltas["throughput_ratio"] = results["throughput_rps"] / baseline["throughput_rps"]
+    for stage, stats in results["stages"].items():
+        before = baseline.get("stages", {}).get(stage, {}).get("p95_ms")
+        if before:
+            deltas[f"{stage}_p95_ratio"] = stats["p95_ms"] / before
+    return deltas
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay the explorer and chat workload against stand-ins")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--sessions", type=int, default=8, help="concurrent sessions")
+    parser.add_argument("--chat-share", type=float, default=0.4, help="fraction of chat questions")
+    parser.add_argument("--zipf", type=float, default=1.1, help="popularity skew (0 = uniform)")
+    parser.add_argument("--latency", type=float, default=0.3, help="fake LLM latency before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=250.0, help="fake LLM streaming speed")
+    parser.add_argument("--think", type=float, default=0.0, help="mean seconds between a session's questions")
+    parser.add_argument("--index-dir", help="seed the vector store from an ingested index")
+    parser.add_argument("--embedder", default="standin", choices=["standin", "torch", "onnx"],
+                        help="query embedder (standin needs no model download)")
+    parser.add_argument("--no-stream", action="store_true", help="use invoke() instead of stream()")
+    parser.add_argument("--no-cache", action="store_true", help="disable the answer and semantic caches")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="save results as JSON")
+    parser.add_argument("--baseline", help="previous results JSON to compare against")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        tracing.tracer.log_path = f"{cache_dir}/traces.jsonl"
+        engine = build_engine(args, cache_dir)
+        workload = build_workload(args.requests, args.chat_share, args.zipf, args.seed)
+        latencies, errors, elapsed = replay(engine, workload, args.sessions, not args.no_stream,
+                                            args.think, args.seed)
+        cache = {
+            "lookups": {dict(labels)["result"]: value for (name, labels), value in tracing.tracer.counters.items()
+                        if name == "cache_lookups_total"},
+            "llm_calls": engine.llm.calls,
+            "coalescing": engine.flights.stats(),
+        }
+        if engine.answer_cache is not None:
+            cache["answer_cache"] = engine.answer_cache.stats()
+            cache["semantic_cache"] = engine.semantic_cache.stats()
+
+    completed = sum(len(samples) for samples in latencies.values())
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "args": vars(args),
+        },
+        "completed": completed,
+        "errors": dict(errors),
+        "seconds": elapsed,
+        "throughput_rps": completed / elapsed if elapsed else 0.0,
+        "latency": {profile: percentiles(samples) for profile, samples in latencies.items()},
+        "stages": {
+            stage: {"count": s["count"], "p50_ms": s["p50"] * 1000, "p95_ms": s["p95"] * 1000, "p99_ms": s["p99"] * 1000}
+            for stage, s in tracing.tracer.summary().items()
+        },
+        "cache": cache,
+        "llm_call_rate": engine.llm.calls / completed if completed else 0.0,
+        # ru_maxrss is in kilobytes on Linux
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            results["vs_baseline"] = compare(results, json.load(f))
+    report(results, args.output)
+
+if __name__ == "__main__":
+    main()
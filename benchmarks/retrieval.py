@@ -0,0 +1,77 @@
+# benchmarks/retrieval.py - Local in-process index vs. the Pinecone round trip
+#
+# Usage:
+#   python -m benchmarks.retrieval                     # synthetic 5,000-chunk corpus
+#   python -m benchmarks.retrieval --index-dir index   # the real exported index
+#   python -m benchmarks.retrieval --rtt-ms 60 --output retrieval.json
+#
+# The Pinecone path is modelled by a stand-in that performs the same search
+# server-side, adds the network round trip and serializes the matches as JSON.
+
+import argparse
+import json
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.common import percentiles, report, timed
+from local_index import LocalVectorIndex
+
+class PineconeStandIn:
+    """Answers queries like Pinecone would: remote search plus a network round trip"""
+
+    def __init__(self, index, rtt_seconds):
+        self.index = index
+        self.rtt_seconds = rtt_seconds
+
+    def query(self, vector, top_k):
+        matches = [
+            {"id": self.index.ids[row], "score": score,
+             "metadata": dict(self.index.metadatas[row], text=self.index.texts[row])}
+            for row, score in self.index.search(vector, top_k)
+        ]
+        time.sleep(self.rtt_seconds)
+        return json.loads(json.dumps({"matches": matches}))
+
+def synthetic_index(directory, chunks, dim, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((chunks, dim)).astype(np.float32)
+    ids = [f"chunk-{i}" for i in range(chunks)]
+    texts = [f"Synthetic chunk {i}" for i in range(chunks)]
+    metadatas = [{"article": str(i % 395 + 1)} for i in range(chunks)]
+    return LocalVectorIndex.build(directory, ids, texts, metadatas, vectors)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark local vs Pinecone-style retrieval")
+    parser.add_argument("--index-dir", help="existing local index (default: synthetic corpus)")
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=12)
+    parser.add_argument("--rtt-ms", type=float, default=30.0, help="simulated Pinecone round trip")
+    parser.add_argument("--output", help="save results as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.index_dir:
+            index = LocalVectorIndex.load(args.index_dir)
+        else:
+            index = synthetic_index(tmp, args.chunks, args.dim)
+        rng = np.random.default_rng(1)
+        queries = rng.standard_normal((args.queries, index.vectors.shape[1])).astype(np.float32)
+
+        remote = PineconeStandIn(index, args.rtt_ms / 1000)
+        local_times = [timed(index.search, q, args.k)[1] for q in queries]
+        remote_times = [timed(remote.query, q, args.k)[1] for q in queries[: max(1, args.queries // 10)]]
+
+        report({
+            "chunks": len(index),
+            "dimension": int(index.vectors.shape[1]),
+            "k": args.k,
+            "local": percentiles(local_times),
+            "pinecone_standin": percentiles(remote_times),
+        }, args.output)
+
+if __name__ == "__main__":
+    main()
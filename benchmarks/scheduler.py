@@ -0,0 +1,90 @@
+# benchmarks/scheduler.py - Bursts against a rate-limited stand-in LLM, with and without the scheduler
+#
+# Usage:
+#   python -m benchmarks.scheduler
+#   python -m benchmarks.scheduler --requests 120 --rpm 30 --period 2 --output scheduler.json
+#
+# Time is compressed: the stand-in enforces `--rpm`/`--tpm` per `--period`
+# seconds instead of per minute. Without the scheduler the burst turns into
+# 429s; with it requests queue by priority and the overflow is shed as "busy".
+
+import argparse
+import random
+import threading
+import time
+
+from benchmarks.common import percentiles, report
+from llm_scheduler import BACKGROUND, BROWSE, BULK, INTERACTIVE, Busy, LLMScheduler
+from standins import RateLimitedFakeChatModel, RateLimitError, build_standin_engine
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BROWSE: "browse", BULK: "bulk", BACKGROUND: "background"}
+# Roughly the traffic mix of the app: mostly browsing, some chat, a few long prompts
+MIX = [INTERACTIVE] * 3 + [BROWSE] * 5 + [BULK] * 2
+
+def burst(engine, requests, arrival_seconds, seed=0):
+    rng = random.Random(seed)
+    outcomes = {name: {"ok": [], "busy": 0, "rate_limited": 0} for name in PRIORITY_NAMES.values()}
+    lock = threading.Lock()
+
+    def call(i, priority):
+        started = time.perf_counter()
+        try:
+            engine.answer("explorer", f"Explain Article {i + 1} of the Indian Constitution", priority=priority)
+            outcome = "ok"
+        except Busy:
+            outcome = "busy"
+        except RateLimitError:
+            outcome = "rate_limited"
+        with lock:
+            bucket = outcomes[PRIORITY_NAMES[priority]]
+            if outcome == "ok":
+                bucket["ok"].append(time.perf_counter() - started)
+            else:
+                bucket[outcome] += 1
+
+    threads = []
+    for i in range(requests):
+        thread = threading.Thread(target=call, args=(i, rng.choice(MIX)))
+        thread.start()
+        threads.append(thread)
+        time.sleep(rng.expovariate(requests / arrival_seconds) if arrival_seconds else 0)
+    for thread in threads:
+        thread.join()
+    return {name: {"ok": len(o["ok"]), "busy": o["busy"], "rate_limited": o["rate_limited"],
+                   "latency": percentiles(o["ok"])} for name, o in outcomes.items() if o["ok"] or o["busy"] or o["rate_limited"]}
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare a request burst with and without the LLM scheduler")
+    parser.add_argument("--requests", type=int, default=80)
+    parser.add_argument("--arrival-seconds", type=float, default=1.0, help="spread of the burst")
+    parser.add_argument("--rpm", type=int, default=20, help="stand-in request limit per period")
+    parser.add_argument("--tpm", type=int, default=20000, help="stand-in token limit per period")
+    parser.add_argument("--period", type=float, default=2.0, help="seconds standing in for a minute")
+    parser.add_argument("--queue", type=int, default=16)
+    parser.add_argument("--max-wait", type=float, default=3.0)
+    parser.add_argument("--headroom", type=float, default=0.9, help="fraction of the limits the scheduler budgets")
+    parser.add_argument("--reserve", type=float, default=0.25, help="share of the budget kept from bulk and background work")
+    parser.add_argument("--latency", type=float, default=0.2, help="stand-in LLM latency in seconds")
+    parser.add_argument("--output", help="save results as JSON")
+    args = parser.parse_args()
+
+    results = {}
+    for name in ("direct", "scheduled"):
+        llm = RateLimitedFakeChatModel(latency=args.latency, max_requests=args.rpm,
+                                       max_tokens=args.tpm, window=args.period)
+        scheduler = None
+        if name == "scheduled":
+            scheduler = LLMScheduler(args.rpm, args.tpm, max_queue=args.queue,
+                                     max_wait=args.max_wait, period=args.period, headroom=args.headroom,
+                                     reserve=args.reserve)
+        engine = build_standin_engine(llm=llm, scheduler=scheduler)
+        started = time.perf_counter()
+        results[name] = burst(engine, args.requests, args.arrival_seconds)
+        results[name]["seconds"] = time.perf_counter() - started
+        results[name]["provider_429s"] = llm.rejected
+        if scheduler is not None:
+            results[name]["scheduler"] = scheduler.stats()
+    report(results, args.output)
+
+if __name__ == "__main__":
+    main()
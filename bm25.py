@@ -0,0 +1,150 @@
+# bm25.py - Local BM25 keyword index and hybrid (BM25 + dense) retrieval
+#
+# ingest.py writes bm25.npz into each version of the vector index. Postings are stored as
+# flat numpy arrays (term offsets, document rows, term frequencies), so the
+# index loads in milliseconds and a query is a few vectorized array updates.
+
+import json
+import os
+import re
+from typing import Any
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+import config
+from local_index import current_version
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the this to was were will with
+what which who whom how does do did explain about under state states provide detail details
+""".split())
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+def tokenize(text):
+    """Lower-case word and number tokens, keeping article ids such as 51a or 243zh intact"""
+    return [token for token in _TOKEN.findall(text.lower()) if token not in STOPWORDS]
+
+class BM25Index:
+    """Inverted index over the ingested chunks with Okapi BM25 scoring"""
+
+    def __init__(self, terms, offsets, rows, tfs, doc_lengths, ids, texts=None, metadatas=None, k1=1.5, b=0.75):
+        self.vocabulary = {term: i for i, term in enumerate(terms)}
+        self.offsets = offsets
+        self.rows = rows
+        self.tfs = tfs
+        self.doc_lengths = doc_lengths
+        self.avg_length = float(doc_lengths.mean()) if len(doc_lengths) else 0.0
+        self.ids = ids
+        self.texts = texts
+        self.metadatas = metadatas
+        self.k1 = k1
+        self.b = b
+        counts = np.diff(offsets)
+        self.idf = np.log(1 + (len(ids) - counts + 0.5) / (counts + 0.5)).astype(np.float32)
+
+    @classmethod
+    def build(cls, ids, texts, metadatas=None):
+        postings = {}
+        doc_lengths = np.zeros(len(texts), dtype=np.int32)
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_lengths[row] = len(tokens)
+            for token in tokens:
+                counts = postings.setdefault(token, {})
+                counts[row] = counts.get(row, 0) + 1
+
+        terms = sorted(postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        rows, tfs = [], []
+        for i, term in enumerate(terms):
+            entries = sorted(postings[term].items())
+            rows.extend(row for row, _ in entries)
+            tfs.extend(tf for _, tf in entries)
+            offsets[i + 1] = len(rows)
+        return cls(terms, offsets, np.array(rows, dtype=np.int32), np.array(tfs, dtype=np.uint16),
+                   doc_lengths, list(ids), list(texts), list(metadatas) if metadatas else None)
+
+    def save(self, path):
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        np.savez_compressed(path, terms=np.array(terms), offsets=self.offsets, rows=self.rows,
+                            tfs=self.tfs, doc_lengths=self.doc_lengths, ids=np.array(self.ids))
+
+    @classmethod
+    def load(cls, directory):
+        """Load bm25.npz and the chunk texts from chunks.jsonl of an index directory's current version"""
+        directory = current_version(directory)
+        data = np.load(os.path.join(directory, "bm25.npz"))
+        texts, metadatas = {}, {}
+        with open(os.path.join(directory, "chunks.jsonl"), encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                texts[record["id"]] = record["text"]
+                metadatas[record["id"]] = record["metadata"]
+        ids = data["ids"].tolist()
+        return cls(data["terms"].tolist(), data["offsets"], data["rows"], data["tfs"], data["doc_lengths"],
+                   ids, [texts[i] for i in ids], [metadatas[i] for i in ids])
+
+    def search(self, query, k=config.TOP_K):
+        """Return [(row, score)] of the k best keyword matches, best first"""
+        scores = np.zeros(len(self.ids), dtype=np.float32)
+        norm = self.k1 * (1 - self.b + self.b * self.doc_lengths / (self.avg_length or 1.0))
+        for token in set(tokenize(query)):
+            term = self.vocabulary.get(token)
+            if term is None:
+                continue
+            start, end = self.offsets[term], self.offsets[term + 1]
+            rows = self.rows[start:end]
+            tfs = self.tfs[start:end].astype(np.float32)
+            scores[rows] += self.idf[term] * tfs * (self.k1 + 1) / (tfs + norm[rows])
+        hits = np.flatnonzero(scores)
+        if len(hits) == 0:
+            return []
+        k = min(k, len(hits))
+        top = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+        top = top[np.argsort(-scores[top])]
+        return [(int(row), float(scores[row])) for row in top]
+
+    def documents(self, query, k=config.TOP_K):
+        return [Document(page_content=self.texts[row], metadata=dict(self.metadatas[row], bm25=score), id=self.ids[row])
+                for row, score in self.search(query, k)]
+
+def reciprocal_rank_fusion(result_lists, k=config.TOP_K, rrf_k=60):
+    """Merge ranked document lists; a document's score is the sum of 1 / (rrf_k + rank)"""
+    scores, docs = {}, {}
+    for results in result_lists:
+        for rank, doc in enumerate(results):
+            # Key on the text: Pinecone and the local index may not share document ids
+            key = doc.page_content
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank + 1)
+            docs.setdefault(key, doc)
+    ranked = sorted(scores, key=scores.get, reverse=True)
+    return [docs[key] for key in ranked[:k]]
+
+class HybridRetriever(BaseRetriever):
+    """Dense vector search and BM25 fused with reciprocal rank fusion"""
+
+    dense: Any
+    bm25: Any
+    k: int = config.HYBRID_TOP_K
+    candidates: int = config.TOP_K
+    directory: str = ""
+
+    def reload(self):
+        """Switch to the keyword index of the directory's current version"""
+        bm25 = load_bm25(self.directory) if self.directory else None
+        if bm25 is not None:
+            self.bm25 = bm25
+
+    def _get_relevant_documents(self, query, *, run_manager=None):
+        dense = self.dense.invoke(query)[: self.candidates]
+        keyword = self.bm25.documents(query, self.candidates)
+        return reciprocal_rank_fusion([dense, keyword], k=self.k)
+
+def load_bm25(directory):
+    """Load the BM25 index if ingestion has produced one"""
+    if os.path.exists(os.path.join(current_version(directory), "bm25.npz")):
+        return BM25Index.load(directory)
+    return None
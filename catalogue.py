@@ -0,0 +1,263 @@
+# catalogue.py - Fixed explorer catalogue and the prompts the explorer sends for it
+
+# Parts of the Constitution with their article ranges
+PARTS = [
+    {"number": "I", "title": "The Union and its Territory", "articles": "1-4"},
+    {"number": "II", "title": "Citizenship", "articles": "5-11"},
+    {"number": "III", "title": "Fundamental Rights", "articles": "12-35"},
+    {"number": "IV", "title": "Directive Principles of State Policy", "articles": "36-51"},
+    {"number": "IVA", "title": "Fundamental Duties", "articles": "51A"},
+    {"number": "V", "title": "The Union", "articles": "52-151"},
+    {"number": "VI", "title": "The States", "articles": "152-237"},
+    {"number": "VII", "title": "The States in Part B of the First Schedule", "articles": "238 (Repealed)"},
+    {"number": "VIII", "title": "The Union Territories", "articles": "239-242"},
+    {"number": "IX", "title": "The Panchayats", "articles": "243-243O"},
+    {"number": "IXA", "title": "The Municipalities", "articles": "243P-243ZG"},
+    {"number": "IXB", "title": "The Co-operative Societies", "articles": "243ZH-243ZT"},
+    {"number": "X", "title": "The Scheduled and Tribal Areas", "articles": "244-244A"},
+    {"number": "XI", "title": "Relations between the Union and the States", "articles": "245-263"},
+    {"number": "XII", "title": "Finance, Property, Contracts and Suits", "articles": "264-300A"},
+    {"number": "XIII", "title": "Trade, Commerce and Intercourse within India", "articles": "301-307"},
+    {"number": "XIV", "title": "Services under the Union and the States", "articles": "308-323"},
+    {"number": "XIVA", "title": "Tribunals", "articles": "323A-323B"},
+    {"number": "XV", "title": "Elections", "articles": "324-329A"},
+    {"number": "XVI", "title": "Special Provisions for Certain Classes", "articles": "330-342"},
+    {"number": "XVII", "title": "Official Language", "articles": "343-351"},
+    {"number": "XVIII", "title": "Emergency Provisions", "articles": "352-360"},
+    {"number": "XIX", "title": "Miscellaneous", "articles": "361-367"},
+    {"number": "XX", "title": "Amendment of the Constitution", "articles": "368"},
+    {"number": "XXI", "title": "Temporary, Transitional and Special Provisions", "articles": "369-392"},
+    {"number": "XXII", "title": "Short Title, Commencement and Repeals", "articles": "393-395"}
+]
+
+# Every article of the current text by Part, as ids and ranges ("243P-243ZG" is
+# 243P ... 243Z, 243ZA ... 243ZG; "369-392" is the unlettered numbers only)
+PART_ARTICLES = {
+    "I": ["1-4"],
+    "II": ["5-11"],
+    "III": ["12-35", "21A", "31A-31D", "32A"],
+    "IV": ["36-51", "39A", "43A", "43B", "48A"],
+    "IVA": ["51A"],
+    "V": ["52-151", "124A-124C", "131A", "134A", "139A", "144A"],
+    "VI": ["152-237", "224A", "226A", "228A", "233A"],
+    "VII": ["238"],
+    "VIII": ["239-242", "239A", "239AA", "239AB", "239B"],
+    "IX": ["243", "243A-243O"],
+    "IXA": ["243P-243ZG"],
+    "IXB": ["243ZH-243ZT"],
+    "X": ["244", "244A"],
+    "XI": ["245-263", "246A", "257A", "258A"],
+    "XII": ["264-300", "268A", "269A", "279A", "290A", "300A"],
+    "XIII": ["301-307"],
+    "XIV": ["308-323", "312A"],
+    "XIVA": ["323A", "323B"],
+    "XV": ["324-329", "329A"],
+    "XVI": ["330-342", "330A", "332A", "334A", "338A", "338B", "342A"],
+    "XVII": ["343-351", "350A", "350B"],
+    "XVIII": ["352-360", "359A"],
+    "XIX": ["361-367", "361A", "361B", "363A"],
+    "XX": ["368"],
+    "XXI": ["369-392", "371A-371J", "372A", "378A"],
+    "XXII": ["393-395", "394A"],
+}
+
+# Articles that keep their number in the text but were omitted by later amendments
+OMITTED_ARTICLES = {
+    "31", "31D", "32A", "131A", "144A", "226A", "228A", "238", "242", "257A", "259", "268A",
+    "278", "291", "306", "314", "329A", "359A", "362", *(str(n) for n in range(379, 392)),
+}
+
+# The twelve Schedules with the articles that refer to them
+SCHEDULES = [
+    {"number": "First", "subject": "States and Union territories", "articles": "1, 4"},
+    {"number": "Second", "subject": "Emoluments of the President, Governors, Speakers, Judges and the CAG", "articles": "59, 65, 75, 97, 125, 148, 158, 164, 186, 221"},
+    {"number": "Third", "subject": "Forms of oaths and affirmations", "articles": "75, 84, 99, 124, 146, 173, 188, 219"},
+    {"number": "Fourth", "subject": "Allocation of seats in the Council of States", "articles": "4, 80"},
+    {"number": "Fifth", "subject": "Administration and control of Scheduled Areas and Scheduled Tribes", "articles": "244"},
+    {"number": "Sixth", "subject": "Administration of Tribal Areas in Assam, Meghalaya, Tripura and Mizoram", "articles": "244, 275"},
+    {"number": "Seventh", "subject": "Union, State and Concurrent Lists", "articles": "246"},
+    {"number": "Eighth", "subject": "Languages", "articles": "344, 351"},
+    {"number": "Ninth", "subject": "Validation of certain Acts and Regulations", "articles": "31B"},
+    {"number": "Tenth", "subject": "Disqualification on ground of defection", "articles": "102, 191"},
+    {"number": "Eleventh", "subject": "Powers, authority and responsibilities of Panchayats", "articles": "243G"},
+    {"number": "Twelfth", "subject": "Powers, authority and responsibilities of Municipalities", "articles": "243W"}
+]
+
+# Subject categories for Filter Articles, as article ranges
+ARTICLE_CATEGORIES = {
+    "Citizenship": ["5-11"],
+    "Fundamental Rights": ["12-35"],
+    "Directive Principles": ["36-51"],
+    "Fundamental Duties": ["51A"],
+    "Union Executive": ["52-78"],
+    "Parliament": ["79-123"],
+    "Union Judiciary": ["124-147"],
+    "State Legislature": ["168-212"],
+    "High Courts": ["214-232"],
+    "Panchayats and Municipalities": ["243-243ZG"],
+    "Centre-State Relations": ["245-263"],
+    "Finance": ["264-300A"],
+    "Public Services": ["308-323B"],
+    "Elections": ["324-329A"],
+    "Official Language": ["343-351"],
+    "Emergency Provisions": ["352-360"],
+    "Amendment Process": ["368"],
+}
+
+# Fundamental Rights groups (Part III)
+FUNDAMENTAL_RIGHTS = [
+    {"name": "Right to Equality (Articles 14-18)", "description": "Equality before law, prohibition of discrimination, equality of opportunity"},
+    {"name": "Right to Freedom (Articles 19-22)", "description": "Freedom of speech, assembly, association, movement, residence, and profession"},
+    {"name": "Right against Exploitation (Articles 23-24)", "description": "Prohibition of traffic in human beings and forced labor, prohibition of child labor"},
+    {"name": "Right to Freedom of Religion (Articles 25-28)", "description": "Freedom of conscience and religion, freedom to manage religious affairs"},
+    {"name": "Cultural and Educational Rights (Articles 29-30)", "description": "Protection of interests of minorities, right of minorities to establish educational institutions"},
+    {"name": "Right to Constitutional Remedies (Article 32)", "description": "Right to move the Supreme Court for enforcement of Fundamental Rights"}
+]
+
+# Directive Principles grouped by ideology (Part IV)
+DIRECTIVE_CATEGORIES = [
+    {
+        "name": "Socialist Principles",
+        "articles": ["Article 38: State to secure a social order for the promotion of welfare of the people",
+                     "Article 39: Certain principles of policy to be followed by the State",
+                     "Article 39A: Equal justice and free legal aid"]
+    },
+    {
+        "name": "Gandhian Principles",
+        "articles": ["Article 40: Organization of village panchayats",
+                     "Article 43: Living wage, etc., for workers",
+                     "Article 48: Organization of agriculture and animal husbandry"]
+    },
+    {
+        "name": "Liberal-Intellectual Principles",
+        "articles": ["Article 44: Uniform civil code",
+                     "Article 45: Provision for early childhood care and education to children below the age of six years",
+                     "Article 50: Separation of judiciary from executive"]
+    },
+    {
+        "name": "International Relations",
+        "articles": ["Article 51: Promotion of international peace and security"]
+    }
+]
+
+# Bodies created directly by the Constitution
+CONSTITUTIONAL_BODIES = [
+    {
+        "name": "Election Commission of India",
+        "articles": "Article 324", 
+        "description": "Conducts elections to the Parliament, State Legislatures, and offices of President and Vice-President"
+    },
+    {
+        "name": "Union Public Service Commission",
+        "articles": "Articles 315-323", 
+        "description": "Conducts examinations for appointments to the All-India Services and Central Services"
+    },
+    {
+        "name": "State Public Service Commissions",
+        "articles": "Articles 315-323", 
+        "description": "Conducts examinations for appointments to the State Services"
+    },
+    {
+        "name": "Comptroller and Auditor General of India",
+        "articles": "Articles 148-151", 
+        "description": "Audits the accounts of the Union and State Governments"
+    },
+    {
+        "name": "Finance Commission",
+        "articles": "Articles 280-281", 
+        "description": "Recommends distribution of tax revenues between the Union and the States"
+    },
+    {
+        "name": "National Commission for SCs",
+        "articles": "Article 338", 
+        "description": "Monitors safeguards provided for Scheduled Castes"
+    },
+    {
+        "name": "National Commission for STs",
+        "articles": "Article 338A", 
+        "description": "Monitors safeguards provided for Scheduled Tribes"
+    },
+    {
+        "name": "Attorney General of India",
+        "articles": "Article 76", 
+        "description": "Chief legal advisor to the Government of India"
+    }
+]
+
+# Important amendments shown on the timeline
+AMENDMENT_HIGHLIGHTS = [
+    {"number": "1st", "year": "1951", "description": "Added Ninth Schedule to protect land reform laws"},
+    {"number": "7th", "year": "1956", "description": "Reorganized states on linguistic basis"},
+    {"number": "42nd", "year": "1976", "description": "Added 'socialist', 'secular', and inserted Fundamental Duties"},
+    {"number": "44th", "year": "1978", "description": "Restored right to property as a legal right"},
+    {"number": "52nd", "year": "1985", "description": "Added Tenth Schedule containing anti-defection provisions"},
+    {"number": "73rd", "year": "1992", "description": "Established Panchayati Raj institutions"},
+    {"number": "74th", "year": "1992", "description": "Established municipalities"},
+    {"number": "86th", "year": "2002", "description": "Made education a fundamental right for children aged 6-14"},
+    {"number": "101st", "year": "2016", "description": "Introduced Goods and Services Tax (GST)"},
+    {"number": "103rd", "year": "2019", "description": "Provided 10% reservation for Economically Weaker Sections"}
+]
+
+# Articles with a quick-access button in Search by Article
+POPULAR_ARTICLES = [
+    {"number": 14, "title": "Equality before law"},
+    {"number": 19, "title": "Protection of certain rights regarding freedom of speech, etc."},
+    {"number": 21, "title": "Protection of life and personal liberty"},
+    {"number": 32, "title": "Remedies for enforcement of rights conferred by this Part"},
+    {"number": 352, "title": "Proclamation of Emergency"},
+    {"number": 368, "title": "Power of Parliament to amend the Constitution and procedure therefor"}
+]
+
+# Topics offered under Expert Insights
+EXPERT_TOPICS = ["Federalism", "Secularism", "Judicial Review", "Parliamentary System", "Fundamental Rights vs Directive Principles"]
+
+# Article numbers and amendments reachable from the explorer's number inputs
+ARTICLE_RANGE = range(1, 396)
+AMENDMENT_RANGE = range(1, 107)
+
+# ------------------ Prompt Templates ------------------
+TIMELINE_PROMPT = "Provide a timeline of major events and amendments in the history of the Indian Constitution from its adoption to present day."
+
+def ordinal(n):
+    """Return 1st, 2nd, 3rd, 4th, ... 11th, 12th, 13th, ... 21st"""
+    if n % 10 == 1 and n != 11:
+        return f"{n}st"
+    if n % 10 == 2 and n != 12:
+        return f"{n}nd"
+    if n % 10 == 3 and n != 13:
+        return f"{n}rd"
+    return f"{n}th"
+
+def article_prompt(number):
+    return f"What does Article {number} of the Indian Constitution state? Explain in detail."
+
+def part_prompt(part_name):
+    return f"Explain {part_name} of the Indian Constitution in detail"
+
+def right_prompt(right_name):
+    return f"Explain {right_name} in detail as per the Indian Constitution"
+
+def body_prompt(body_name):
+    return f"Explain the powers, functions, and constitutional provisions related to {body_name} in detail"
+
+def amendment_prompt(number):
+    return f"What were the key provisions and significance of the {ordinal(number)} Amendment to the Indian Constitution?"
+
+def expert_prompt(topic):
+    return f"Provide an expert analysis on {topic} in the Indian Constitution. Include historical development, interpretations by courts, and modern relevance."
+
+def iter_prompts():
+    """Yield (key, prompt) for every canonical explorer prompt"""
+    for number in ARTICLE_RANGE:
+        yield f"article:{number}", article_prompt(number)
+    for part in PARTS:
+        yield f"part:{part['number']}", part_prompt(f"Part {part['number']}")
+    for right in FUNDAMENTAL_RIGHTS:
+        yield f"right:{right['name']}", right_prompt(right['name'])
+    for body in CONSTITUTIONAL_BODIES:
+        yield f"body:{body['name']}", body_prompt(body['name'])
+    for number in AMENDMENT_RANGE:
+        yield f"amendment:{number}", amendment_prompt(number)
+    yield "timeline", TIMELINE_PROMPT
+    for topic in EXPERT_TOPICS:
+        yield f"expert:{topic}", expert_prompt(topic)
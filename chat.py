@@ -1,18 +1,15 @@
+import itertools
+import uuid
 import streamlit as st
-import speech_recognition as sr
 from datetime import datetime
-from langchain.chains.retrieval_qa.base import RetrievalQA
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_pinecone import PineconeVectorStore
-from pinecone import Pinecone as pc
-from langchain_groq import ChatGroq
-from langchain_core.prompts import PromptTemplate
-import os
-
-# ------------------ API KEYS ------------------
-PINECONE_API_KEY = "Your pinecone api key"
-GROQ_API_KEY = "Your groq api key"
-os.environ["PINECONE_API_KEY"] = PINECONE_API_KEY
+import config
+import profiling
+import tracing
+from chat_history import ChatHistory
+from history_store import get_history_store
+from llm_scheduler import Busy
+from transcriber import NoSpeech, TranscriberBusy, get_transcriber
+from qa_engine import get_engine, start_warmup, engine_status
 
 # ------------------ Streamlit Setup ------------------
 st.set_page_config(layout="wide", page_title="Indian Constitution Chatbot", page_icon="📜")
@@ -80,102 +77,165 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # --------- Chat History ---------
+# A random user ID in the URL keeps a browser's history across refreshes
+user = st.query_params.get(config.HISTORY_USER_PARAM)
+if not user:
+    user = st.query_params[config.HISTORY_USER_PARAM] = uuid.uuid4().hex[:16]
+if "session_id" not in st.session_state:
+    st.session_state["session_id"] = uuid.uuid4().hex[:16]
+
+# Bounded in memory; older turns are spilled to disk and paged back in
 if "chat_history" not in st.session_state:
-    st.session_state["chat_history"] = []
-
-# --------- Load and Train Bot ---------
-def load_and_train():
-    embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-    pine = pc(api_key=PINECONE_API_KEY)
-    index_name = 'constitution'
-    docsearch = PineconeVectorStore.from_existing_index(index_name, embeddings)
-
-    prompt_template = """You are a knowledgeable assistant specialized in the Indian Constitution. ONLY use the information provided in the CONTEXT to answer the user's question.
-    - Do not rely on any external knowledge.
-    - If the answer is not found in the context, politely say you don't have enough information.
-    - Be accurate, clear, and concise.
-
-    Context:
-    {context}
-
-    User's Question:
-    {question}
-
-    Your Answer (based ONLY on the above context):
-    """
-
-    prompt = PromptTemplate(template=prompt_template, input_variables=["context", "question"])
-    llm = ChatGroq(model_name="llama3-70b-8192", api_key=GROQ_API_KEY, temperature=0.3)
-
-    qa = RetrievalQA.from_chain_type(
-        llm=llm,
-        chain_type="stuff",
-        retriever=docsearch.as_retriever(search_kwargs={"k": 12}),
-        return_source_documents=True,
-        chain_type_kwargs={"prompt": prompt}
-    )
-
-    st.session_state['qa'] = qa
-    st.success("✅ Chatbot is Ready!")
-
-# Load once
-if "qa" not in st.session_state:
-    with st.spinner("Setting up the Constitution Chatbot..."):
-        load_and_train()
-
-# --------- Microphone Handler ---------
-r = sr.Recognizer()
-
-def listen_and_convert():
-    with sr.Microphone() as source:
-        st.info("🎙️ Listening... Please speak.")
-        audio = r.listen(source)
-
+    history = ChatHistory()
+    for asked_at, source, question, answer in get_history_store().recent(user, config.CHAT_HISTORY_IN_MEMORY):
+        history.append(question, answer, source, asked_at=asked_at)
+    st.session_state["chat_history"] = history
+
+# --------- Warm Up Shared Bot ---------
+# The engine is built once per server process on a background thread, so the
+# page renders immediately and only a question has to wait for it.
+start_warmup()
+
+status = engine_status()
+if status["state"] == "warming":
+    st.info("⏳ Loading the Constitution knowledge base in the background. You can start typing.")
+elif status["state"] == "failed":
+    st.error(f"🔴 Could not set up the Chatbot: {status['error']}")
+
+# --------- Voice Handler ---------
+def transcribe_clip(clip):
+    """Transcribe a clip recorded in the browser with the local speech model"""
+    try:
+        with st.spinner("Transcribing your question..."):
+            text = get_transcriber().transcribe(clip, timeout=config.TRANSCRIBE_TIMEOUT_SECONDS)
+    except (TranscriberBusy, NoSpeech) as e:
+        st.warning(f"🎙️ {e}")
+        return None
+    except TimeoutError:
+        st.warning("🎙️ Transcription is taking too long. Please try again or type your question.")
+        return None
+    except Exception as e:
+        st.error(f"🔴 Could not transcribe the recording: {e}")
+        return None
+    st.success(f"Recognized: {text}")
+    return text
+
+# --------- Answer Handler ---------
+CACHED_CAPTION = "⚡ Answered instantly from a previous, similar question"
+
+def answer_question(question, source="typed"):
+    """Show the answer to a question (token by token when streaming) and record it"""
+    qa = get_engine()
+    store = get_history_store()
+    with tracing.trace("chat", input=source, question=question) as trace:
+        prior = None
+        if st.session_state.get("reuse_history", config.HISTORY_REUSE_ANSWERS):
+            with tracing.span("history_lookup"):
+                prior = store.find_prior(user, question, threshold=config.HISTORY_REUSE_SIMILARITY)
         try:
-            text = r.recognize_google(audio)
-            st.success(f"Recognized: {text}")
-            timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            return timestamp, text
-        except sr.UnknownValueError:
-            st.error("😕 Could not understand your speech.")
-            return None, None
-        except sr.RequestError as e:
-            st.error(f"🔴 Google Speech Recognition error: {e}")
-            return None, None
-
-# --------- Input Section ---------
-inputt = st.text_input("Type your Question:")
-
-col1, col2 = st.columns(2)
-
-with col1:
-    if st.button("Submit Typed Question"):
-        if inputt:
-            with st.spinner("Generating answer..."):
-                qa = st.session_state['qa']
-                result = qa.invoke(inputt)
+            if prior is not None:
+                tracing.annotate(cache="history")
+                answer = prior["answer"]
                 st.success("Here’s the answer:")
-                st.write(result['result'])
-                st.session_state['chat_history'].append({"question": inputt, "answer": result['result']})
-        else:
-            st.warning("Please type something!")
-
-with col2:
-    if st.button("🎙️ Speak Your Question"):
-        timestamp, spoken_text = listen_and_convert()
-        if spoken_text:
-            with st.spinner("Generating answer from your speech..."):
-                qa = st.session_state['qa']
-                result = qa.invoke(spoken_text)
+                st.write(answer)
+                asked = datetime.fromtimestamp(prior["asked_at"]).strftime("%d %b %Y")
+                st.caption(f"📚 From your history: you asked this on {asked}. "
+                           "Untick “Reuse answers from my history” to ask again.")
+            elif config.STREAM_ANSWERS:
+                stream = tracing.timed_stream(qa.stream("chat", question))
+                # Pull the first token before announcing the answer, so "busy" shows alone
+                first = next(stream, "")
                 st.success("Here’s the answer:")
-                st.write(result['result'])
-                st.session_state['chat_history'].append({"question": spoken_text, "answer": result['result']})
-
-# --------- Chat History Section ---------
-if st.session_state['chat_history']:
-    st.markdown("## 💬 Chat History")
-    with st.expander("View Previous Conversations", expanded=True):
-        for i, entry in enumerate(st.session_state['chat_history']):
-            st.write(f"**{i+1}. Question:** {entry['question']}")
-            st.write(f"**Answer:** {entry['answer']}")
-            st.divider()
+                answer = st.write_stream(itertools.chain([first], stream))
+                # The engine records on the trace whether the answer came from a cache
+                if trace.attrs.get("cache", "miss") != "miss":
+                    st.caption(CACHED_CAPTION)
+            else:
+                result = qa.invoke("chat", question)
+                with tracing.span("render"):
+                    answer = result['result']
+                    st.success("Here’s the answer:")
+                    st.write(answer)
+                    if result.get("cached"):
+                        st.caption(CACHED_CAPTION)
+        except Busy as e:
+            tracing.annotate(busy=e.reason)
+            st.warning(f"⏳ {e}")
+            return
+    st.session_state['chat_history'].append(question, answer, source)
+    st.session_state['chat_history_page'] = 0
+    if prior is None:
+        # Queued for the background writer; never waits on the disk
+        store.add(user, st.session_state["session_id"], question, answer, source)
+
+# --------- History Search ---------
+def show_history_search():
+    """Instant answers from the user's own past questions"""
+    query = st.text_input("🔎 Search my history", key="history_query")
+    if not query:
+        return
+    results = get_history_store().search(user, query, limit=config.HISTORY_SEARCH_RESULTS)
+    if not results:
+        st.caption("No earlier answers match that.")
+    for result in results:
+        asked = datetime.fromtimestamp(result["asked_at"]).strftime("%d %b %Y")
+        st.markdown(f"**{result['question']}** · {asked}  \n{result['snippet']}")
+        with st.expander("Full answer"):
+            st.write(result["answer"])
+
+# --------- History Pages ---------
+def turn_page(step):
+    history = st.session_state['chat_history']
+    page = st.session_state.get('chat_history_page', 0) + step
+    st.session_state['chat_history_page'] = min(max(page, 0), history.pages() - 1)
+
+@st.fragment
+def show_history():
+    """Draw one page of the history; paging reruns only this fragment"""
+    history = st.session_state['chat_history']
+    page = min(st.session_state.get('chat_history_page', 0), history.pages() - 1)
+    for number, (_, _, question, answer) in history.page(page):
+        st.write(f"**{number}. Question:** {question}")
+        st.write(f"**Answer:** {answer}")
+        st.divider()
+    if history.pages() > 1:
+        newer, position, older = st.columns([1, 2, 1])
+        newer.button("← Newer", on_click=turn_page, args=(-1,), disabled=page == 0)
+        position.caption(f"Page {page + 1} of {history.pages()} · {len(history)} questions")
+        older.button("Older →", on_click=turn_page, args=(1,), disabled=page == history.pages() - 1)
+
+# --------- Page Run ---------
+# Everything that reacts to input runs inside the opt-in profiler (?profile=1)
+with profiling.profiled("chat"):
+    # --------- Input Section ---------
+    inputt = st.text_input("Type your Question:")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        if st.button("Submit Typed Question"):
+            if inputt:
+                with st.spinner("Generating answer..."):
+                    answer_question(inputt)
+            else:
+                st.warning("Please type something!")
+
+    with col2:
+        clip = st.audio_input("🎙️ Speak Your Question", key="voice_clip")
+        # The recording stays on the widget across reruns; transcribe each clip once
+        if clip is not None and st.session_state.get("voice_clip_seen") != clip.file_id:
+            st.session_state["voice_clip_seen"] = clip.file_id
+            spoken_text = transcribe_clip(clip.getvalue())
+            if spoken_text:
+                with st.spinner("Generating answer from your speech..."):
+                    answer_question(spoken_text, source="voice")
+
+    st.checkbox("Reuse answers from my history", value=config.HISTORY_REUSE_ANSWERS, key="reuse_history",
+                help="Show your earlier answer at once when you ask the same question again")
+    show_history_search()
+
+    # --------- Chat History Section ---------
+    if len(st.session_state['chat_history']):
+        st.markdown("## 💬 Chat History")
+        with st.expander("View Previous Conversations", expanded=True):
+            show_history()
@@ -0,0 +1,77 @@
+# chat_history.py - Bounded per-session chat history with older turns spilled to disk
+#
+# The newest CHAT_HISTORY_IN_MEMORY turns stay in session_state as compact
+# (timestamp, source, question, answer) tuples. Older turns are appended to a
+# per-session JSON-lines file, and only their byte offsets (8 bytes each) stay
+# in memory, so any page can be read back with one seek. The chat page draws
+# one page at a time, so a rerun costs the same after 10 turns or 10,000.
+
+import itertools
+import json
+import logging
+import os
+import time
+import uuid
+import weakref
+from array import array
+from collections import deque
+
+import config
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+class ChatHistory:
+    """A session's question/answer turns, oldest first"""
+
+    def __init__(self, memory=config.CHAT_HISTORY_IN_MEMORY, directory=config.CHAT_HISTORY_DIR):
+        self.memory = memory
+        self.path = os.path.join(directory, f"{uuid.uuid4().hex}.jsonl")
+        self.recent = deque()
+        self.offsets = array("Q")
+        # The spill file goes away with the session that owns it
+        weakref.finalize(self, _remove, self.path)
+
+    def __len__(self):
+        return len(self.offsets) + len(self.recent)
+
+    def append(self, question, answer, source="typed", asked_at=None):
+        self.recent.append((asked_at or time.time(), source, question, answer))
+        while len(self.recent) > self.memory:
+            self._spill(self.recent.popleft())
+
+    def _spill(self, entry):
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "ab") as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write((json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8"))
+        except OSError as e:
+            # Keep the in-memory bound even if the disk is unavailable; the turn is lost
+            logging.getLogger(__name__).warning("Could not spill chat history: %s", e)
+            return
+        self.offsets.append(offset)
+
+    def entries(self, start, stop):
+        """Turns start..stop-1 (0 = oldest)"""
+        spilled = len(self.offsets)
+        turns = []
+        if start < spilled:
+            with open(self.path, "rb") as f:
+                f.seek(self.offsets[start])
+                for _ in range(min(stop, spilled) - start):
+                    turns.append(tuple(json.loads(f.readline())))
+        turns.extend(itertools.islice(self.recent, max(start - spilled, 0), max(stop - spilled, 0)))
+        return turns
+
+    def pages(self, size=config.CHAT_HISTORY_PAGE_SIZE):
+        return max(1, -(-len(self) // size))
+
+    def page(self, number, size=config.CHAT_HISTORY_PAGE_SIZE):
+        """Page `number` (0 = newest) as [(turn number, turn)], newest first"""
+        stop = max(len(self) - number * size, 0)
+        start = max(stop - size, 0)
+        return list(zip(range(stop, start, -1), reversed(self.entries(start, stop))))
@@ -0,0 +1,142 @@
+# config.py - Shared settings for the chat and explorer modules
+
+import os
+
+# ------------------ API KEYS ------------------
+PINECONE_API_KEY = os.environ.get("PINECONE_API_KEY", "Your pinecone api key")
+GROQ_API_KEY = os.environ.get("GROQ_API_KEY", "Your groq api key")
+
+# ------------------ Models and Index ------------------
+EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
+LLM_MODEL = "llama3-70b-8192"
+LLM_TEMPERATURE = 0.3
+INDEX_NAME = "constitution"
+TOP_K = 12
+# Query vectors kept in the process-wide embedding LRU (384 float32 = 1.5 KB each)
+EMBEDDING_CACHE_SIZE = 4096
+# "torch" runs sentence-transformers; "onnx" runs the exported model on onnxruntime
+# (create it once with `python embeddings.py export`)
+EMBEDDING_BACKEND = os.environ.get("LEGAL_EASE_EMBEDDING_BACKEND", "torch")
+ONNX_MODEL_DIR = os.environ.get("LEGAL_EASE_ONNX_MODEL_DIR", os.path.join("models", "all-MiniLM-L6-v2-onnx"))
+ONNX_QUANTIZED = True
+# Concurrent query embeddings are collected for up to EMBEDDING_BATCH_WAIT_MS and
+# run as one batched forward pass (0 disables micro-batching)
+EMBEDDING_BATCH_WAIT_MS = float(os.environ.get("LEGAL_EASE_EMBEDDING_BATCH_WAIT_MS", "5"))
+EMBEDDING_BATCH_MAX_SIZE = 32
+
+# ------------------ Answer Cache ------------------
+CACHE_DIR = os.environ.get("LEGAL_EASE_CACHE_DIR", ".cache")
+ANSWER_CACHE_PATH = os.path.join(CACHE_DIR, "answers.sqlite3")
+ANSWER_CACHE_MAX_ENTRIES = 5000
+ANSWER_CACHE_TTL_SECONDS = 7 * 24 * 3600
+# How often to re-read the index fingerprint so a rebuilt index invalidates the cache
+INDEX_VERSION_REFRESH_SECONDS = 300
+
+# ------------------ Semantic Cache ------------------
+# Free-form chat questions are matched against earlier paraphrases; the explorer's
+# templated prompts differ only by article number and use the exact-match cache.
+SEMANTIC_CACHE_PROFILES = ("chat",)
+SEMANTIC_CACHE_THRESHOLD = 0.93
+SEMANTIC_CACHE_CAPACITY = 2000
+
+# ------------------ Precomputed Answers ------------------
+# Written by `python precompute.py`; the explorer serves catalogue prompts from it
+PRECOMPUTED_PATH = os.path.join(CACHE_DIR, "precomputed.sqlite3")
+
+# ------------------ Chat History ------------------
+# Turns kept in session_state; older ones are spilled to a per-session file
+CHAT_HISTORY_IN_MEMORY = 50
+CHAT_HISTORY_PAGE_SIZE = 10
+CHAT_HISTORY_DIR = os.path.join(CACHE_DIR, "chat_history")
+# Every user's turns are also kept in SQLite (with full-text search) across refreshes.
+# Users are told apart by a random ID in the URL (?user=...).
+HISTORY_DB_PATH = os.path.join(CACHE_DIR, "history.sqlite3")
+HISTORY_USER_PARAM = "user"
+HISTORY_BATCH_SIZE = 64
+HISTORY_FLUSH_SECONDS = 0.5
+HISTORY_SEARCH_RESULTS = 5
+# Serve the user's earlier answer when a new question matches one this closely
+HISTORY_REUSE_ANSWERS = True
+HISTORY_REUSE_SIMILARITY = 0.8
+
+# ------------------ Prefetch ------------------
+# Start the explorer's answer as soon as a selection changes, before its button
+# is clicked; at most PREFETCH_MAX_RUNNING run at once across the process
+PREFETCH_ANSWERS = True
+PREFETCH_MAX_RUNNING = 2
+
+# ------------------ Voice Input ------------------
+# Clips recorded in the browser are transcribed locally by faster-whisper
+# (fetch the model once with `python transcriber.py download`)
+TRANSCRIBE_MODEL = os.environ.get("LEGAL_EASE_TRANSCRIBE_MODEL", "base.en")
+TRANSCRIBE_MODEL_DIR = os.environ.get("LEGAL_EASE_TRANSCRIBE_MODEL_DIR", os.path.join("models", "whisper"))
+TRANSCRIBE_LANGUAGE = "en"
+TRANSCRIBE_WORKERS = 2
+TRANSCRIBE_CPU_THREADS = 2
+TRANSCRIBE_QUEUE_SIZE = 8
+TRANSCRIBE_TIMEOUT_SECONDS = 60.0
+# Frames quieter than this RMS never count as speech when trimming silence
+VAD_MIN_RMS = 0.01
+
+# ------------------ Streaming ------------------
+# Render answers token by token as the LLM generates them
+STREAM_ANSWERS = True
+
+# ------------------ Vector Backend ------------------
+# "pinecone" queries the hosted index; "local" searches an in-process copy of it
+# (build it with `python local_index.py export` or the ingestion pipeline)
+VECTOR_BACKEND = os.environ.get("LEGAL_EASE_VECTOR_BACKEND", "pinecone")
+LOCAL_INDEX_DIR = os.environ.get("LEGAL_EASE_LOCAL_INDEX_DIR", "index")
+# Ids, model and fingerprint of what ingest.py last pushed to Pinecone
+PINECONE_MANIFEST_PATH = os.path.join(LOCAL_INDEX_DIR, "pinecone.json")
+# Article number -> exact source chunks, written by ingest.py into each index version
+ARTICLE_INDEX_FILE = "articles.json"
+# Amendment -> changed provisions and back, parsed from the footnotes by ingest.py
+AMENDMENT_INDEX_FILE = "amendments.json"
+# Articles whose text is sent with an amendment question (more falls back to vector search)
+AMENDMENT_CONTEXT_ARTICLES = 8
+
+# ------------------ Retrieval ------------------
+# "dense" uses vector search only; "hybrid" fuses it with the local BM25 index
+# (bm25.npz, written by ingest.py) and stuffs fewer, better chunks into the prompt
+RETRIEVAL_MODE = os.environ.get("LEGAL_EASE_RETRIEVAL_MODE", "dense")
+HYBRID_TOP_K = 6
+
+# ------------------ LLM Scheduling ------------------
+# Groq's per-minute limits for the model; requests beyond them queue by priority
+LLM_REQUESTS_PER_MINUTE = int(os.environ.get("LEGAL_EASE_LLM_RPM", "30"))
+LLM_TOKENS_PER_MINUTE = int(os.environ.get("LEGAL_EASE_LLM_TPM", "6000"))
+# Fraction of those limits the scheduler budgets for, leaving a margin for clock drift
+LLM_RATE_HEADROOM = 0.9
+# Share of that budget that bulk answers and background work (prefetch, precompute) may not spend
+LLM_INTERACTIVE_RESERVE = 0.25
+# Answer length assumed when budgeting tokens before the call
+LLM_EXPECTED_OUTPUT_TOKENS = 500
+LLM_QUEUE_SIZE = 32
+# Longest an interactive request may wait for capacity before "busy" is shown
+LLM_MAX_WAIT_SECONDS = 20.0
+# One pooled HTTP client is shared by every Groq call in the process
+LLM_MAX_CONNECTIONS = 20
+LLM_TIMEOUT_SECONDS = 60.0
+
+# ------------------ Tracing ------------------
+# One JSON line per answered question, rotated at TRACE_LOG_MAX_BYTES
+TRACE_LOG_PATH = os.path.join(CACHE_DIR, "traces.jsonl")
+TRACE_LOG_MAX_BYTES = 10 * 1024 * 1024
+TRACE_LOG_BACKUPS = 5
+# Recent samples per stage kept for the p50/p95/p99 aggregates
+TRACE_SAMPLES = 2000
+# Prometheus text endpoint (GET /metrics); port 0 disables it
+METRICS_HOST = os.environ.get("LEGAL_EASE_METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.environ.get("LEGAL_EASE_METRICS_PORT", "9464"))
+# The admin page stays locked until this is set and entered on the page
+ADMIN_PASSWORD = os.environ.get("LEGAL_EASE_ADMIN_PASSWORD", "")
+
+# ------------------ Profiling ------------------
+# Opt-in per page run: add ?profile=1 to the URL or arm it from the admin page.
+# Speedscope files (open at https://www.speedscope.app) are listed in the trace log.
+PROFILE_DIR = os.path.join(CACHE_DIR, "profiles")
+PROFILE_QUERY_PARAM = "profile"
+PROFILE_INTERVAL_MS = 5
+# Oldest profiles are deleted beyond this many
+PROFILE_KEEP = 50
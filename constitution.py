@@ -0,0 +1,152 @@
+# constitution.py - Structured table of every article for filtering without the LLM
+#
+# Article ids and Parts are listed in catalogue.py (PART_ARTICLES), as are the
+# Schedules and subject categories; titles come from the article index written
+# by ingest.py and are blank until the Constitution has been ingested. The table
+# is columnar: one list or array per field, rows in article order (21 < 21A <
+# 22), plus row indexes by Part and by category, so filters and article ranges
+# such as 243P-243ZG are answered with set intersections and two binary searches.
+
+import re
+import string
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+
+import catalogue
+from article_index import article_key, get_article_index, normalize_article_id
+
+def parse_range(text):
+    """Return (first, last) article ids from '243P-243ZG', '51A' or '5 to 11', or None"""
+    bounds = [normalize_article_id(bound) for bound in re.split(r"\s*(?:-|–|to)\s*", text.strip(), maxsplit=1)]
+    if not bounds or None in bounds:
+        return None
+    return bounds[0], bounds[-1]
+
+# Letter suffixes in article order: 243, 243A ... 243Z, 243ZA ... 243ZZ
+_SUFFIXES = [""] + list(string.ascii_uppercase) + ["Z" + letter for letter in string.ascii_uppercase]
+
+def expand_range(text):
+    """Article ids in a catalogue range: '243P-243ZG' by letter, '5-11' by number only"""
+    first, last = parse_range(text)
+    if first == last:
+        return [first]
+    (start, first_suffix), (end, last_suffix) = (re.match(r"(\d+)([A-Z]*)$", bound).groups() for bound in (first, last))
+    if start == end:
+        return [start + suffix for suffix in _SUFFIXES[_SUFFIXES.index(first_suffix):_SUFFIXES.index(last_suffix) + 1]]
+    return [str(number) for number in range(int(start), int(end) + 1)]
+
+def _catalogue_articles():
+    """Every article listed in catalogue.PART_ARTICLES with its Part, untitled unless omitted"""
+    articles = {}
+    for part, ranges in catalogue.PART_ARTICLES.items():
+        for text in ranges:
+            for article_id in expand_range(text):
+                title = "Omitted" if article_id in catalogue.OMITTED_ARTICLES else ""
+                articles[article_id] = {"title": title, "part": part}
+    return articles
+
+class ConstitutionTable:
+    """Column-oriented article table with Part, category and range indexes"""
+
+    def __init__(self, articles, titled=True):
+        rows = sorted(articles.items(), key=lambda item: article_key(item[0]))
+        self.titled = titled
+        self.ids = [article_id for article_id, _ in rows]
+        self.keys = [article_key(article_id) for article_id in self.ids]
+        self.titles = [entry.get("title", "") for _, entry in rows]
+        # Part numbers are stored once; each row keeps a one-byte code
+        self.part_names = [part["number"] for part in catalogue.PARTS]
+        codes = {part: i for i, part in enumerate(self.part_names)}
+        for _, entry in rows:
+            if entry.get("part") and entry["part"] not in codes:
+                codes[entry["part"]] = len(self.part_names)
+                self.part_names.append(entry["part"])
+        self.part_codes = array("B", (codes.get(entry.get("part"), 255) for _, entry in rows))
+        self.by_part = {}
+        for row, code in enumerate(self.part_codes):
+            if code != 255:
+                self.by_part.setdefault(self.part_names[code], array("H")).append(row)
+        self.by_category = {
+            name: array("H", sorted({row for text in ranges for row in self.range_rows(*parse_range(text))}))
+            for name, ranges in catalogue.ARTICLE_CATEGORIES.items()
+        }
+
+    def __len__(self):
+        return len(self.ids)
+
+    def range_rows(self, first, last):
+        """Row numbers of the articles from `first` to `last` inclusive"""
+        return range(bisect_left(self.keys, article_key(first)), bisect_right(self.keys, article_key(last)))
+
+    def filter(self, part=None, category=None, article_range=None):
+        """Row numbers matching every given filter, in article order"""
+        rows = None
+        if part:
+            rows = set(self.by_part.get(part, ()))
+        if category:
+            matching = self.by_category.get(category, ())
+            rows = set(matching) if rows is None else rows.intersection(matching)
+        if article_range:
+            bounds = parse_range(article_range)
+            matching = self.range_rows(*bounds) if bounds else ()
+            rows = set(matching) if rows is None else rows.intersection(matching)
+        return range(len(self.ids)) if rows is None else sorted(rows)
+
+    def row(self, row):
+        code = self.part_codes[row]
+        return {"article": self.ids[row], "title": self.titles[row],
+                "part": self.part_names[code] if code != 255 else ""}
+
+    def rows(self, rows):
+        return [self.row(row) for row in rows]
+
+    def get(self, article_id):
+        """Return {'article', 'title', 'part'} for an article id, or None"""
+        article_id = normalize_article_id(article_id)
+        if article_id is None:
+            return None
+        row = bisect_left(self.keys, article_key(article_id))
+        if row < len(self.ids) and self.ids[row] == article_id:
+            return self.row(row)
+        return None
+
+    def part_count(self, part):
+        return len(self.by_part.get(part, ()))
+
+    @classmethod
+    def from_article_index(cls, index):
+        """The catalogue's articles with the ingested titles and Parts, plus any ids it lacks"""
+        articles = _catalogue_articles()
+        for article_id, entry in index.articles.items():
+            listed = articles.get(article_id, {})
+            articles[article_id] = {"title": entry.get("title") or listed.get("title", ""),
+                                    "part": entry.get("part") or listed.get("part", "")}
+        return cls(articles)
+
+    @classmethod
+    def from_catalogue(cls):
+        return cls(_catalogue_articles(), titled=False)
+
+# ------------------ Process-wide Instance ------------------
+_shared = None
+_shared_lock = threading.Lock()
+
+def get_constitution():
+    """Return the process-wide article table, rebuilt once an ingested article index appears"""
+    global _shared
+    if _shared is None or not _shared.titled:
+        with _shared_lock:
+            if _shared is None or not _shared.titled:
+                index = get_article_index()
+                if index is not None:
+                    _shared = ConstitutionTable.from_article_index(index)
+                elif _shared is None:
+                    _shared = ConstitutionTable.from_catalogue()
+    return _shared
+
+def reload_constitution():
+    """Drop the process-wide table so the next access rebuilds it from the article index"""
+    global _shared
+    with _shared_lock:
+        _shared = None
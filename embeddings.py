@@ -0,0 +1,268 @@
+# embeddings.py - Embedding backends and wrappers shared by every session of the QA engine
+#
+# Two interchangeable backends produce all-MiniLM-L6-v2 vectors:
+#   torch - sentence-transformers through HuggingFaceEmbeddings (pulls in PyTorch)
+#   onnx  - the same model exported to ONNX, optionally int8-quantized, run with
+#           onnxruntime + tokenizers (no PyTorch at serving time)
+# The ONNX vectors stay compatible with an index embedded by the torch backend:
+# cosine similarity to the torch vector is >= 0.9999 for fp32 and >= 0.98 for
+# int8 (check with `python -m benchmarks.embeddings`).
+#
+# Query embeddings go through an LRU (CachedEmbeddings) and, on a miss, a
+# micro-batcher that turns concurrent single-query calls from many sessions
+# into one batched forward pass (`python -m benchmarks.batching`).
+#
+# Usage:
+#   python embeddings.py export   # one-off, needs torch + transformers + onnxruntime
+
+import argparse
+import inspect
+import os
+import queue
+import re
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import Future
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+import config
+import tracing
+
+class CachedEmbeddings(Embeddings):
+    """Bounded LRU cache of query embeddings in front of another embedder"""
+
+    def __init__(self, base, model_name, max_entries=4096):
+        self.base = base
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._vectors = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, text):
+        # MiniLM's tokenizer is uncased and ignores repeated whitespace
+        return (self.model_name, re.sub(r"\s+", " ", text).strip().lower())
+
+    def embed_query(self, text):
+        key = self._key(text)
+        with self._lock:
+            vector = self._vectors.get(key)
+            if vector is not None:
+                self._vectors.move_to_end(key)
+                self.hits += 1
+                return vector.tolist()
+            self.misses += 1
+
+        with tracing.span("embedding"):
+            vector = np.asarray(self.base.embed_query(text), dtype=np.float32)
+        with self._lock:
+            self._vectors[key] = vector
+            self._vectors.move_to_end(key)
+            while len(self._vectors) > self.max_entries:
+                self._vectors.popitem(last=False)
+        return vector.tolist()
+
+    def embed_documents(self, texts):
+        # Document batches come from ingestion and are not worth caching
+        return self.base.embed_documents(texts)
+
+    def stats(self):
+        """Return cached vector count, hits, misses and hit rate"""
+        lookups = self.hits + self.misses
+        stats = {
+            "entries": len(self._vectors),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+        if hasattr(self.base, "stats"):
+            stats["batching"] = self.base.stats()
+        return stats
+
+class MicroBatchingEmbeddings(Embeddings):
+    """Collects concurrent embed_query calls for a few milliseconds and runs them as one batch"""
+
+    def __init__(self, base, max_wait=0.005, max_batch_size=32):
+        self.base = base
+        self.max_wait = max_wait
+        self.max_batch_size = max_batch_size
+        self.batches = 0
+        self.requests = 0
+        self.batch_sizes = Counter()
+        self._waits = deque(maxlen=1000)
+        self._callers = 0
+        self._queue = queue.Queue()
+        self._worker = None
+        self._lock = threading.Lock()
+
+    def embed_query(self, text):
+        if self._worker is None:
+            with self._lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                    self._worker.start()
+        future = Future()
+        with self._lock:
+            self._callers += 1
+        try:
+            self._queue.put((text, future, time.perf_counter()))
+            return future.result()
+        finally:
+            with self._lock:
+                self._callers -= 1
+
+    def embed_documents(self, texts):
+        # Ingestion already sends large batches
+        return self.base.embed_documents(texts)
+
+    def _collect(self):
+        pending = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_wait
+        # Stop early once every caller currently waiting is in the batch, so a lone
+        # query is not held back for the whole window
+        while len(pending) < min(self.max_batch_size, self._callers):
+            remaining = deadline - time.perf_counter()
+            try:
+                pending.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return pending
+
+    def _run(self):
+        while True:
+            pending = self._collect()
+            started = time.perf_counter()
+            try:
+                vectors = self.base.embed_documents([text for text, _, _ in pending])
+            except Exception as exc:
+                for _, future, _ in pending:
+                    future.set_exception(exc)
+                continue
+            for (_, future, _), vector in zip(pending, vectors):
+                future.set_result(vector)
+            with self._lock:
+                self.batches += 1
+                self.requests += len(pending)
+                self.batch_sizes[len(pending)] += 1
+                self._waits.extend(started - queued for _, _, queued in pending)
+
+    def stats(self):
+        """Return batch counts, the batch-size histogram and time spent waiting for a batch"""
+        with self._lock:
+            waits = sorted(self._waits)
+            histogram = dict(sorted(self.batch_sizes.items()))
+        return {
+            "max_wait_ms": self.max_wait * 1000,
+            "max_batch_size": self.max_batch_size,
+            "batches": self.batches,
+            "requests": self.requests,
+            "mean_batch_size": self.requests / self.batches if self.batches else 0.0,
+            "batch_sizes": histogram,
+            "wait_p50_ms": waits[len(waits) // 2] * 1000 if waits else 0.0,
+            "wait_p95_ms": waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000 if waits else 0.0,
+        }
+
+class OnnxMiniLMEmbeddings(Embeddings):
+    """all-MiniLM-L6-v2 on onnxruntime: mean pooling + L2 normalization, like sentence-transformers"""
+
+    def __init__(self, model_dir, quantized=True, max_length=256, threads=None):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        model = "model.int8.onnx" if quantized else "model.onnx"
+        self.session = ort.InferenceSession(os.path.join(model_dir, model), options,
+                                            providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def _embed(self, texts):
+        encodings = self.tokenizer.encode_batch(list(texts))
+        ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": ids, "attention_mask": mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.zeros_like(ids)
+        hidden = self.session.run(None, feeds)[0]
+        summed = (hidden * mask[:, :, None]).sum(axis=1)
+        pooled = summed / np.clip(mask.sum(axis=1, keepdims=True), 1, None)
+        return pooled / np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+
+    def embed_query(self, text):
+        return self._embed([text])[0].tolist()
+
+    def embed_documents(self, texts):
+        return self._embed(texts).tolist() if texts else []
+
+def export_onnx(model_dir, model_name=config.EMBEDDING_MODEL, quantize=True):
+    """Export the sentence-transformer to ONNX (and an int8 copy) with its fast tokenizer"""
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModel, AutoTokenizer
+
+    os.makedirs(model_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    tokenizer.save_pretrained(model_dir)
+    model = AutoModel.from_pretrained(model_name).eval()
+
+    class Encoder(torch.nn.Module):
+        # Keyword arguments keep the export independent of forward()'s positional order
+        def __init__(self):
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_ids, attention_mask, token_type_ids):
+            return self.model(input_ids=input_ids, attention_mask=attention_mask,
+                              token_type_ids=token_type_ids).last_hidden_state
+
+    sample = tokenizer(["Article 21 of the Indian Constitution"], return_tensors="pt")
+    names = ["input_ids", "attention_mask", "token_type_ids"]
+    axes = {name: {0: "batch", 1: "sequence"} for name in names}
+    axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+    path = os.path.join(model_dir, "model.onnx")
+    # Newer torch defaults to the dynamo exporter; the TorchScript one handles dynamic_axes
+    legacy = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+    with torch.no_grad():
+        torch.onnx.export(Encoder().eval(), tuple(sample[name] for name in names), path, input_names=names,
+                          output_names=["last_hidden_state"], dynamic_axes=axes, opset_version=14, **legacy)
+    if quantize:
+        quantize_dynamic(path, os.path.join(model_dir, "model.int8.onnx"), weight_type=QuantType.QInt8)
+
+def build_embeddings(backend=None):
+    """Return the configured embedding backend behind the micro-batcher and query-embedding LRU"""
+    backend = backend or config.EMBEDDING_BACKEND
+    if backend == "onnx":
+        base = OnnxMiniLMEmbeddings(config.ONNX_MODEL_DIR, quantized=config.ONNX_QUANTIZED)
+        variant = "onnx-int8" if config.ONNX_QUANTIZED else "onnx"
+    else:
+        from langchain_community.embeddings import HuggingFaceEmbeddings
+
+        base = HuggingFaceEmbeddings(model_name=config.EMBEDDING_MODEL)
+        variant = "torch"
+    if config.EMBEDDING_BATCH_WAIT_MS > 0:
+        # Sessions asking at the same moment share one forward pass
+        base = MicroBatchingEmbeddings(base, max_wait=config.EMBEDDING_BATCH_WAIT_MS / 1000,
+                                       max_batch_size=config.EMBEDDING_BATCH_MAX_SIZE)
+    # Repeated prompts skip the MiniLM forward pass; shared by every session
+    return CachedEmbeddings(base, model_name=f"{config.EMBEDDING_MODEL}:{variant}",
+                            max_entries=config.EMBEDDING_CACHE_SIZE)
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the MiniLM embedder for the ONNX backend")
+    parser.add_argument("command", choices=["export"])
+    parser.add_argument("--dir", default=config.ONNX_MODEL_DIR, help="output directory")
+    parser.add_argument("--no-quantize", action="store_true", help="skip the int8 copy")
+    args = parser.parse_args()
+    export_onnx(args.dir, quantize=not args.no_quantize)
+    print(f"Exported {config.EMBEDDING_MODEL} to {args.dir}")
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,17 @@
 # explorer.py - Module 3: Constitution explorer for browsing different sections
 
+import uuid
 import streamlit as st
-import pandas as pd
-from langchain.chains.retrieval_qa.base import RetrievalQA
-from langchain_community.embeddings import HuggingFaceEmbeddings
-from langchain_pinecone import PineconeVectorStore
-from pinecone import Pinecone as pc
-from langchain_groq import ChatGroq
-from langchain_core.prompts import PromptTemplate
-import os
+import catalogue
+import config
+import profiling
+import tracing
+from amendment_index import amendment_documents, get_amendment_index
+from article_index import article_documents, get_article_index, normalize_article_id
+from constitution import get_constitution
+from llm_scheduler import BULK, Busy
+from prefetch import get_prefetcher
+from qa_engine import get_engine, is_ready, start_warmup, engine_status
 
 def app():
     # Set background and styling
@@ -18,19 +21,19 @@ def app():
     st.markdown("<h1 class='explorer-title'>📜 Constitution Explorer</h1>", unsafe_allow_html=True)
     st.markdown("<p class='subtitle'>Browse through different parts of the Indian Constitution</p>", unsafe_allow_html=True)
     
-    # Initialize QA system if not already done
-    if "qa" not in st.session_state:
-        with st.spinner("Setting up the Constitution Explorer..."):
-            initialize_qa_system()
+    # Warm up the shared QA system in the background; the page renders right away
+    initialize_qa_system()
     
     # Sidebar for navigation
     with st.sidebar:
+        show_engine_status()
         st.markdown("### Navigation")
         
         explorer_option = st.radio(
             "Select View",
             ["Parts Overview", "Fundamental Rights", "Directive Principles", 
-             "Constitutional Bodies", "Amendments", "Search by Article"]
+             "Constitutional Bodies", "Amendments", "Search by Article"],
+            key="explorer_view"
         )
     
     # Main content
@@ -204,48 +207,66 @@ def set_page_styling():
     )
 
 def initialize_qa_system():
-    """Initialize the QA system with LangChain and Pinecone"""
-    # Load API keys
-    PINECONE_API_KEY = "Your Pinecone api key"
-    GROQ_API_KEY = "Your groq api key"
-    os.environ["PINECONE_API_KEY"] = PINECONE_API_KEY
-    
-    # Initialize embeddings and vector store
-    embeddings = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
-    pine = pc(api_key=PINECONE_API_KEY)
-    
-    index_name = 'constitution'
-    docsearch = PineconeVectorStore.from_existing_index(index_name, embeddings)
-    
-    # Create prompt template for improved responses
-    prompt_template = """You are a knowledgeable assistant specialized in the Indian Constitution.
-    - Be accurate, clear, and concise.
-    - Format your answer with appropriate Markdown for readability.
-    - If relevant, cite specific Articles, Sections, or Parts of the Constitution.
-
-    Context:
-    {context}
-
-    User's Question:
-    {question}
-
-    Your Answer:
-    """
-    
-    prompt = PromptTemplate(template=prompt_template, input_variables=["context", "question"])
-    llm = ChatGroq(model_name="llama3-70b-8192", api_key=GROQ_API_KEY, temperature=0.3)
-    
-    # Create RetrievalQA chain
-    qa = RetrievalQA.from_chain_type(
-        llm=llm,
-        chain_type="stuff",
-        retriever=docsearch.as_retriever(search_kwargs={"k": 12}),
-        return_source_documents=True,
-        chain_type_kwargs={"prompt": prompt}
-    )
-    
-    st.session_state['qa'] = qa
-    st.success("✅ Explorer is Ready!")
+    """Start building the process-wide QA engine on a background thread"""
+    # The engine is built once per server process and shared by every session
+    start_warmup()
+
+def show_engine_status():
+    """Show whether the QA engine is still loading"""
+    status = engine_status()
+    if status["state"] == "ready":
+        st.success("✅ Explorer is Ready!")
+    elif status["state"] == "failed":
+        st.error(f"🔴 Could not set up the Explorer: {status['error']}")
+    else:
+        st.info("⏳ Loading the Constitution knowledge base...")
+
+def ask(question, docs=None, priority=None):
+    """Answer a question with the explorer's Markdown prompt profile"""
+    return get_engine().invoke("explorer", question, docs=docs, priority=priority)
+
+def stream_answer(question, docs=None, priority=None):
+    """Yield the explorer's answer as it is generated, for st.write_stream"""
+    with tracing.trace("explorer", view=st.session_state.get("explorer_view"), question=question):
+        if config.PREFETCH_ANSWERS and get_prefetcher().claim(session_id(), question):
+            # Already cached or being generated; the engine hands it over
+            tracing.annotate(prefetched=True)
+        try:
+            if config.STREAM_ANSWERS:
+                yield from tracing.timed_stream(get_engine().stream("explorer", question, docs=docs, priority=priority))
+            else:
+                yield from tracing.timed_stream([ask(question, docs=docs, priority=priority)['result']])
+        except Busy as e:
+            # Shed by the LLM scheduler: say so at once rather than after a long wait
+            tracing.annotate(busy=e.reason)
+            yield f"⏳ {e}"
+
+def session_id():
+    if "session_id" not in st.session_state:
+        st.session_state["session_id"] = uuid.uuid4().hex[:16]
+    return st.session_state["session_id"]
+
+def prefetch(widget, question, docs=None):
+    """Start the answer for a selection the user just changed, before its button is clicked"""
+    # A view's first render only shows the widget's default, which says nothing about interest
+    previous = st.session_state.get(f"prefetch_{widget}")
+    st.session_state[f"prefetch_{widget}"] = question
+    if previous is not None and previous != question and config.PREFETCH_ANSWERS and is_ready():
+        get_prefetcher().request(get_engine(), session_id(), "explorer", question, docs=docs)
+
+def prefetch_article(widget, question, *article_ids):
+    prefetch(widget, question, docs=article_documents(*article_ids))
+
+def show_amendment_history(history, label):
+    """Table of the amendments that changed a provision, straight from the amendment index"""
+    with st.expander(f"{label} ({len(history)})"):
+        st.dataframe([{"amendment": catalogue.ordinal(item["amendment"]), "year": item["year"],
+                       "article": item.get("article", ""), "change": item["action"]} for item in history],
+                     hide_index=True)
+
+def stream_article_answer(question, *article_ids):
+    """Answer a question about specific articles from their own text only"""
+    return stream_answer(question, docs=article_documents(*article_ids))
 
 def display_parts_overview():
     """Display an overview of all parts of the constitution"""
@@ -263,34 +284,8 @@ def display_parts_overview():
     st.markdown("</div>", unsafe_allow_html=True)
     
     # Parts data
-    parts_data = [
-        {"number": "I", "title": "The Union and its Territory", "articles": "1-4"},
-        {"number": "II", "title": "Citizenship", "articles": "5-11"},
-        {"number": "III", "title": "Fundamental Rights", "articles": "12-35"},
-        {"number": "IV", "title": "Directive Principles of State Policy", "articles": "36-51"},
-        {"number": "IVA", "title": "Fundamental Duties", "articles": "51A"},
-        {"number": "V", "title": "The Union", "articles": "52-151"},
-        {"number": "VI", "title": "The States", "articles": "152-237"},
-        {"number": "VII", "title": "The States in Part B of the First Schedule", "articles": "238 (Repealed)"},
-        {"number": "VIII", "title": "The Union Territories", "articles": "239-242"},
-        {"number": "IX", "title": "The Panchayats", "articles": "243-243O"},
-        {"number": "IXA", "title": "The Municipalities", "articles": "243P-243ZG"},
-        {"number": "IXB", "title": "The Co-operative Societies", "articles": "243ZH-243ZT"},
-        {"number": "X", "title": "The Scheduled and Tribal Areas", "articles": "244-244A"},
-        {"number": "XI", "title": "Relations between the Union and the States", "articles": "245-263"},
-        {"number": "XII", "title": "Finance, Property, Contracts and Suits", "articles": "264-300A"},
-        {"number": "XIII", "title": "Trade, Commerce and Intercourse within India", "articles": "301-307"},
-        {"number": "XIV", "title": "Services under the Union and the States", "articles": "308-323"},
-        {"number": "XIVA", "title": "Tribunals", "articles": "323A-323B"},
-        {"number": "XV", "title": "Elections", "articles": "324-329A"},
-        {"number": "XVI", "title": "Special Provisions for Certain Classes", "articles": "330-342"},
-        {"number": "XVII", "title": "Official Language", "articles": "343-351"},
-        {"number": "XVIII", "title": "Emergency Provisions", "articles": "352-360"},
-        {"number": "XIX", "title": "Miscellaneous", "articles": "361-367"},
-        {"number": "XX", "title": "Amendment of the Constitution", "articles": "368"},
-        {"number": "XXI", "title": "Temporary, Transitional and Special Provisions", "articles": "369-392"},
-        {"number": "XXII", "title": "Short Title, Commencement and Repeals", "articles": "393-395"}
-    ]
+    parts_data = catalogue.PARTS
+    table = get_constitution()
     
     # Display parts as interactive cards
     for part in parts_data:
@@ -298,11 +293,21 @@ def display_parts_overview():
             f"""
             <div class='part-card'>
                 <h3>Part {part['number']}: {part['title']}</h3>
-                <p><strong>Articles:</strong> {part['articles']}</p>
+                <p><strong>Articles:</strong> {part['articles']} ({table.part_count(part['number'])} articles)</p>
             </div>
             """, 
             unsafe_allow_html=True
         )
+
+    st.markdown("### Schedules")
+    amendments = get_amendment_index()
+    schedules = catalogue.SCHEDULES
+    if amendments is not None:
+        # Amendments that changed each Schedule, from the footnotes in its text
+        schedules = [dict(schedule, amendments=", ".join(dict.fromkeys(
+                         catalogue.ordinal(item["amendment"]) for item in amendments.schedule_history(schedule["number"]))))
+                     for schedule in schedules]
+    st.dataframe(schedules, hide_index=True)
         
     # Option to explore a specific part
     st.markdown("<div class='content-card'>", unsafe_allow_html=True)
@@ -312,15 +317,19 @@ def display_parts_overview():
         "Select a part to explore:",
         [f"Part {part['number']}: {part['title']}" for part in parts_data]
     )
+    part_name = selected_part.split(":")[0].strip()
+    prefetch("part", catalogue.part_prompt(part_name))
+    with st.expander(f"Articles in {part_name}"):
+        st.dataframe(table.rows(table.filter(part=part_name.split()[-1])), hide_index=True)
+    if amendments is not None:
+        show_amendment_history(amendments.part_history(part_name.split()[-1]), f"Amendments affecting {part_name}")
     
     if st.button("Explore Selected Part"):
-        part_name = selected_part.split(":")[0].strip()
         with st.spinner(f"Fetching information about {part_name}..."):
-            qa = st.session_state['qa']
-            result = qa.invoke(f"Explain {part_name} of the Indian Constitution in detail")
+            result = stream_answer(catalogue.part_prompt(part_name))
             
             st.markdown("<div class='article-result'>", unsafe_allow_html=True)
-            st.markdown(result['result'])
+            st.write_stream(result)
             st.markdown("</div>", unsafe_allow_html=True)
     
     st.markdown("</div>", unsafe_allow_html=True)
@@ -341,14 +350,7 @@ def display_fundamental_rights():
     st.markdown("</div>", unsafe_allow_html=True)
     
     # Fundamental rights data
-    rights = [
-        {"name": "Right to Equality (Articles 14-18)", "description": "Equality before law, prohibition of discrimination, equality of opportunity"},
-        {"name": "Right to Freedom (Articles 19-22)", "description": "Freedom of speech, assembly, association, movement, residence, and profession"},
-        {"name": "Right against Exploitation (Articles 23-24)", "description": "Prohibition of traffic in human beings and forced labor, prohibition of child labor"},
-        {"name": "Right to Freedom of Religion (Articles 25-28)", "description": "Freedom of conscience and religion, freedom to manage religious affairs"},
-        {"name": "Cultural and Educational Rights (Articles 29-30)", "description": "Protection of interests of minorities, right of minorities to establish educational institutions"},
-        {"name": "Right to Constitutional Remedies (Article 32)", "description": "Right to move the Supreme Court for enforcement of Fundamental Rights"}
-    ]
+    rights = catalogue.FUNDAMENTAL_RIGHTS
     
     # Display rights
     for right in rights:
@@ -370,14 +372,14 @@ def display_fundamental_rights():
         "Select a right to explore:",
         [right['name'] for right in rights]
     )
+    prefetch("right", catalogue.right_prompt(selected_right))
     
     if st.button("Learn More"):
         with st.spinner(f"Fetching information about {selected_right}..."):
-            qa = st.session_state['qa']
-            result = qa.invoke(f"Explain {selected_right} in detail as per the Indian Constitution")
+            result = stream_answer(catalogue.right_prompt(selected_right))
             
             st.markdown("<div class='article-result'>", unsafe_allow_html=True)
-            st.markdown(result['result'])
+            st.write_stream(result)
             st.markdown("</div>", unsafe_allow_html=True)
     
     st.markdown("</div>", unsafe_allow_html=True)
@@ -402,30 +404,7 @@ def display_directive_principles():
     st.markdown("</div>", unsafe_allow_html=True)
     
     # Directive principles categories
-    categories = [
-        {
-            "name": "Socialist Principles",
-            "articles": ["Article 38: State to secure a social order for the promotion of welfare of the people",
-                         "Article 39: Certain principles of policy to be followed by the State",
-                         "Article 39A: Equal justice and free legal aid"]
-        },
-        {
-            "name": "Gandhian Principles",
-            "articles": ["Article 40: Organization of village panchayats",
-                         "Article 43: Living wage, etc., for workers",
-                         "Article 48: Organization of agriculture and animal husbandry"]
-        },
-        {
-            "name": "Liberal-Intellectual Principles",
-            "articles": ["Article 44: Uniform civil code",
-                         "Article 45: Provision for early childhood care and education to children below the age of six years",
-                         "Article 50: Separation of judiciary from executive"]
-        },
-        {
-            "name": "International Relations",
-            "articles": ["Article 51: Promotion of international peace and security"]
-        }
-    ]
+    categories = catalogue.DIRECTIVE_CATEGORIES
     
     # Display categories
     for category in categories:
@@ -446,14 +425,14 @@ def display_directive_principles():
     st.markdown("### Get Information on a Specific Article")
     
     article_number = st.number_input("Enter Article Number (36-51)", min_value=36, max_value=51, value=39)
+    prefetch_article("directive_article", catalogue.article_prompt(article_number), article_number)
     
     if st.button("Get Details"):
         with st.spinner(f"Fetching information about Article {article_number}..."):
-            qa = st.session_state['qa']
-            result = qa.invoke(f"What does Article {article_number} of the Indian Constitution state? Explain in detail.")
+            result = stream_article_answer(catalogue.article_prompt(article_number), article_number)
             
             st.markdown("<div class='article-result'>", unsafe_allow_html=True)
-            st.markdown(result['result'])
+            st.write_stream(result)
             st.markdown("</div>", unsafe_allow_html=True)
     
     st.markdown("</div>", unsafe_allow_html=True)
@@ -474,48 +453,7 @@ def display_constitutional_bodies():
     st.markdown("</div>", unsafe_allow_html=True)
     
     # Constitutional bodies data
-    bodies = [
-        {
-            "name": "Election Commission of India",
-            "articles": "Article 324", 
-            "description": "Conducts elections to the Parliament, State Legislatures, and offices of President and Vice-President"
-        },
-        {
-            "name": "Union Public Service Commission",
-            "articles": "Articles 315-323", 
-            "description": "Conducts examinations for appointments to the All-India Services and Central Services"
-        },
-        {
-            "name": "State Public Service Commissions",
-            "articles": "Articles 315-323", 
-            "description": "Conducts examinations for appointments to the State Services"
-        },
-        {
-            "name": "Comptroller and Auditor General of India",
-            "articles": "Articles 148-151", 
-            "description": "Audits the accounts of the Union and State Governments"
-        },
-        {
-            "name": "Finance Commission",
-            "articles": "Articles 280-281", 
-            "description": "Recommends distribution of tax revenues between the Union and the States"
-        },
-        {
-            "name": "National Commission for SCs",
-            "articles": "Article 338", 
-            "description": "Monitors safeguards provided for Scheduled Castes"
-        },
-        {
-            "name": "National Commission for STs",
-            "articles": "Article 338A", 
-            "description": "Monitors safeguards provided for Scheduled Tribes"
-        },
-        {
-            "name": "Attorney General of India",
-            "articles": "Article 76", 
-            "description": "Chief legal advisor to the Government of India"
-        }
-    ]
+    bodies = catalogue.CONSTITUTIONAL_BODIES
     
     # Display bodies
     for body in bodies:
@@ -538,14 +476,14 @@ def display_constitutional_bodies():
         "Select a body to explore:",
         [body['name'] for body in bodies]
     )
+    prefetch("body", catalogue.body_prompt(selected_body))
     
     if st.button("Get Detailed Information"):
         with st.spinner(f"Fetching information about {selected_body}..."):
-            qa = st.session_state['qa']
-            result = qa.invoke(f"Explain the powers, functions, and constitutional provisions related to {selected_body} in detail")
+            result = stream_answer(catalogue.body_prompt(selected_body))
             
             st.markdown("<div class='article-result'>", unsafe_allow_html=True)
-            st.markdown(result['result'])
+            st.write_stream(result)
             st.markdown("</div>", unsafe_allow_html=True)
     
     st.markdown("</div>", unsafe_allow_html=True)
@@ -566,18 +504,7 @@ def display_amendments():
     st.markdown("</div>", unsafe_allow_html=True)
     
     # Important amendments data
-    amendments = [
-        {"number": "1st", "year": "1951", "description": "Added Ninth Schedule to protect land reform laws"},
-        {"number": "7th", "year": "1956", "description": "Reorganized states on linguistic basis"},
-        {"number": "42nd", "year": "1976", "description": "Added 'socialist', 'secular', and inserted Fundamental Duties"},
-        {"number": "44th", "year": "1978", "description": "Restored right to property as a legal right"},
-        {"number": "52nd", "year": "1985", "description": "Added Tenth Schedule containing anti-defection provisions"},
-        {"number": "73rd", "year": "1992", "description": "Established Panchayati Raj institutions"},
-        {"number": "74th", "year": "1992", "description": "Established municipalities"},
-        {"number": "86th", "year": "2002", "description": "Made education a fundamental right for children aged 6-14"},
-        {"number": "101st", "year": "2016", "description": "Introduced Goods and Services Tax (GST)"},
-        {"number": "103rd", "year": "2019", "description": "Provided 10% reservation for Economically Weaker Sections"}
-    ]
+    amendments = catalogue.AMENDMENT_HIGHLIGHTS
     
     # Display amendments in a timeline format
     st.markdown("<div class='timeline'>", unsafe_allow_html=True)
@@ -603,14 +530,28 @@ def display_amendments():
     st.markdown("### Explore a Specific Amendment")
     
     amendment_number = st.number_input("Enter Amendment Number", min_value=1, max_value=106, value=42)
+    # Explanations are grounded in the text of the articles the amendment changed
+    amendment_docs = amendment_documents(amendment_number)
+    prefetch("amendment", catalogue.amendment_prompt(amendment_number), docs=amendment_docs)
+
+    amendments = get_amendment_index()
+    if amendments is not None:
+        changes = amendments.changes(amendment_number)
+        year = amendments.year(amendment_number)
+        if changes:
+            st.markdown(f"**Provisions changed by the {catalogue.ordinal(amendment_number)} Amendment"
+                        f"{f' ({year})' if year else ''}:**")
+            st.dataframe([{"provision": f"{change['kind'].title()} {change['id']}", "part": change["part"],
+                           "change": change["action"]} for change in changes], hide_index=True)
+        else:
+            st.caption(f"No changes by the {catalogue.ordinal(amendment_number)} Amendment were found in the ingested text.")
     
     if st.button("Get Amendment Details"):
-        with st.spinner(f"Fetching information about the {amendment_number}{'st' if amendment_number % 10 == 1 and amendment_number != 11 else 'nd' if amendment_number % 10 == 2 and amendment_number != 12 else 'rd' if amendment_number % 10 == 3 and amendment_number != 13 else 'th'} Amendment..."):
-            qa = st.session_state['qa']
-            result = qa.invoke(f"What were the key provisions and significance of the {amendment_number}{'st' if amendment_number % 10 == 1 and amendment_number != 11 else 'nd' if amendment_number % 10 == 2 and amendment_number != 12 else 'rd' if amendment_number % 10 == 3 and amendment_number != 13 else 'th'} Amendment to the Indian Constitution?")
+        with st.spinner(f"Fetching information about the {catalogue.ordinal(amendment_number)} Amendment..."):
+            result = stream_answer(catalogue.amendment_prompt(amendment_number), docs=amendment_docs)
             
             st.markdown("<div class='article-result'>", unsafe_allow_html=True)
-            st.markdown(result['result'])
+            st.write_stream(result)
             st.markdown("</div>", unsafe_allow_html=True)
     
     st.markdown("</div>", unsafe_allow_html=True)
@@ -631,36 +572,55 @@ def search_by_article():
     st.markdown("</div>", unsafe_allow_html=True)
     
     # Article search
-    col1, col2 = st.columns([3, 1])
+    col1, col2, col3 = st.columns([3, 1, 1])
     
     with col1:
-        article_number = st.number_input("Enter Article Number", min_value=1, max_value=395, value=21)
+        article_input = st.text_input("Enter Article Number", value="21", placeholder="e.g. 21, 51A, 243ZH")
+        article_number = normalize_article_id(article_input)
+        if article_number is not None:
+            prefetch_article("article", catalogue.article_prompt(article_number), article_number)
     
     with col2:
         search_button = st.button("Search Article", use_container_width=True)
     
-    if search_button:
+    with col3:
+        text_button = st.button("Show Original Text", use_container_width=True)
+
+    amendments = get_amendment_index()
+    if amendments is not None and article_number is not None:
+        history = amendments.article_history(article_number)
+        if history:
+            show_amendment_history(history, f"Amendment history of Article {article_number}")
+        else:
+            st.caption(f"No amendments to Article {article_number} were found in the ingested text.")
+    
+    if (search_button or text_button) and article_number is None:
+        st.warning("Please enter a valid article number such as 21, 51A or 243ZH.")
+    elif search_button:
         with st.spinner(f"Fetching information about Article {article_number}..."):
-            qa = st.session_state['qa']
-            result = qa.invoke(f"What does Article {article_number} of the Indian Constitution state? Explain in detail.")
+            result = stream_article_answer(catalogue.article_prompt(article_number), article_number)
             
             st.markdown("<div class='article-result'>", unsafe_allow_html=True)
             st.markdown(f"## Article {article_number}")
-            st.markdown(result['result'])
+            st.write_stream(result)
+            st.markdown("</div>", unsafe_allow_html=True)
+    elif text_button:
+        # Verbatim text straight from the article index, no LLM call
+        index = get_article_index()
+        entry = index.get(article_number) if index else None
+        if entry is None:
+            st.info(f"The original text of Article {article_number} is not available in the local article index.")
+        else:
+            st.markdown("<div class='article-result'>", unsafe_allow_html=True)
+            st.markdown(f"## Article {article_number}: {entry['title']}")
+            st.text(index.text(article_number))
             st.markdown("</div>", unsafe_allow_html=True)
     
     # Popular articles
     st.markdown("<div class='content-card'>", unsafe_allow_html=True)
     st.markdown("### Popular Articles")
     
-    popular_articles = [
-        {"number": 14, "title": "Equality before law"},
-        {"number": 19, "title": "Protection of certain rights regarding freedom of speech, etc."},
-        {"number": 21, "title": "Protection of life and personal liberty"},
-        {"number": 32, "title": "Remedies for enforcement of rights conferred by this Part"},
-        {"number": 352, "title": "Proclamation of Emergency"},
-        {"number": 368, "title": "Power of Parliament to amend the Constitution and procedure therefor"}
-    ]
+    popular_articles = catalogue.POPULAR_ARTICLES
     
     # Display popular articles
     cols = st.columns(3)
@@ -668,12 +628,11 @@ def search_by_article():
         with cols[i % 3]:
             if st.button(f"Article {article['number']}: {article['title']}", key=f"popular_{article['number']}"):
                 with st.spinner(f"Fetching information about Article {article['number']}..."):
-                    qa = st.session_state['qa']
-                    result = qa.invoke(f"What does Article {article['number']} of the Indian Constitution state? Explain in detail.")
+                    result = stream_article_answer(catalogue.article_prompt(article['number']), article['number'])
                     
                     st.markdown("<div class='article-result'>", unsafe_allow_html=True)
                     st.markdown(f"## Article {article['number']}: {article['title']}")
-                    st.markdown(result['result'])
+                    st.write_stream(result)
                     st.markdown("</div>", unsafe_allow_html=True)
     
     st.markdown("</div>", unsafe_allow_html=True)
@@ -689,41 +648,50 @@ def search_by_article():
 
     if search_button and search_query:
         with st.spinner(f"Searching for '{search_query}'..."):
-            qa = st.session_state['qa']
-            search_result = qa.invoke(f"Search the Indian Constitution for information about: {search_query}. Provide relevant articles, interpretations, and historical context.")
+            search_result = stream_answer(f"Search the Indian Constitution for information about: {search_query}. Provide relevant articles, interpretations, and historical context.")
             
             st.markdown("### Search Results")
-            st.markdown(search_result['result'])
+            st.write_stream(search_result)
 
-    # Filters section
+    # Filters section: answered from the article table; the LLM only explains
     st.markdown("## Filter Articles")
-    col1, col2 = st.columns(2)
+    col1, col2, col3 = st.columns(3)
 
     with col1:
-        categories = ["All", "Fundamental Rights", "Directive Principles", "Citizenship", "Emergency Provisions", "Amendment Process"]
+        categories = ["All"] + list(catalogue.ARTICLE_CATEGORIES)
         selected_category = st.selectbox("Filter by Category:", categories)
 
     with col2:
-        parts = ["All"] + [f"Part {roman_numeral}" for roman_numeral in ["I", "II", "III", "IV", "IVA", "V", "VI", "VII", "VIII", "IX", "IXA", "X", "XI", "XII", "XIII", "XIV", "XV", "XVI", "XVII", "XVIII", "XIX", "XX"]]
+        parts = ["All"] + [f"Part {part['number']}" for part in catalogue.PARTS]
         selected_part = st.selectbox("Filter by Part:", parts)
 
-    filter_button = st.button("Apply Filters", key="filter_articles")
-
-    if filter_button:
-        with st.spinner("Filtering articles..."):
-            filter_query = f"List articles from the Indian Constitution"
+    with col3:
+        article_range = st.text_input("Article range:", placeholder="e.g. 243P-243ZG")
+
+    table = get_constitution()
+    rows = table.filter(part=selected_part.split()[-1] if selected_part != "All" else None,
+                        category=selected_category if selected_category != "All" else None,
+                        article_range=article_range or None)
+    st.markdown(f"### Filtered Articles ({len(rows)})")
+    if not table.titled:
+        st.caption("Article titles appear once the Constitution has been ingested (python ingest.py).")
+    st.dataframe(table.rows(rows), hide_index=True, height=300)
+
+    if st.button("Explain these articles", key="filter_articles"):
+        with st.spinner("Explaining the filtered articles..."):
+            filter_query = "Explain the articles of the Indian Constitution"
             
             if selected_category != "All":
                 filter_query += f" related to {selected_category}"
             
             if selected_part != "All":
                 filter_query += f" in {selected_part}"
+
+            if article_range:
+                filter_query += f" from Article {article_range}"
                 
-            qa = st.session_state['qa']
-            filter_result = qa.invoke(filter_query)
-            
-            st.markdown("### Filtered Articles")
-            st.markdown(filter_result['result'])
+            filter_result = stream_answer(filter_query)
+            st.write_stream(filter_result)
 
     # Comparison feature
     st.markdown("## Compare Articles")
@@ -741,11 +709,12 @@ def search_by_article():
 
     if compare_button and first_article and second_article:
         with st.spinner(f"Comparing Article {first_article} and Article {second_article}..."):
-            qa = st.session_state['qa']
-            comparison_result = qa.invoke(f"Compare Article {first_article} and Article {second_article} of the Indian Constitution. Explain their provisions, interpretations, and relationship to each other.")
+            comparison_result = stream_article_answer(
+                f"Compare Article {first_article} and Article {second_article} of the Indian Constitution. Explain their provisions, interpretations, and relationship to each other.",
+                first_article, second_article)
             
             st.markdown("### Comparison Results")
-            st.markdown(comparison_result['result'])
+            st.write_stream(comparison_result)
 
     # Constitution timeline/history section
     st.markdown("## Constitutional Timeline")
@@ -755,32 +724,31 @@ def search_by_article():
 
     if timeline_button:
         with st.spinner("Generating constitutional timeline..."):
-            qa = st.session_state['qa']
-            timeline_result = qa.invoke("Provide a timeline of major events and amendments in the history of the Indian Constitution from its adoption to present day.")
+            timeline_result = stream_answer(catalogue.TIMELINE_PROMPT, priority=BULK)
             
             st.markdown("### Constitutional History")
-            st.markdown(timeline_result['result'])
+            st.write_stream(timeline_result)
 
     # Expert insights section
     st.markdown("## Expert Insights")
     st.markdown("Get detailed analysis on constitutional topics from experts.")
 
-    expert_topics = ["Federalism", "Secularism", "Judicial Review", "Parliamentary System", "Fundamental Rights vs Directive Principles"]
+    expert_topics = catalogue.EXPERT_TOPICS
     selected_topic = st.selectbox("Select a topic for expert analysis:", expert_topics)
 
     expert_button = st.button("Get Expert Analysis", key="expert_insights")
 
     if expert_button:
         with st.spinner(f"Generating expert analysis on {selected_topic}..."):
-            qa = st.session_state['qa']
-            expert_result = qa.invoke(f"Provide an expert analysis on {selected_topic} in the Indian Constitution. Include historical development, interpretations by courts, and modern relevance.")
+            expert_result = stream_answer(catalogue.expert_prompt(selected_topic), priority=BULK)
             
             st.markdown(f"### Expert Analysis: {selected_topic}")
-            st.markdown(expert_result['result'])
+            st.write_stream(expert_result)
 
     # Add a footer
     st.markdown("---")
     st.markdown("© 2025 Indian Constitution Explorer | This application is for educational purposes only.")
 
 if __name__ == "__main__":
-    app()
+    with profiling.profiled("explorer"):
+        app()
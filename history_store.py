@@ -0,0 +1,191 @@
+# history_store.py - Durable chat history per user, with full-text search over past answers
+#
+# Every answered chat question is queued here and written by a background
+# thread in batched transactions, so persisting history never delays an answer.
+# Questions and answers are indexed with SQLite FTS5: chat.py searches a user's
+# past answers and can serve a previous answer again when the same question
+# comes back, instead of paying for another generation.
+
+import atexit
+import logging
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+
+import config
+import tracing
+from answer_cache import normalize_prompt
+from semantic_cache import references
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS turns (
+    id INTEGER PRIMARY KEY,
+    user TEXT NOT NULL,
+    session TEXT NOT NULL,
+    asked_at REAL NOT NULL,
+    source TEXT NOT NULL,
+    question TEXT NOT NULL,
+    answer TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS turns_user ON turns (user, asked_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS turns_fts USING fts5(
+    question, answer, content='turns', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS turns_insert AFTER INSERT ON turns BEGIN
+    INSERT INTO turns_fts (rowid, question, answer) VALUES (new.id, new.question, new.answer);
+END;
+CREATE TRIGGER IF NOT EXISTS turns_delete AFTER DELETE ON turns BEGIN
+    INSERT INTO turns_fts (turns_fts, rowid, question, answer) VALUES ('delete', old.id, old.question, old.answer);
+END;
+"""
+
+def _words(text):
+    return re.findall(r"\w+", normalize_prompt(text))
+
+def fts_query(text, column=None):
+    """Turn free text into an FTS5 query matching any of its words, best matches ranked first"""
+    words = dict.fromkeys(word for word in _words(text) if len(word) > 1)
+    if not words:
+        return None
+    query = " OR ".join(f'"{word}"' for word in words)
+    return f"{column} : ({query})" if column else query
+
+def similarity(a, b):
+    """Jaccard overlap of the two questions' words"""
+    a, b = set(_words(a)), set(_words(b))
+    return len(a & b) / len(a | b) if a | b else 0.0
+
+class HistoryStore:
+    """SQLite-backed history of every user's questions with a batched background writer"""
+
+    def __init__(self, path, batch_size=64, flush_seconds=0.5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.batches = 0
+        self.written = 0
+        self._queue = queue.Queue()
+        self._writer = None
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # One connection shared by the writer and the script threads, guarded by the lock
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def add(self, user, session, question, answer, source="typed"):
+        """Queue a turn for writing; returns immediately"""
+        self._queue.put((user, session, time.time(), source, question, answer))
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = threading.Thread(target=self._run, name="history-writer", daemon=True)
+                    self._writer.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # Collect whatever else arrives shortly after, and write it in one transaction
+            deadline = time.monotonic() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                with self._lock:
+                    self._conn.executemany(
+                        "INSERT INTO turns (user, session, asked_at, source, question, answer) "
+                        "VALUES (?, ?, ?, ?, ?, ?)", batch)
+                    self._conn.commit()
+                self.batches += 1
+                self.written += len(batch)
+            except sqlite3.Error as e:
+                logging.getLogger(__name__).warning("Could not save %d history turns: %s", len(batch), e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def flush(self):
+        """Wait until every queued turn has been written"""
+        if self._writer is not None:
+            self._queue.join()
+
+    def recent(self, user, limit):
+        """The user's last `limit` turns as (asked_at, source, question, answer), oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT asked_at, source, question, answer FROM turns WHERE user = ? "
+                "ORDER BY asked_at DESC LIMIT ?", (user, limit)).fetchall()
+        return rows[::-1]
+
+    def search(self, user, text, limit=5):
+        """The user's past turns best matching `text`, with a highlighted snippet of the answer"""
+        query = fts_query(text)
+        if query is None:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT turns.asked_at, turns.question, turns.answer, "
+                "snippet(turns_fts, 1, '**', '**', ' … ', 24) "
+                "FROM turns_fts JOIN turns ON turns.id = turns_fts.rowid "
+                "WHERE turns_fts MATCH ? AND turns.user = ? "
+                "ORDER BY bm25(turns_fts, 2.0, 1.0) LIMIT ?", (query, user, limit)).fetchall()
+        return [{"asked_at": asked_at, "question": question, "answer": answer, "snippet": snippet}
+                for asked_at, question, answer, snippet in rows]
+
+    def find_prior(self, user, question, threshold=0.8):
+        """The user's earlier answer to (nearly) the same question, or None"""
+        query = fts_query(question, column="question")
+        if query is None:
+            return None
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT turns.asked_at, turns.question, turns.answer "
+                "FROM turns_fts JOIN turns ON turns.id = turns_fts.rowid "
+                "WHERE turns_fts MATCH ? AND turns.user = ? "
+                "ORDER BY bm25(turns_fts) LIMIT 5", (query, user)).fetchall()
+        # Same wording about a different article, Part or amendment is a different question
+        mentioned = references(question)
+        rows = [row for row in rows if references(row[1]) == mentioned]
+        best = max(rows, key=lambda row: (similarity(question, row[1]), row[0]), default=None)
+        if best is None or similarity(question, best[1]) < threshold:
+            return None
+        return {"asked_at": best[0], "question": best[1], "answer": best[2]}
+
+    def stats(self):
+        """Stored turns, queued writes and batching of the writer"""
+        with self._lock:
+            turns = self._conn.execute("SELECT COUNT(*) FROM turns").fetchone()[0]
+        return {
+            "turns": turns,
+            "pending": self._queue.qsize(),
+            "batches": self.batches,
+            "mean_batch_size": self.written / self.batches if self.batches else 0.0,
+        }
+
+# ------------------ Process-wide Instance ------------------
+_shared = None
+_shared_lock = threading.Lock()
+
+def get_history_store():
+    """Return the process-wide history store"""
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = HistoryStore(config.HISTORY_DB_PATH, batch_size=config.HISTORY_BATCH_SIZE,
+                                       flush_seconds=config.HISTORY_FLUSH_SECONDS)
+                tracing.register_collector("history", _shared.stats)
+                # Don't lose the last batch when the server shuts down
+                atexit.register(_shared.flush)
+    return _shared
@@ -1,6 +1,7 @@
 # home.py - Landing page for the Constitution Chatbot
 
 import streamlit as st
+from qa_engine import start_warmup
 
 # ------------------ Page Configuration ------------------
 st.set_page_config(page_title="Legal Ease", page_icon="📜", layout="wide")
@@ -70,6 +71,9 @@ def add_custom_styles():
 # ------------------ Main App ------------------
 def app():
     add_custom_styles()
+
+    # Load the QA engine in the background so the chat and explorer pages are hot on arrival
+    start_warmup()
     
     # Title
     st.markdown("<h1 class='title-text'>LEGAL EASE 📜</h1>", unsafe_allow_html=True)
@@ -0,0 +1,285 @@
+# ingest.py - Incremental ingestion of the Constitution PDFs into the vector index
+#
+# Usage:
+#   python ingest.py data/constitution.pdf                  # update the local index
+#   python ingest.py data/*.pdf --target both               # ...and sync Pinecone
+#   python ingest.py data/constitution.txt --target pinecone
+#
+# Chunks are content-hashed, so re-ingesting after an amendment only embeds and
+# upserts the chunks whose text changed and deletes the ones that disappeared.
+# Each target is diffed against its own record: the local index against its
+# current version, Pinecone against pinecone.json (what was last pushed there,
+# or the ids Pinecone lists when there is no record yet). Stored vectors are only
+# reused when they were made by the current embedding model. Each index version
+# also receives the article-number index (articles.json) used for direct lookups,
+# the amendment index (amendments.json) parsed from the amendment footnotes and
+# the BM25 keyword index (bm25.npz) used for hybrid retrieval.
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+
+import numpy as np
+
+import config
+from amendment_index import AmendmentIndex
+from article_index import ArticleIndex, article_key
+from bm25 import BM25Index
+from local_index import LocalVectorIndex, content_fingerprint, read_info
+
+CHUNK_CHARS = 1500
+EMBED_BATCH_SIZE = 128
+UPSERT_BATCH_SIZE = 100
+
+SCHEDULE_NAMES = ["FIRST", "SECOND", "THIRD", "FOURTH", "FIFTH", "SIXTH",
+                  "SEVENTH", "EIGHTH", "NINTH", "TENTH", "ELEVENTH", "TWELFTH"]
+
+PART_RE = re.compile(r"^PART\s+([IVXL]+[A-C]?)\s*$")
+SCHEDULE_RE = re.compile(r"^(" + "|".join(SCHEDULE_NAMES) + r")\s+SCHEDULE\b", re.IGNORECASE)
+# "21. Protection of life...", "1[21A. Right to education.—", "[243ZH. Definitions.—"
+ARTICLE_RE = re.compile(r"^(?:\d+\s*\[|\[)?(\d{1,3}[A-Z]{0,2})\.\s*(.*)$")
+# Amendment footnotes: "1. Ins. by the Constitution (Eighty-sixth Amendment) Act, 2002"
+FOOTNOTE_RE = re.compile(r"^(Ins|Subs|Omitted|Added|Rep|Renumbered|The words|Cl)\b\.?", re.IGNORECASE)
+
+# ------------------ Parsing ------------------
+def extract_text(path):
+    """Return the text of a PDF or cleaned .txt file"""
+    if path.lower().endswith(".pdf"):
+        from pypdf import PdfReader
+
+        return "\n".join(page.extract_text() or "" for page in PdfReader(path).pages)
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+def split_sections(text, source):
+    """Split the Constitution text into preamble, article and schedule sections with metadata"""
+    sections = []
+    meta = {"source": source, "part": "", "part_title": "", "article": "", "title": "Preamble", "schedule": ""}
+    lines = []
+    current_article = (0, 0, "")
+    expect_part_title = False
+
+    def flush():
+        body = "\n".join(lines).strip()
+        if body:
+            sections.append((dict(meta), body))
+        lines.clear()
+
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line:
+            continue
+        if expect_part_title:
+            meta["part_title"] = line.title()
+            expect_part_title = False
+            lines.append(line)
+            continue
+
+        schedule = SCHEDULE_RE.match(line)
+        if schedule:
+            flush()
+            meta.update(part="", part_title="", article="", schedule=schedule.group(1).title(),
+                        title=f"{schedule.group(1).title()} Schedule")
+            lines.append(line)
+            continue
+
+        part = PART_RE.match(line)
+        if part and not meta["schedule"]:
+            flush()
+            meta.update(part=part.group(1), part_title="", article="", title="")
+            expect_part_title = True
+            lines.append(line)
+            continue
+
+        article = ARTICLE_RE.match(line)
+        if article and not meta["schedule"]:
+            key = article_key(article.group(1))
+            # Footnotes and list items also start with "N." - only accept a later article number
+            if current_article < key and not FOOTNOTE_RE.match(article.group(2)):
+                flush()
+                current_article = key
+                title = re.split(r"\.?\s*[—–-]{1,2}", article.group(2), maxsplit=1)[0].strip(" .")
+                meta.update(article=article.group(1), title=title)
+        lines.append(line)
+    flush()
+    return sections
+
+def chunk_sections(sections, max_chars=CHUNK_CHARS):
+    """Split long sections on line boundaries into chunks of at most `max_chars`"""
+    chunks = []
+    for meta, body in sections:
+        piece, seq = [], 0
+        size = 0
+        for line in body.split("\n"):
+            if piece and size + len(line) > max_chars:
+                chunks.append(_chunk(meta, "\n".join(piece), seq))
+                piece, size, seq = [], 0, seq + 1
+            piece.append(line)
+            size += len(line) + 1
+        if piece:
+            chunks.append(_chunk(meta, "\n".join(piece), seq))
+    return chunks
+
+def _chunk(meta, text, seq):
+    metadata = dict(meta, chunk=seq)
+    heading = f"Article {meta['article']}" if meta["article"] else meta["title"]
+    if meta["part"]:
+        heading = f"Part {meta['part']}, {heading}"
+    text = f"[{heading}]\n{text}" if heading else text
+    # The id is a content hash: unchanged chunks keep their id across re-ingestion
+    chunk_id = hashlib.sha1((text + repr(sorted(metadata.items()))).encode("utf-8")).hexdigest()[:24]
+    return {"id": chunk_id, "text": text, "metadata": metadata}
+
+# ------------------ Index Maintenance ------------------
+def load_previous(directory):
+    if read_info(directory) is not None:
+        return LocalVectorIndex.load(directory, mmap=False)
+    return None
+
+def load_manifest(path):
+    """What the last ingestion pushed to Pinecone: {'index', 'model', 'fingerprint', 'ids'}"""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def save_manifest(path, manifest):
+    # Pinecone is synced before the local index is built, so the directory may not exist yet
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+def embed_in_batches(embeddings, texts, batch_size=EMBED_BATCH_SIZE):
+    vectors = []
+    for start in range(0, len(texts), batch_size):
+        vectors.extend(embeddings.embed_documents(texts[start:start + batch_size]))
+    return np.asarray(vectors, dtype=np.float32)
+
+def pinecone_ids(index):
+    """Every vector id stored in a Pinecone index"""
+    return {chunk_id for page in index.list() for chunk_id in page}
+
+def sync_pinecone(chunks, vectors, manifest_path, model_name, index_name=config.INDEX_NAME, log=print):
+    """Make the Pinecone index hold exactly `chunks`: upsert what it lacks, delete what is stale"""
+    from pinecone import Pinecone
+
+    index = Pinecone(api_key=config.PINECONE_API_KEY).Index(index_name)
+    manifest = load_manifest(manifest_path)
+    if manifest is None or manifest.get("index") != index_name:
+        # No record of this index yet (e.g. the original upload): ask Pinecone what it holds
+        stored = pinecone_ids(index)
+    else:
+        stored = set(manifest["ids"])
+    if manifest is None or manifest.get("model") != model_name:
+        # Vectors from another embedding model are not comparable; replace them all
+        upsert = list(range(len(chunks)))
+    else:
+        upsert = [i for i, chunk in enumerate(chunks) if chunk["id"] not in stored]
+    current_ids = {chunk["id"] for chunk in chunks}
+    removed = sorted(stored - current_ids)
+    log(f"Pinecone: {len(upsert)} to upsert, {len(removed)} to delete")
+
+    records = [
+        {"id": chunks[i]["id"], "values": vectors[i].tolist(),
+         # PineconeVectorStore reads the chunk text from the "text" metadata key
+         "metadata": dict(chunks[i]["metadata"], text=chunks[i]["text"])}
+        for i in upsert
+    ]
+    for start in range(0, len(records), UPSERT_BATCH_SIZE):
+        index.upsert(vectors=records[start:start + UPSERT_BATCH_SIZE])
+    for start in range(0, len(removed), 1000):
+        index.delete(ids=removed[start:start + 1000])
+    save_manifest(manifest_path, {
+        "index": index_name,
+        "model": model_name,
+        "fingerprint": content_fingerprint([c["id"] for c in chunks], [c["text"] for c in chunks]),
+        "ids": sorted(current_ids),
+    })
+    return len(upsert), len(removed)
+
+def ingest(paths, embeddings, index_dir=config.LOCAL_INDEX_DIR, target="local",
+           model_name=config.EMBEDDING_MODEL, log=print):
+    """Parse, chunk and embed the documents, touching only new or changed chunks in each target"""
+    started = time.perf_counter()
+    chunks = []
+    for path in paths:
+        chunks.extend(chunk_sections(split_sections(extract_text(path), os.path.basename(path))))
+    # Identical boilerplate (e.g. repeated headings) would otherwise collide on id
+    chunks = list({chunk["id"]: chunk for chunk in chunks}.values())
+    if not chunks:
+        # Syncing an empty parse would delete the whole index
+        raise ValueError(f"No text could be extracted from {', '.join(paths)}")
+
+    # The local index is also the vector cache: unchanged chunks reuse its
+    # embeddings, unless they were made by a different model
+    previous = load_previous(index_dir)
+    if previous is not None and previous.info.get("model") != model_name:
+        log(f"Local index was embedded with {previous.info.get('model')}; re-embedding every chunk")
+        previous = None
+    old_rows = {chunk_id: row for row, chunk_id in enumerate(previous.ids)} if previous else {}
+    added = [chunk for chunk in chunks if chunk["id"] not in old_rows]
+    current_ids = {chunk["id"] for chunk in chunks}
+    removed = [chunk_id for chunk_id in old_rows if chunk_id not in current_ids]
+    log(f"{len(chunks)} chunks: {len(added)} new or changed, {len(removed)} stale, "
+        f"{len(chunks) - len(added)} unchanged")
+
+    new_vectors = embed_in_batches(embeddings, [chunk["text"] for chunk in added])
+    new_rows = {chunk["id"]: i for i, chunk in enumerate(added)}
+
+    dimension = new_vectors.shape[1] if len(added) else previous.vectors.shape[1]
+    vectors = np.empty((len(chunks), dimension), dtype=np.float32)
+    for i, chunk in enumerate(chunks):
+        if chunk["id"] in new_rows:
+            vectors[i] = new_vectors[new_rows[chunk["id"]]]
+        else:
+            vectors[i] = previous.vectors[old_rows[chunk["id"]]]
+
+    summary = {}
+    if target in ("pinecone", "both"):
+        # Pinecone is diffed against its own manifest, not the local index
+        upserted, deleted = sync_pinecone(chunks, vectors, os.path.join(index_dir, "pinecone.json"), model_name, log=log)
+        summary.update(pinecone_upserted=upserted, pinecone_deleted=deleted)
+    ids, texts = [c["id"] for c in chunks], [c["text"] for c in chunks]
+    articles = ArticleIndex.from_chunks(chunks)
+    amendments = AmendmentIndex.from_chunks(chunks)
+    # The keyword index is cheap to rebuild in full (well under a second)
+    bm25 = BM25Index.build(ids, texts)
+    index = LocalVectorIndex.build(index_dir, ids, texts, [c["metadata"] for c in chunks], vectors,
+                                   model_name=model_name,
+                                   artifacts={config.ARTICLE_INDEX_FILE: articles.save,
+                                              config.AMENDMENT_INDEX_FILE: amendments.save,
+                                              "bm25.npz": bm25.save})
+    summary.update({
+        "chunks": len(chunks),
+        "added": len(added),
+        "removed": len(removed),
+        "articles": len(articles),
+        "amendments": len(amendments),
+        "fingerprint": index.fingerprint,
+        "seconds": round(time.perf_counter() - started, 2),
+    })
+    log(f"Index version {index.fingerprint} written to {index_dir} in {summary['seconds']}s")
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest Constitution PDFs into the vector index")
+    parser.add_argument("paths", nargs="+", help="cleaned Constitution PDFs or .txt files")
+    parser.add_argument("--target", choices=["local", "pinecone", "both"], default="local")
+    parser.add_argument("--index-dir", default=config.LOCAL_INDEX_DIR)
+    args = parser.parse_args()
+
+    from embeddings import build_embeddings
+
+    try:
+        ingest(args.paths, build_embeddings(), index_dir=args.index_dir, target=args.target)
+    except ValueError as e:
+        parser.error(str(e))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+# llm_scheduler.py - Admission control in front of the Groq LLM
+#
+# Groq enforces per-minute limits on requests and tokens. Every generation asks
+# the scheduler for one request and its estimated tokens first; requests wait in
+# a bounded priority queue until both token buckets allow them, so the provider
+# never sees a burst it would reject. The buckets are sized a little below the
+# provider's limits (`headroom`): refill timing and the provider's own window
+# never line up exactly, and a bucket at exactly the limit still draws 429s. When the queue is full, or the wait would
+# be too long, the request is shed with Busy and the user sees a "try again"
+# message straight away instead of an error or a long hang. A share of both
+# buckets (`reserve`) is kept for interactive and browsing requests: bulk and
+# background work is only admitted if it leaves the reserve untouched, and work
+# too large to ever fit beside it is shed at once.
+
+import heapq
+import itertools
+import threading
+import time
+from collections import Counter, deque
+
+# ------------------ Priorities ------------------
+INTERACTIVE = 0   # typed or spoken chat questions
+BROWSE = 1        # explorer buttons and searches
+BULK = 2          # long Expert Insights and Timeline answers
+BACKGROUND = 3    # offline precomputation; waits as long as it takes
+
+BUSY_MESSAGE = "Legal Ease is answering a lot of questions right now. Please try again in a minute."
+
+class Busy(Exception):
+    """Raised when a request is shed instead of queued"""
+
+    def __init__(self, reason):
+        super().__init__(BUSY_MESSAGE)
+        self.reason = reason
+
+def estimate_tokens(prompt, expected_output_tokens):
+    """Rough token count of a prompt plus its answer (about four characters per token)"""
+    return len(prompt) // 4 + expected_output_tokens
+
+class TokenBucket:
+    """Holds up to `limit` units and refills continuously at `limit` per `period` seconds"""
+
+    def __init__(self, limit, period=60.0):
+        self.capacity = float(limit)
+        self.rate = limit / period
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount, now):
+        """Seconds until `amount` can be taken"""
+        self._refill(now)
+        return max(0.0, (amount - self.level) / self.rate)
+
+    def take(self, amount):
+        self.level -= amount
+
+    def give(self, amount):
+        self.level = min(self.capacity, self.level + amount)
+
+class LLMScheduler:
+    """Token-bucket rate limits on requests and tokens with a bounded priority queue"""
+
+    def __init__(self, requests_per_minute, tokens_per_minute, max_queue=32, max_wait=20.0, period=60.0,
+                 headroom=0.9, reserve=0.25):
+        # `period` only changes for time-compressed benchmarks
+        self.requests = TokenBucket(requests_per_minute * headroom, period)
+        self.tokens = TokenBucket(tokens_per_minute * headroom, period)
+        self.reserve = reserve
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.admitted = Counter()
+        self.shed = Counter()
+        self._waits = deque(maxlen=1000)
+        self._queue = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+
+    def ticket(self, priority=BROWSE):
+        """A place in the queue for acquire(); promote() can raise its priority while it waits"""
+        # [priority, arrival, evicted, deadline]; ordering only ever compares the first two
+        return [priority, next(self._sequence), False, None]
+
+    def acquire(self, tokens, priority=BROWSE, ticket=None):
+        """Block until one request and `tokens` tokens are available; raise Busy if shed"""
+        # A single prompt larger than a minute's budget would otherwise never fit
+        tokens = min(tokens, self.tokens.capacity)
+        started = time.monotonic()
+        if ticket is None:
+            ticket = self.ticket(priority)
+        with self._condition:
+            if ticket[3] is None and ticket[0] < BACKGROUND:
+                ticket[3] = started + self.max_wait
+            if len(self._queue) >= self.max_queue:
+                worst = max(self._queue)
+                if worst[:2] < ticket[:2]:
+                    self.shed["queue_full"] += 1
+                    raise Busy("queue_full")
+                # Make room by shedding the lowest-priority, most recent waiter
+                worst[2] = True
+                self._remove(worst)
+            heapq.heappush(self._queue, ticket)
+            while True:
+                if ticket[2]:
+                    self.shed["evicted"] += 1
+                    raise Busy("evicted")
+                now = time.monotonic()
+                deadline = ticket[3]
+                timeout = None if deadline is None else deadline - now
+                if self._queue[0] is ticket:
+                    # Read at the head of the queue: a follower may have promoted the ticket meanwhile
+                    floor = self.reserve if ticket[0] >= BULK else 0.0
+                    needed_requests = 1 + floor * self.requests.capacity
+                    needed_tokens = tokens + floor * self.tokens.capacity
+                    if needed_requests > self.requests.capacity or needed_tokens > self.tokens.capacity:
+                        self._remove(ticket)
+                        self.shed["reserve"] += 1
+                        raise Busy("reserve")
+                    delay = max(self.requests.delay(needed_requests, now), self.tokens.delay(needed_tokens, now))
+                    if delay == 0:
+                        heapq.heappop(self._queue)
+                        self.requests.take(1)
+                        self.tokens.take(tokens)
+                        self.admitted[ticket[0]] += 1
+                        self._waits.append(now - started)
+                        self._condition.notify_all()
+                        return tokens
+                    if deadline is not None and now + delay > deadline:
+                        # Fail fast: the buckets will not refill before the deadline
+                        self._remove(ticket)
+                        self.shed["timeout"] += 1
+                        raise Busy("timeout")
+                    timeout = delay
+                elif timeout is not None and timeout <= 0:
+                    self._remove(ticket)
+                    self.shed["timeout"] += 1
+                    raise Busy("timeout")
+                self._condition.wait(timeout)
+
+    def promote(self, ticket, priority):
+        """Raise the priority of a queued (or about to queue) request, e.g. a prefetch a user now waits on"""
+        with self._condition:
+            if priority >= ticket[0]:
+                return
+            ticket[0] = priority
+            if ticket[3] is None and priority < BACKGROUND:
+                # Whoever waits now expects an answer or "busy" within max_wait
+                ticket[3] = time.monotonic() + self.max_wait
+            heapq.heapify(self._queue)
+            self._condition.notify_all()
+
+    def settle(self, estimated, actual):
+        """Correct the token bucket once the real usage of an admitted request is known"""
+        with self._condition:
+            if actual < estimated:
+                self.tokens.give(estimated - actual)
+            else:
+                self.tokens.take(actual - estimated)
+            self._condition.notify_all()
+
+    def _remove(self, ticket):
+        self._queue.remove(ticket)
+        heapq.heapify(self._queue)
+        self._condition.notify_all()
+
+    def stats(self):
+        """Return queue depth, admitted and shed counts, wait p50/p95 and bucket levels"""
+        with self._condition:
+            now = time.monotonic()
+            self.requests.delay(0, now)
+            self.tokens.delay(0, now)
+            waits = sorted(self._waits)
+            return {
+                "queued": len(self._queue),
+                "admitted": dict(self.admitted),
+                "shed": dict(self.shed),
+                "wait_p50": waits[len(waits) // 2] if waits else 0.0,
+                "wait_p95": waits[min(len(waits) - 1, int(len(waits) * 0.95))] if waits else 0.0,
+                "requests_available": self.requests.level,
+                "tokens_available": self.tokens.level,
+            }
@@ -0,0 +1,218 @@
+# local_index.py - In-process vector index over the Constitution chunks
+#
+# Each build of the index is a version directory with three files:
+#   vectors.npy   - float32 matrix of L2-normalized chunk embeddings (memory-mapped)
+#   chunks.jsonl  - one {"id", "text", "metadata"} record per matrix row
+#   index.json    - model name, dimension, row count and fingerprint
+# plus whatever ingest.py derives from the same chunks (articles.json,
+# amendments.json, bm25.npz). Versions live under <index dir>/versions/ and the
+# CURRENT file names the one readers should load. A rebuild writes a new version
+# and then replaces CURRENT, so a reader sees either the old index or the new
+# one, never a mix of the two. Directories written before versioning (the files
+# at the top level) still load.
+#
+# Usage:
+#   python local_index.py export          # copy the Pinecone 'constitution' index to disk
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+from typing import Any
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+import config
+
+# Superseded versions kept so a reader that resolved CURRENT just before a swap can finish loading
+KEEP_VERSIONS = 2
+
+def current_version(directory):
+    """Return the directory holding the current version of the index in `directory`"""
+    try:
+        with open(os.path.join(directory, "CURRENT"), encoding="utf-8") as f:
+            return os.path.join(directory, "versions", f.read().strip())
+    except FileNotFoundError:
+        return directory
+
+def version_file(directory, name):
+    """Path of a file in the current version, or at the top level of an unversioned directory"""
+    path = os.path.join(current_version(directory), name)
+    return path if os.path.exists(path) else os.path.join(directory, name)
+
+def read_info(directory):
+    """Return the current version's index.json (model, dimension, count, fingerprint), or None"""
+    try:
+        with open(os.path.join(current_version(directory), "index.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def content_fingerprint(ids, texts):
+    """Order-independent hash of the chunks in an index"""
+    digest = hashlib.sha1()
+    for chunk_id, text in sorted(zip(ids, texts)):
+        digest.update(f"{chunk_id}\x1f{text}\x1e".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+def _prune_versions(directory, keep=KEEP_VERSIONS):
+    versions = os.path.join(directory, "versions")
+    for name in sorted(os.listdir(versions), reverse=True)[keep:]:
+        shutil.rmtree(os.path.join(versions, name), ignore_errors=True)
+
+class LocalVectorIndex:
+    """Contiguous embedding matrix with vectorized top-k cosine search"""
+
+    def __init__(self, vectors, ids, texts, metadatas, info):
+        self.vectors = vectors
+        self.ids = ids
+        self.texts = texts
+        self.metadatas = metadatas
+        self.info = info
+
+    @property
+    def fingerprint(self):
+        return self.info["fingerprint"]
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def build(cls, directory, ids, texts, metadatas, vectors, model_name=config.EMBEDDING_MODEL, artifacts=None):
+        """Write an index, plus `artifacts` ({file name: save(path)}), to `directory` and return it loaded"""
+        os.makedirs(directory, exist_ok=True)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors = np.ascontiguousarray(vectors / norms)
+
+        fingerprint = content_fingerprint(ids, texts)
+        info = {"model": model_name, "dimension": int(vectors.shape[1]) if len(ids) else 0,
+                "count": len(ids), "fingerprint": fingerprint}
+
+        # Fill a fresh version directory, then switch CURRENT to it in one rename
+        name = f"{time.time_ns()}-{fingerprint}"
+        version = os.path.join(directory, "versions", name)
+        os.makedirs(version)
+        np.save(os.path.join(version, "vectors.npy"), vectors)
+        with open(os.path.join(version, "chunks.jsonl"), "w", encoding="utf-8") as f:
+            for chunk_id, text, metadata in zip(ids, texts, metadatas):
+                f.write(json.dumps({"id": chunk_id, "text": text, "metadata": metadata}) + "\n")
+        with open(os.path.join(version, "index.json"), "w", encoding="utf-8") as f:
+            json.dump(info, f, indent=2)
+        # Files derived from the same chunks switch over together with the vectors
+        for file_name, save in (artifacts or {}).items():
+            save(os.path.join(version, file_name))
+        with open(os.path.join(directory, "CURRENT.tmp"), "w", encoding="utf-8") as f:
+            f.write(name)
+        os.replace(os.path.join(directory, "CURRENT.tmp"), os.path.join(directory, "CURRENT"))
+        _prune_versions(directory)
+        return cls.load(directory)
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        """Load the current index version; the matrix is memory-mapped so worker processes share its pages"""
+        directory = current_version(directory)
+        with open(os.path.join(directory, "index.json"), encoding="utf-8") as f:
+            info = json.load(f)
+        vectors = np.load(os.path.join(directory, "vectors.npy"), mmap_mode="r" if mmap else None)
+        ids, texts, metadatas = [], [], []
+        with open(os.path.join(directory, "chunks.jsonl"), encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                ids.append(record["id"])
+                texts.append(record["text"])
+                metadatas.append(record["metadata"])
+        return cls(vectors, ids, texts, metadatas, info)
+
+    def search(self, vector, k=config.TOP_K):
+        """Return [(row, score)] of the k most similar chunks, best first"""
+        if not self.ids:
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+        scores = self.vectors @ query
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(row), float(scores[row])) for row in top]
+
+class LocalVectorStore:
+    """Vector store interface over a LocalVectorIndex, used in place of PineconeVectorStore"""
+
+    def __init__(self, index, embeddings, directory=None):
+        self.index = index
+        self.embeddings = embeddings
+        self.directory = directory
+
+    def reload(self):
+        """Switch to the current version of the index directory; searches under way keep the old one"""
+        if self.directory is not None:
+            self.index = LocalVectorIndex.load(self.directory)
+
+    def document(self, row, score=None, index=None):
+        if index is None:
+            index = self.index
+        metadata = dict(index.metadatas[row])
+        if score is not None:
+            metadata["score"] = score
+        return Document(page_content=index.texts[row], metadata=metadata, id=index.ids[row])
+
+    def similarity_search_by_vector(self, embedding, k=config.TOP_K, **kwargs):
+        # One index for the whole search: reload() may swap in another version meanwhile
+        index = self.index
+        return [self.document(row, score, index) for row, score in index.search(embedding, k)]
+
+    def similarity_search(self, query, k=config.TOP_K, **kwargs):
+        return self.similarity_search_by_vector(self.embeddings.embed_query(query), k)
+
+    def as_retriever(self, search_kwargs=None, **kwargs):
+        return LocalRetriever(store=self, search_kwargs=search_kwargs or {})
+
+class LocalRetriever(BaseRetriever):
+    """LangChain retriever over a LocalVectorStore, honouring search_kwargs={'k': ...}"""
+
+    store: Any
+    search_kwargs: dict = {}
+
+    def _get_relevant_documents(self, query, *, run_manager=None):
+        return self.store.similarity_search(query, k=self.search_kwargs.get("k", config.TOP_K))
+
+def export_from_pinecone(directory, index_name=config.INDEX_NAME, batch_size=100):
+    """Copy every vector, text and metadata record out of Pinecone into a local index"""
+    from pinecone import Pinecone
+
+    index = Pinecone(api_key=config.PINECONE_API_KEY).Index(index_name)
+    ids, texts, metadatas, vectors = [], [], [], []
+    for page in index.list():
+        for start in range(0, len(page), batch_size):
+            fetched = index.fetch(ids=page[start:start + batch_size])
+            for chunk_id, record in fetched.vectors.items():
+                metadata = dict(record.metadata or {})
+                ids.append(chunk_id)
+                # PineconeVectorStore keeps the chunk text under the "text" metadata key
+                texts.append(metadata.pop("text", ""))
+                metadatas.append(metadata)
+                vectors.append(record.values)
+    return LocalVectorIndex.build(directory, ids, texts, metadatas, np.array(vectors, dtype=np.float32))
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage the local vector index")
+    parser.add_argument("command", choices=["export", "info"])
+    parser.add_argument("--dir", default=config.LOCAL_INDEX_DIR, help="index directory")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        index = export_from_pinecone(args.dir)
+    else:
+        index = LocalVectorIndex.load(args.dir)
+    print(json.dumps(index.info, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# precompute.py - Batch job that materializes answers for the whole explorer catalogue
+#
+# Usage:
+#   python precompute.py                  # generate missing answers against Pinecone + Groq
+#   python precompute.py --workers 8      # more concurrent LLM calls
+#   python precompute.py --standin        # dry run against the local stand-ins (temporary store)
+#
+# The job is resumable: answers already stored for the current index version are skipped.
+# Calls go through the engine's LLM scheduler at background priority, so the job
+# stays inside Groq's rate limits whatever --workers is set to.
+
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import catalogue
+import config
+from amendment_index import amendment_documents
+from answer_cache import cache_key
+from article_index import article_documents
+from llm_scheduler import BACKGROUND
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS precomputed (
+    key TEXT PRIMARY KEY,
+    catalogue_key TEXT NOT NULL,
+    index_version TEXT NOT NULL,
+    payload BLOB NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS precomputed_index_version ON precomputed (index_version);
+"""
+
+class PrecomputedAnswers:
+    """Read-mostly store of generated answers, compressed and versioned by index fingerprint"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def get(self, profile, prompt, model, index_version, grounding=None):
+        """Return {'answer', 'sources'} for a catalogue prompt, or None"""
+        key = cache_key(profile, prompt, model, index_version, grounding)
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM precomputed WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, catalogue_key, profile, prompt, model, index_version, answer, sources=(), grounding=None):
+        """Store one generated answer under its catalogue key"""
+        payload = zlib.compress(json.dumps({"answer": answer, "sources": list(sources)}).encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO precomputed VALUES (?, ?, ?, ?, ?)",
+                (cache_key(profile, prompt, model, index_version, grounding), catalogue_key, index_version, payload, time.time()),
+            )
+            self._conn.commit()
+
+    def done_keys(self, index_version):
+        """Catalogue keys already generated for an index version"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT catalogue_key FROM precomputed WHERE index_version = ?", (index_version,)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def prune(self, index_version):
+        """Delete answers generated against any other index version"""
+        with self._lock:
+            deleted = self._conn.execute(
+                "DELETE FROM precomputed WHERE index_version != ?", (index_version,)
+            ).rowcount
+            self._conn.commit()
+        return deleted
+
+def catalogue_documents(catalogue_key):
+    """The chunks the explorer grounds a catalogue prompt on, or None where it uses vector search"""
+    kind, _, value = catalogue_key.partition(":")
+    if kind == "article":
+        return article_documents(value)
+    if kind == "amendment":
+        return amendment_documents(int(value))
+    return None
+
+def run(engine, store, workers=4, profile="explorer", prompts=None, prune=True, log=print):
+    """Generate every missing catalogue answer with at most `workers` LLM calls in flight"""
+    from qa_engine import documents_digest, documents_to_dicts
+
+    version = engine.index_version()
+    done = store.done_keys(version)
+    todo = [(key, prompt) for key, prompt in (prompts or catalogue.iter_prompts()) if key not in done]
+    log(f"Index {version}: {len(done)} answers stored, {len(todo)} to generate")
+
+    def generate(key, prompt):
+        # Same grounding as the explorer asks with, so its lookups find these answers
+        docs = catalogue_documents(key)
+        result = engine.answer(profile, prompt, docs=docs, priority=BACKGROUND)
+        store.put(key, profile, prompt, engine.model_name, version,
+                  result["result"], documents_to_dicts(result.get("source_documents", [])),
+                  grounding=documents_digest(docs))
+        return key
+
+    failed = []
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(generate, key, prompt): key for key, prompt in todo}
+        for i, future in enumerate(as_completed(futures), 1):
+            try:
+                future.result()
+            except Exception as e:
+                failed.append(futures[future])
+                log(f"  failed {futures[future]}: {e}")
+            if i % 25 == 0 or i == len(todo):
+                log(f"  {i}/{len(todo)} done in {time.perf_counter() - started:.1f}s")
+
+    pruned = store.prune(version) if prune else 0
+    if pruned:
+        log(f"Removed {pruned} answers from older index versions")
+    return {"generated": len(todo) - len(failed), "failed": failed, "index_version": version}
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute explorer answers for the whole catalogue")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent LLM calls")
+    parser.add_argument("--store", help=f"path of the answer store (default {config.PRECOMPUTED_PATH}, "
+                                        "or a temporary file with --standin)")
+    parser.add_argument("--standin", action="store_true", help="use the local stand-in LLM and vector store")
+    args = parser.parse_args()
+
+    if args.standin:
+        from standins import build_standin_engine
+        engine = build_standin_engine()
+        store = args.store or os.path.join(tempfile.mkdtemp(prefix="precompute-"), "precomputed.sqlite3")
+    else:
+        from qa_engine import build_engine
+        engine = build_engine()
+        store = args.store or config.PRECOMPUTED_PATH
+    print(f"Answer store: {store}")
+    # Stand-in answers are versioned "standin": pruning would delete every real answer in the store
+    summary = run(engine, PrecomputedAnswers(store), workers=args.workers, prune=not args.standin)
+    print(f"Generated {summary['generated']} answers, {len(summary['failed'])} failed")
+
+if __name__ == "__main__":
+    main()
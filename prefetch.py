@@ -0,0 +1,128 @@
+# prefetch.py - Speculative generation of explorer answers while the user is still choosing
+#
+# When a selectbox or number input in the explorer changes (not when a view
+# first renders with its default), the answer its button would ask for is
+# started in the background at the LLM scheduler's lowest priority, which may
+# not spend the share of the rate budget reserved for real requests. Clicking the button then finds it in the answer cache, or
+# follows the generation already under way, which from then on is scheduled at
+# the click's priority rather than in the background. Each session has at most one
+# prefetch (its current selection; changing it cancels the previous one) and at
+# most PREFETCH_MAX_RUNNING run across the process. Selections made while every
+# slot is busy are simply not prefetched.
+
+import threading
+from collections import Counter, OrderedDict
+
+import config
+import tracing
+
+# Outcomes where the LLM did work for the prefetch
+_GENERATED = ("generated", "abandoned")
+
+class Prefetch:
+    """One session's speculative answer"""
+
+    def __init__(self, question):
+        self.question = question
+        self.cancel = threading.Event()
+        self.outcome = None
+        self.claimed = False
+        self.retired = False
+
+class Prefetcher:
+    """Bounded per-session and process-wide speculative answers, with hit and waste counters"""
+
+    def __init__(self, max_running=2, max_sessions=1000):
+        self.max_running = max_running
+        self.max_sessions = max_sessions
+        self.running = 0
+        self.started = 0
+        self.skipped = 0
+        self.hits = 0
+        self.misses = 0
+        self.wasted = 0
+        self.outcomes = Counter()
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def request(self, engine, session, profile, question, docs=None):
+        """Prefetch the answer for a session's current selection (a no-op if it is unchanged)"""
+        with self._lock:
+            current = self._sessions.get(session)
+            if current is not None and current.question == question:
+                return
+            if current is not None:
+                self._retire(self._sessions.pop(session))
+            if self.running >= self.max_running:
+                self.skipped += 1
+                return
+            prefetch = self._sessions[session] = Prefetch(question)
+            while len(self._sessions) > self.max_sessions:
+                self._retire(self._sessions.popitem(last=False)[1])
+            self.running += 1
+            self.started += 1
+        threading.Thread(target=self._run, args=(engine, profile, question, docs, prefetch),
+                         name="prefetch", daemon=True).start()
+
+    def _run(self, engine, profile, question, docs, prefetch):
+        try:
+            with tracing.trace("prefetch", question=question):
+                outcome = engine.prefetch(profile, question, docs=docs, cancel=prefetch.cancel)
+        except Exception:
+            # e.g. shed by the LLM scheduler to make room for a real request
+            outcome = "failed"
+        with self._lock:
+            self.running -= 1
+            prefetch.outcome = outcome
+            self.outcomes[outcome] += 1
+            if prefetch.retired and outcome in _GENERATED:
+                self.wasted += 1
+
+    def _retire(self, prefetch):
+        """The selection moved on: cancel the prefetch and count its work as wasted if unused"""
+        prefetch.retired = True
+        if prefetch.claimed:
+            return
+        prefetch.cancel.set()
+        if prefetch.outcome in _GENERATED:
+            self.wasted += 1
+
+    def claim(self, session, question):
+        """Record that the session asked for `question`; True if it had been prefetched"""
+        with self._lock:
+            prefetch = self._sessions.get(session)
+            if prefetch is not None and prefetch.question == question and not prefetch.claimed:
+                prefetch.claimed = True
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+
+    def stats(self):
+        """Running prefetches, hit rate, wasted work and outcomes"""
+        claims = self.hits + self.misses
+        return {
+            "running": self.running,
+            "max_running": self.max_running,
+            "started": self.started,
+            "skipped": self.skipped,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / claims if claims else 0.0,
+            "wasted": self.wasted,
+            **{f"outcome_{outcome}": count for outcome, count in self.outcomes.items()},
+        }
+
+# ------------------ Process-wide Instance ------------------
+_shared = None
+_shared_lock = threading.Lock()
+
+def get_prefetcher():
+    """Return the process-wide prefetcher shared by every session"""
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = Prefetcher(max_running=config.PREFETCH_MAX_RUNNING)
+                tracing.register_collector("prefetch", _shared.stats)
+    return _shared
@@ -0,0 +1,192 @@
+# profiling.py - Opt-in sampling profiles of single page runs, saved for speedscope
+#
+# Usage:
+#   http://localhost:8501/explorer?profile=1    # profile this page run
+#   Admin page -> "Profile next runs"           # profile whichever page runs come next
+#
+# While a run is profiled, a daemon thread samples the Python stacks of the
+# script thread and of the answer-stream thread it starts every
+# PROFILE_INTERVAL_MS. The samples are written to
+# PROFILE_DIR/<profile id>.speedscope.json (open at https://www.speedscope.app),
+# and every question traced during the run records that path in the trace log,
+# so a slow question leads straight to its flamegraph. A run that is not
+# profiled only pays for checking the query parameter.
+
+import contextvars
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+import config
+import tracing
+
+_active = contextvars.ContextVar("legal_ease_profile", default=None)
+_armed = 0
+_armed_lock = threading.Lock()
+
+class SamplingProfiler:
+    """Samples the stacks of registered threads from a background thread"""
+
+    def __init__(self, name, interval=config.PROFILE_INTERVAL_MS / 1000):
+        self.name = name
+        self.interval = interval
+        self.threads = {}
+        self.samples = {}
+        self.frames = []
+        self._frame_ids = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self.started = None
+        self.seconds = None
+
+    def add_thread(self):
+        thread = threading.current_thread()
+        self.threads[thread.ident] = thread.name
+
+    def start(self):
+        self.add_thread()
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.seconds = time.perf_counter() - self.started
+
+    def _run(self):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            frames = sys._current_frames()
+            for ident in list(self.threads):
+                frame = frames.get(ident)
+                if frame is not None:
+                    self.samples.setdefault(ident, []).append((self._stack(frame), now - last))
+            last = now
+
+    def _stack(self, frame):
+        """Frame indices from the outermost call to the innermost"""
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            key = (getattr(code, "co_qualname", code.co_name), code.co_filename, code.co_firstlineno)
+            index = self._frame_ids.get(key)
+            if index is None:
+                index = self._frame_ids[key] = len(self.frames)
+                self.frames.append({"name": key[0], "file": key[1], "line": key[2]})
+            stack.append(index)
+            frame = frame.f_back
+        stack.reverse()
+        return stack
+
+    def speedscope(self):
+        """The samples in speedscope's file format, one profile per thread"""
+        profiles = []
+        for ident, samples in self.samples.items():
+            weights = [round(weight, 6) for _, weight in samples]
+            profiles.append({
+                "type": "sampled",
+                "name": self.threads[ident],
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": round(sum(weights), 6),
+                "samples": [stack for stack, _ in samples],
+                "weights": weights,
+            })
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": self.name,
+            "exporter": "legal-ease",
+            "activeProfileIndex": 0,
+            "shared": {"frames": self.frames},
+            "profiles": profiles,
+        }
+
+    def save(self, name, directory=config.PROFILE_DIR):
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{name}.speedscope.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.speedscope(), f)
+        _prune(directory)
+        return path
+
+def _prune(directory, keep=config.PROFILE_KEEP):
+    for profile in list_profiles(directory)[keep:]:
+        try:
+            os.remove(profile["path"])
+        except OSError:
+            pass
+
+def list_profiles(directory=config.PROFILE_DIR):
+    """Saved profiles, newest first"""
+    try:
+        names = [name for name in os.listdir(directory) if name.endswith(".speedscope.json")]
+    except OSError:
+        return []
+    profiles = []
+    for name in names:
+        path = os.path.join(directory, name)
+        try:
+            info = os.stat(path)
+        except OSError:
+            continue
+        profiles.append({"name": name, "path": path, "bytes": info.st_size, "modified": info.st_mtime})
+    return sorted(profiles, key=lambda profile: profile["modified"], reverse=True)
+
+# ------------------ Page Runs ------------------
+def arm(runs):
+    """Profile the next `runs` page runs of any session"""
+    global _armed
+    with _armed_lock:
+        _armed = max(0, int(runs))
+
+def armed():
+    return _armed
+
+def requested():
+    """True when this page run should be profiled (query parameter, or armed from the admin page)"""
+    global _armed
+    if _armed:
+        with _armed_lock:
+            if _armed:
+                _armed -= 1
+                return True
+    import streamlit as st
+
+    return st.query_params.get(config.PROFILE_QUERY_PARAM) in ("1", "true")
+
+@contextmanager
+def profiled(page):
+    """Profile the enclosed page run when requested; otherwise just run it"""
+    import streamlit as st
+
+    if not requested():
+        yield None
+        return
+    profiler = SamplingProfiler(page)
+    # The path is known up front so traces logged during the run can point at it
+    name = uuid.uuid4().hex[:16]
+    path = os.path.join(config.PROFILE_DIR, f"{name}.speedscope.json")
+    with tracing.trace_attrs(profile_file=path):
+        token = _active.set(profiler)
+        profiler.start()
+        try:
+            yield profiler
+        finally:
+            profiler.stop()
+            _active.reset(token)
+            profiler.save(name, config.PROFILE_DIR)
+            logging.getLogger(__name__).info("Profiled %s run in %s", page, path)
+    st.caption(f"🔬 Profile saved to {path}")
+
+def register_thread():
+    """Include the calling thread in the profile of the page run it works for, if any"""
+    profiler = _active.get()
+    if profiler is not None:
+        profiler.add_thread()
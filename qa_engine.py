@@ -0,0 +1,543 @@
+# qa_engine.py - Shared QA engine used by the chat and explorer modules
+
+import contextvars
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import config
+import profiling
+import tracing
+from amendment_index import reload_amendment_index
+from answer_cache import AnswerCache, cache_key
+from article_index import reload_article_index
+from constitution import reload_constitution
+from llm_scheduler import BACKGROUND, BROWSE, INTERACTIVE, LLMScheduler, estimate_tokens
+from precompute import PrecomputedAnswers
+from semantic_cache import SemanticCache
+from singleflight import Abandoned, SingleFlight
+
+# LangChain, Pinecone, Groq and sentence-transformers are imported inside the
+# functions that need them so that pages importing this module paint instantly.
+
+# ------------------ Prompt Profiles ------------------
+CHAT_PROMPT = """You are a knowledgeable assistant specialized in the Indian Constitution. ONLY use the information provided in the CONTEXT to answer the user's question.
+    - Do not rely on any external knowledge.
+    - If the answer is not found in the context, politely say you don't have enough information.
+    - Be accurate, clear, and concise.
+
+    Context:
+    {context}
+
+    User's Question:
+    {question}
+
+    Your Answer (based ONLY on the above context):
+    """
+
+EXPLORER_PROMPT = """You are a knowledgeable assistant specialized in the Indian Constitution.
+    - Be accurate, clear, and concise.
+    - Format your answer with appropriate Markdown for readability.
+    - If relevant, cite specific Articles, Sections, or Parts of the Constitution.
+
+    Context:
+    {context}
+
+    User's Question:
+    {question}
+
+    Your Answer:
+    """
+
+PROFILES = {
+    "chat": CHAT_PROMPT,
+    "explorer": EXPLORER_PROMPT,
+}
+
+# Default scheduling priority of each profile when the caller does not give one
+PROFILE_PRIORITIES = {
+    "chat": INTERACTIVE,
+    "explorer": BROWSE,
+}
+
+# ------------------ Engine ------------------
+class QAEngine:
+    """One embedder, vector store and LLM shared by every prompt profile"""
+
+    def __init__(self, embeddings, vectorstore, llm, top_k=config.TOP_K,
+                 answer_cache=None, semantic_cache=None, precomputed=None,
+                 retriever=None, index_fingerprint=None,
+                 model_name=config.LLM_MODEL, scheduler=None):
+        self.embeddings = embeddings
+        self.vectorstore = vectorstore
+        self.llm = llm
+        self.top_k = top_k
+        self.answer_cache = answer_cache
+        self.semantic_cache = semantic_cache
+        self.precomputed = precomputed
+        self.retriever = retriever
+        self.model_name = model_name
+        self.scheduler = scheduler
+        self._index_fingerprint = index_fingerprint
+        self._index_version = None
+        self._index_version_checked = 0.0
+        self.flights = SingleFlight()
+        self._chains = {}
+        self._latencies = {}
+        self._lock = threading.Lock()
+
+    def chain(self, profile):
+        """Return the RetrievalQA chain for a prompt profile, building it on first use"""
+        if profile not in PROFILES:
+            raise KeyError(f"Unknown prompt profile: {profile}")
+        qa = self._chains.get(profile)
+        if qa is None:
+            with self._lock:
+                qa = self._chains.get(profile)
+                if qa is None:
+                    from langchain.chains.retrieval_qa.base import RetrievalQA
+                    from langchain_core.prompts import PromptTemplate
+
+                    prompt = PromptTemplate(template=PROFILES[profile], input_variables=["context", "question"])
+                    qa = RetrievalQA.from_chain_type(
+                        llm=self.llm,
+                        chain_type="stuff",
+                        retriever=self.retriever or self.vectorstore.as_retriever(search_kwargs={"k": self.top_k}),
+                        return_source_documents=True,
+                        chain_type_kwargs={"prompt": prompt}
+                    )
+                    self._chains[profile] = qa
+        return qa
+
+    def index_version(self):
+        """Return the vector index fingerprint, re-reading it periodically"""
+        if self._index_fingerprint is None:
+            return "unversioned"
+        now = time.time()
+        if self._index_version is None or now - self._index_version_checked > config.INDEX_VERSION_REFRESH_SECONDS:
+            version = self._index_fingerprint()
+            self._index_version_checked = now
+            if version != self._index_version:
+                if self._index_version is not None:
+                    # Re-ingested while running: search the new vectors and keywords from now on
+                    for component in (self.vectorstore, self.retriever):
+                        if hasattr(component, "reload"):
+                            component.reload()
+                self._index_version = version
+                # The index was rebuilt: answers generated from the old chunks are stale
+                if self.answer_cache is not None:
+                    self.answer_cache.invalidate(version)
+                if self.semantic_cache is not None:
+                    self.semantic_cache.clear()
+                # ingest.py writes the article and amendment indexes with the vectors
+                reload_article_index()
+                reload_amendment_index()
+                reload_constitution()
+        return self._index_version
+
+    def _lookup(self, profile, question, version, grounding=None):
+        """Check the precomputed store and both caches; return (result or None, query vector)"""
+        with tracing.span("cache_lookup", profile=profile) as span:
+            cached, vector = self._find(profile, question, version, grounding)
+            span["cache"] = cached["cached"] if cached is not None else "miss"
+        tracing.annotate(profile=profile, cache=span["cache"])
+        tracing.increment("cache_lookups_total", result=span["cache"])
+        return cached, vector
+
+    def _find(self, profile, question, version, grounding):
+        # Answers grounded on given documents are only found under the same documents
+        if self.precomputed is not None:
+            stored = self.precomputed.get(profile, question, self.model_name, version, grounding)
+            if stored is not None:
+                return _cached_result(question, stored["answer"], stored["sources"], "precomputed"), None
+
+        if self.answer_cache is not None:
+            cached = self.answer_cache.get(profile, question, self.model_name, version, grounding)
+            if cached is not None:
+                return _cached_result(question, cached["answer"], cached["sources"], "exact"), None
+
+        vector = None
+        if self.semantic_cache is not None and profile in config.SEMANTIC_CACHE_PROFILES and grounding is None:
+            vector = self.embeddings.embed_query(question)
+            similar = self.semantic_cache.lookup(profile, question, vector)
+            if similar is not None:
+                return _cached_result(question, similar["answer"], similar["sources"], "semantic"), vector
+        return None, vector
+
+    def _remember(self, profile, question, version, vector, answer, docs, latency, grounding=None):
+        sources = documents_to_dicts(docs)
+        if self.answer_cache is not None:
+            self.answer_cache.put(profile, question, self.model_name, version, answer, sources, grounding)
+        if vector is not None:
+            self.semantic_cache.add(profile, question, vector, answer, sources, latency)
+
+    def _flight_key(self, profile, question, version, grounding):
+        return cache_key(profile, question, self.model_name, version, grounding)
+
+    def _prompt(self, profile, question, docs):
+        """Retrieve (unless `docs` is given) and fill the profile's prompt template"""
+        qa = self.chain(profile)
+        if docs is None:
+            with tracing.span("retrieval") as span:
+                docs = qa.retriever.invoke(question)
+                span["k"] = len(docs)
+        with tracing.span("prompt") as span:
+            context = "\n\n".join(doc.page_content for doc in docs)
+            prompt = qa.combine_documents_chain.llm_chain.prompt.format(context=context, question=question)
+            span.update(k=len(docs), context_chars=len(context), prompt_tokens=estimate_tokens(prompt, 0))
+        tracing.annotate(k=span["k"], prompt_tokens=span["prompt_tokens"])
+        return docs, prompt
+
+    def _admit(self, profile, prompt, priority, flight=None):
+        """Wait for rate-limit capacity; return the tokens reserved (0 without a scheduler)"""
+        if self.scheduler is None:
+            return 0
+        if priority is None:
+            priority = PROFILE_PRIORITIES[profile]
+        if flight is None:
+            ticket = self.scheduler.ticket(priority)
+        else:
+            # Followers that joined before the ticket existed are applied here, later ones by _follow
+            ticket = self.scheduler.ticket(flight.wanted(priority))
+            flight.ticket = ticket
+            self.scheduler.promote(ticket, flight.priority)
+        with tracing.span("queue", priority=priority):
+            return self.scheduler.acquire(estimate_tokens(prompt, config.LLM_EXPECTED_OUTPUT_TOKENS), ticket=ticket)
+
+    def _follow(self, flight, profile, priority):
+        """A caller now waits on another caller's flight: schedule it at least at the caller's priority"""
+        if priority is None:
+            priority = PROFILE_PRIORITIES[profile]
+        flight.wanted(priority)
+        if flight.ticket is not None:
+            self.scheduler.promote(flight.ticket, priority)
+
+    def _settle(self, reserved, prompt, answer, usage=None):
+        if self.scheduler is not None:
+            # Prefer the provider's token count when the response carries one
+            used = usage["total_tokens"] if usage else estimate_tokens(prompt, 0) + estimate_tokens(answer, 0)
+            self.scheduler.settle(reserved, used)
+
+    def answer(self, profile, question, docs=None, priority=None, flight=None):
+        """Retrieve and generate an answer without consulting or filling the caches"""
+        docs, prompt = self._prompt(profile, question, docs)
+        reserved = self._admit(profile, prompt, priority, flight)
+        with tracing.span("generation", model=self.model_name):
+            message = self.llm.invoke(prompt)
+        self._settle(reserved, prompt, message.content, getattr(message, "usage_metadata", None))
+        return {"query": question, "result": message.content, "source_documents": docs}
+
+    def invoke(self, profile, question, docs=None, priority=None):
+        """Answer a question with the given profile's prompt, serving repeats from the caches"""
+        # When `docs` is given (e.g. an article's exact chunks) retrieval is skipped
+        version = self.index_version()
+        grounding = documents_digest(docs)
+        cached, vector = self._lookup(profile, question, version, grounding)
+        if cached is not None:
+            return cached
+
+        # Sessions asking the same question meanwhile wait for this answer
+        key = self._flight_key(profile, question, version, grounding)
+        flight, leader = self.flights.join(key)
+        if not leader:
+            tracing.annotate(coalesced=True)
+            self._follow(flight, profile, priority)
+            with tracing.span("coalesced"):
+                return flight.wait()
+        try:
+            started = time.perf_counter()
+            result = self.answer(profile, question, docs=docs, priority=priority, flight=flight)
+            latency = time.perf_counter() - started
+            self._record("total", profile, latency)
+            self._remember(profile, question, version, vector, result["result"], result["source_documents"],
+                           latency, grounding)
+        except Exception as exc:
+            flight.fail(exc)
+            raise
+        else:
+            # Streaming followers read the text parts; this leader has the answer in one piece
+            flight.append(result["result"])
+            flight.finish(result)
+        finally:
+            self.flights.land(key, flight)
+        return result
+
+    def stream(self, profile, question, docs=None, priority=None):
+        """Yield the answer text as the LLM generates it; cached answers arrive in one piece"""
+        started = time.perf_counter()
+        version = self.index_version()
+        grounding = documents_digest(docs)
+        cached, vector = self._lookup(profile, question, version, grounding)
+        if cached is not None:
+            self._record("ttft_cached", profile, time.perf_counter() - started)
+            yield cached["result"]
+            return
+
+        # Generation runs on its own thread and every session asking the same question
+        # follows its tokens, so it completes (and is cached) even if all readers leave
+        key = self._flight_key(profile, question, version, grounding)
+        flight, leader = self.flights.join(key)
+        if leader:
+            # The copied context carries the current trace into the generation thread
+            threading.Thread(target=contextvars.copy_context().run,
+                             args=(self._generate, flight, key, profile, question, version, vector, docs,
+                                   grounding, priority),
+                             name="answer-stream", daemon=True).start()
+        else:
+            tracing.annotate(coalesced=True)
+            self._follow(flight, profile, priority)
+        first = True
+        for part in flight.follow():
+            if first:
+                # Time to first token is what the user perceives as latency
+                ttft = time.perf_counter() - started
+                self._record("ttft", profile, ttft)
+                tracing.observe("ttft", ttft, started=started)
+                first = False
+            yield part
+
+    def prefetch(self, profile, question, docs=None, cancel=None):
+        """Generate and cache an answer before it is asked for; returns what happened"""
+        # Runs at background priority until a session follows it (then at that
+        # session's priority), and stops early once `cancel` is set unless a
+        # session has meanwhile started following the answer
+        version = self.index_version()
+        grounding = documents_digest(docs)
+        cached, vector = self._lookup(profile, question, version, grounding)
+        if cached is not None:
+            return "cached"
+        key = self._flight_key(profile, question, version, grounding)
+        flight = self.flights.lead(key)
+        if flight is None:
+            return "in_flight"
+        self._generate(flight, key, profile, question, version, vector, docs, grounding, BACKGROUND, cancel)
+        if isinstance(flight.error, Abandoned):
+            return "abandoned"
+        return "failed" if flight.error is not None else "generated"
+
+    def _generate(self, flight, key, profile, question, version, vector, docs, grounding, priority, cancel=None):
+        profiling.register_thread()
+        started = time.perf_counter()
+        reserved = 0
+        prompt = ""
+        try:
+            docs, prompt = self._prompt(profile, question, docs)
+            self._check_cancel(cancel, key, flight)
+            reserved = self._admit(profile, prompt, priority, flight)
+            self._check_cancel(cancel, key, flight)
+            with tracing.span("generation", model=self.model_name) as span:
+                for chunk in self.llm.stream(prompt):
+                    if chunk.content:
+                        if not flight.parts:
+                            span["first_token"] = round(time.perf_counter() - started, 6)
+                        flight.append(chunk.content)
+                    self._check_cancel(cancel, key, flight)
+                span["chars"] = sum(len(part) for part in flight.parts)
+            answer = "".join(flight.parts)
+            self._settle(reserved, prompt, answer)
+            latency = time.perf_counter() - started
+            self._record("total", profile, latency)
+            self._remember(profile, question, version, vector, answer, docs, latency, grounding)
+        except Abandoned as exc:
+            if reserved:
+                self._settle(reserved, prompt, "".join(flight.parts))
+            flight.fail(exc)
+        except Exception as exc:
+            flight.fail(exc)
+        else:
+            flight.finish({"query": question, "result": answer, "source_documents": docs})
+        finally:
+            self.flights.land(key, flight)
+
+    def _check_cancel(self, cancel, key, flight):
+        if cancel is not None and cancel.is_set() and self.flights.abandon(key, flight):
+            raise Abandoned()
+
+    def _record(self, metric, profile, seconds):
+        samples = self._latencies.get((metric, profile))
+        if samples is None:
+            samples = self._latencies.setdefault((metric, profile), deque(maxlen=1000))
+        samples.append(seconds)
+
+    def latency_summary(self):
+        """Return count, p50 and p95 seconds for time-to-first-token and total answer time"""
+        summary = {}
+        for (metric, profile), samples in list(self._latencies.items()):
+            ordered = sorted(samples)
+            if ordered:
+                summary[f"{metric}.{profile}"] = {
+                    "count": len(ordered),
+                    "p50": ordered[len(ordered) // 2],
+                    "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                }
+        return summary
+
+def _cached_result(question, answer, sources, kind):
+    return {
+        "query": question,
+        "result": answer,
+        "source_documents": dicts_to_documents(sources),
+        "cached": kind,
+    }
+
+def documents_digest(docs):
+    """Hash of explicitly given source documents (None when retrieval chooses them)"""
+    if docs is None:
+        return None
+    return hashlib.sha1("\x1f".join(doc.page_content for doc in docs).encode("utf-8")).hexdigest()
+
+def documents_to_dicts(docs):
+    """Serialize source documents for the answer stores"""
+    return [{"page_content": doc.page_content, "metadata": dict(doc.metadata)} for doc in docs]
+
+def dicts_to_documents(sources):
+    """Rebuild source documents read back from the answer stores"""
+    from langchain_core.documents import Document
+
+    return [Document(page_content=s["page_content"], metadata=s["metadata"]) for s in sources]
+
+def pinecone_fingerprint(index_name=config.INDEX_NAME):
+    """Return a callable that fingerprints the Pinecone index from its stats"""
+    def fingerprint():
+        from pinecone import Pinecone
+
+        stats = Pinecone(api_key=config.PINECONE_API_KEY).Index(index_name).describe_index_stats()
+        namespaces = {name: ns.vector_count for name, ns in (stats.namespaces or {}).items()}
+        raw = f"{index_name}:{stats.dimension}:{stats.total_vector_count}:{sorted(namespaces.items())}"
+        # ingest.py records the content fingerprint of what it last pushed to Pinecone
+        if os.path.exists(config.PINECONE_MANIFEST_PATH):
+            with open(config.PINECONE_MANIFEST_PATH, encoding="utf-8") as f:
+                raw += ":" + json.load(f)["fingerprint"]
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+    return fingerprint
+
+def build_vectorstore(embeddings):
+    """Return the configured vector store and a callable that fingerprints its contents"""
+    if config.VECTOR_BACKEND == "local":
+        from local_index import LocalVectorIndex, LocalVectorStore, read_info
+
+        store = LocalVectorStore(LocalVectorIndex.load(config.LOCAL_INDEX_DIR), embeddings, config.LOCAL_INDEX_DIR)
+        # Read from disk each time, so a re-ingest is noticed (and then reloaded) without a restart
+        return store, lambda: read_info(config.LOCAL_INDEX_DIR)["fingerprint"]
+
+    from langchain_pinecone import PineconeVectorStore
+
+    os.environ["PINECONE_API_KEY"] = config.PINECONE_API_KEY
+    vectorstore = PineconeVectorStore.from_existing_index(config.INDEX_NAME, embeddings)
+    return vectorstore, pinecone_fingerprint()
+
+def build_retriever(vectorstore):
+    """Return the hybrid BM25 + dense retriever when configured, else None for dense only"""
+    if config.RETRIEVAL_MODE != "hybrid":
+        return None
+    from bm25 import HybridRetriever, load_bm25
+
+    bm25 = load_bm25(config.LOCAL_INDEX_DIR)
+    if bm25 is None:
+        return None
+    dense = vectorstore.as_retriever(search_kwargs={"k": config.TOP_K})
+    return HybridRetriever(dense=dense, bm25=bm25, k=config.HYBRID_TOP_K, candidates=config.TOP_K,
+                           directory=config.LOCAL_INDEX_DIR)
+
+def build_engine():
+    """Create the embedder, vector store, Groq LLM and its scheduler from config"""
+    import httpx
+    from langchain_groq import ChatGroq
+    from embeddings import build_embeddings
+
+    embeddings = build_embeddings()
+    vectorstore, index_fingerprint = build_vectorstore(embeddings)
+    retriever = build_retriever(vectorstore)
+    # Keep-alive connections are reused across sessions instead of a TLS handshake per call
+    http_client = httpx.Client(timeout=config.LLM_TIMEOUT_SECONDS,
+                               limits=httpx.Limits(max_connections=config.LLM_MAX_CONNECTIONS,
+                                                   max_keepalive_connections=config.LLM_MAX_CONNECTIONS))
+    llm = ChatGroq(model_name=config.LLM_MODEL, api_key=config.GROQ_API_KEY, temperature=config.LLM_TEMPERATURE,
+                   http_client=http_client)
+    scheduler = LLMScheduler(config.LLM_REQUESTS_PER_MINUTE, config.LLM_TOKENS_PER_MINUTE,
+                             max_queue=config.LLM_QUEUE_SIZE, max_wait=config.LLM_MAX_WAIT_SECONDS,
+                             headroom=config.LLM_RATE_HEADROOM, reserve=config.LLM_INTERACTIVE_RESERVE)
+    answer_cache = AnswerCache(config.ANSWER_CACHE_PATH,
+                               max_entries=config.ANSWER_CACHE_MAX_ENTRIES,
+                               ttl_seconds=config.ANSWER_CACHE_TTL_SECONDS)
+    semantic_cache = SemanticCache(capacity=config.SEMANTIC_CACHE_CAPACITY,
+                                   threshold=config.SEMANTIC_CACHE_THRESHOLD)
+    return QAEngine(embeddings, vectorstore, llm, answer_cache=answer_cache,
+                    semantic_cache=semantic_cache, precomputed=PrecomputedAnswers(config.PRECOMPUTED_PATH),
+                    retriever=retriever,
+                    index_fingerprint=index_fingerprint, scheduler=scheduler)
+
+# ------------------ Process-wide Instance ------------------
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_engine():
+    """Return the engine for this server process, building it once"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = build_engine()
+    return _engine
+
+def set_engine(engine):
+    """Replace the process-wide engine (used to plug in stand-ins)"""
+    global _engine
+    with _engine_lock:
+        _engine = engine
+
+# ------------------ Background Warm-up ------------------
+_warmup = {"state": "cold", "error": None, "started": None, "finished": None}
+_warmup_thread = None
+_warmup_lock = threading.Lock()
+
+def register_metrics(engine):
+    """Export the engine's cache, coalescing, embedding and scheduler stats as gauges"""
+    tracing.register_collector("flights", engine.flights.stats)
+    for name, component, labels in [
+        ("answer_cache", engine.answer_cache, None),
+        ("semantic_cache", engine.semantic_cache, {"": "profile"}),
+        ("embeddings", engine.embeddings, {"batching.batch_sizes": "size"}),
+        ("scheduler", engine.scheduler, {"admitted": "priority", "shed": "reason"}),
+    ]:
+        if hasattr(component, "stats"):
+            tracing.register_collector(name, component.stats, labels)
+
+def _run_warmup():
+    try:
+        engine = get_engine()
+        register_metrics(engine)
+        # Load the sentence-transformer weights and run one forward pass
+        engine.embeddings.embed_query("What does Article 21 of the Indian Constitution state?")
+        for profile in PROFILES:
+            engine.chain(profile)
+        _warmup["state"] = "ready"
+    except Exception as e:
+        _warmup["state"] = "failed"
+        _warmup["error"] = str(e)
+    _warmup["finished"] = time.time()
+
+def start_warmup():
+    """Import the heavy stack and load the embedder on a background thread (idempotent)"""
+    global _warmup_thread
+    tracing.start_metrics_server()
+    with _warmup_lock:
+        if _warmup_thread is not None and (_warmup_thread.is_alive() or _warmup["state"] == "ready"):
+            return
+        _warmup.update(state="warming", error=None, started=time.time(), finished=None)
+        _warmup_thread = threading.Thread(target=_run_warmup, name="qa-engine-warmup", daemon=True)
+        _warmup_thread.start()
+
+def is_ready():
+    """Readiness probe: True once the engine is built and the embedder is hot"""
+    return _warmup["state"] == "ready"
+
+def engine_status():
+    """Return the warm-up state, error and elapsed seconds for display or probing"""
+    status = dict(_warmup)
+    if status["started"] is not None:
+        status["seconds"] = round((status["finished"] or time.time()) - status["started"], 2)
+    return status
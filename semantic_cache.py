@@ -0,0 +1,109 @@
+# semantic_cache.py - In-memory semantic answer cache for paraphrased chat questions
+
+import re
+import threading
+import time
+
+import numpy as np
+
+# Article and amendment numbers such as 21, 51A or 243ZH, and Parts such as Part IVA
+_NUMBER = re.compile(r"\b\d+[a-z]{0,2}\b", re.IGNORECASE)
+_PART = re.compile(r"\bpart\s+([ivxl]+[a-c]?)\b", re.IGNORECASE)
+
+def references(question):
+    """Return the article/part identifiers mentioned in a question"""
+    found = [m.lower() for m in _NUMBER.findall(question)]
+    found += ["part " + m.lower() for m in _PART.findall(question)]
+    return frozenset(found)
+
+class _Table:
+    """Fixed-capacity vector table for one prompt profile"""
+
+    def __init__(self, capacity, dim):
+        self.vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self.last_used = np.zeros(capacity, dtype=np.float64)
+        self.entries = [None] * capacity
+        self.size = 0
+
+    def slot(self):
+        if self.size < len(self.entries):
+            self.size += 1
+            return self.size - 1
+        # Full: reuse the least recently used slot
+        return int(np.argmin(self.last_used))
+
+class SemanticCache:
+    """Nearest-neighbour lookup of previously answered questions, per prompt profile"""
+
+    def __init__(self, capacity=2000, threshold=0.93):
+        self.capacity = capacity
+        self.threshold = threshold
+        self._tables = {}
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def _profile_stats(self, profile):
+        return self._stats.setdefault(profile, {"hits": 0, "misses": 0, "saved_seconds": 0.0})
+
+    def lookup(self, profile, question, vector):
+        """Return the cached entry closest to `vector` if it clears the threshold, else None"""
+        query = _normalize(vector)
+        with self._lock:
+            stats = self._profile_stats(profile)
+            table = self._tables.get(profile)
+            if table is None or table.size == 0 or table.vectors.shape[1] != query.shape[0]:
+                stats["misses"] += 1
+                return None
+            scores = table.vectors[:table.size] @ query
+            best = int(np.argmax(scores))
+            entry = table.entries[best]
+            # Paraphrases must still point at the same articles: "Article 21" != "Article 22"
+            if scores[best] < self.threshold or entry["references"] != references(question):
+                stats["misses"] += 1
+                return None
+            table.last_used[best] = time.time()
+            stats["hits"] += 1
+            stats["saved_seconds"] += entry["latency"]
+            return dict(entry, similarity=float(scores[best]))
+
+    def add(self, profile, question, vector, answer, sources=(), latency=0.0):
+        """Remember an answer; `latency` is the generation time a future hit will save"""
+        vector = _normalize(vector)
+        with self._lock:
+            table = self._tables.get(profile)
+            if table is None:
+                table = self._tables[profile] = _Table(self.capacity, vector.shape[0])
+            i = table.slot()
+            table.vectors[i] = vector
+            table.last_used[i] = time.time()
+            table.entries[i] = {
+                "question": question,
+                "answer": answer,
+                "sources": list(sources),
+                "latency": latency,
+                "references": references(question),
+            }
+
+    def clear(self):
+        """Forget every cached answer (e.g. after the index is rebuilt)"""
+        with self._lock:
+            self._tables.clear()
+
+    def stats(self):
+        """Return per-profile entries, hit rate and seconds of LLM latency saved"""
+        with self._lock:
+            report = {}
+            for profile, stats in self._stats.items():
+                lookups = stats["hits"] + stats["misses"]
+                table = self._tables.get(profile)
+                report[profile] = dict(
+                    stats,
+                    entries=table.size if table else 0,
+                    hit_rate=stats["hits"] / lookups if lookups else 0.0,
+                )
+            return report
+
+def _normalize(vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
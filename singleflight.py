@@ -0,0 +1,128 @@
+# singleflight.py - Coalescing of identical in-flight questions across sessions
+#
+# The first session to ask a question becomes the leader and does the retrieval
+# and LLM call; sessions asking the same question before it finishes follow the
+# leader's flight and receive the same answer (streamed token by token when the
+# leader streams) instead of issuing their own Pinecone and Groq requests.
+
+import threading
+
+class Abandoned(Exception):
+    """A speculative flight was cancelled before anyone followed it"""
+
+class Flight:
+    """One in-flight answer: text parts as they are produced, then the final result or error"""
+
+    def __init__(self):
+        self.parts = []
+        self.result = None
+        self.error = None
+        self.done = False
+        self.followers = 0
+        # Most urgent scheduling priority of anyone waiting, and the leader's scheduler ticket
+        self.priority = None
+        self.ticket = None
+        self._condition = threading.Condition()
+
+    def append(self, text):
+        with self._condition:
+            self.parts.append(text)
+            self._condition.notify_all()
+
+    def finish(self, result):
+        with self._condition:
+            self.result = result
+            self.done = True
+            self._condition.notify_all()
+
+    def fail(self, error):
+        with self._condition:
+            self.error = error
+            self.done = True
+            self._condition.notify_all()
+
+    def wanted(self, priority):
+        """Note that a caller at `priority` waits on this flight; return the most urgent priority so far"""
+        with self._condition:
+            if self.priority is None or priority < self.priority:
+                self.priority = priority
+            return self.priority
+
+    def wait(self):
+        """Block until the flight lands and return its result (or raise its error)"""
+        with self._condition:
+            while not self.done:
+                self._condition.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+    def follow(self):
+        """Yield every text part, including those produced before the caller joined"""
+        seen = 0
+        while True:
+            with self._condition:
+                while seen == len(self.parts) and not self.done:
+                    self._condition.wait()
+                new = self.parts[seen:]
+                done = self.done
+            yield from new
+            seen += len(new)
+            if done and seen == len(self.parts):
+                break
+        if self.error is not None:
+            raise self.error
+
+class SingleFlight:
+    """Registry of in-flight answers keyed by normalized request"""
+
+    def __init__(self):
+        self.leaders = 0
+        self.followers = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def join(self, key):
+        """Return (flight, is_leader); the leader must call land() when the flight ends"""
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None:
+                flight.followers += 1
+                self.followers += 1
+                return flight, False
+            flight = self._flights[key] = Flight()
+            self.leaders += 1
+            return flight, True
+
+    def lead(self, key):
+        """Start a flight only if none is in flight for `key`; returns it, or None"""
+        with self._lock:
+            if key in self._flights:
+                return None
+            flight = self._flights[key] = Flight()
+            self.leaders += 1
+            return flight
+
+    def abandon(self, key, flight):
+        """Drop a flight nobody follows so its leader can stop; False once it has followers"""
+        with self._lock:
+            if flight.followers or self._flights.get(key) is not flight:
+                return False
+            del self._flights[key]
+            return True
+
+    def land(self, key, flight):
+        """Forget a finished flight so later requests start a new one (or hit the cache)"""
+        with self._lock:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def stats(self):
+        """Return in-flight count and how many requests led or followed a flight"""
+        requests = self.leaders + self.followers
+        return {
+            "in_flight": len(self._flights),
+            "leaders": self.leaders,
+            "followers": self.followers,
+            "coalesced_rate": self.followers / requests if requests else 0.0,
+        }
@@ -0,0 +1,126 @@
+# standins.py - Local stand-ins for Pinecone and Groq used by offline jobs and benchmarks
+
+import threading
+import time
+
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.vectorstores import InMemoryVectorStore
+
+from qa_engine import QAEngine
+
+# A handful of real Constitution chunks so retrieval has something to return
+SAMPLE_CHUNKS = [
+    ("Article 14. Equality before law. The State shall not deny to any person equality before the law or the equal protection of the laws within the territory of India.",
+     {"part": "III", "article": "14"}),
+    ("Article 19. Protection of certain rights regarding freedom of speech, etc. (1) All citizens shall have the right (a) to freedom of speech and expression; (b) to assemble peaceably and without arms; (c) to form associations or unions or co-operative societies; (d) to move freely throughout the territory of India; (e) to reside and settle in any part of the territory of India; and (g) to practise any profession, or to carry on any occupation, trade or business.",
+     {"part": "III", "article": "19"}),
+    ("Article 21. Protection of life and personal liberty. No person shall be deprived of his life or personal liberty except according to procedure established by law.",
+     {"part": "III", "article": "21"}),
+    ("Article 21A. Right to education. The State shall provide free and compulsory education to all children of the age of six to fourteen years in such manner as the State may, by law, determine.",
+     {"part": "III", "article": "21A"}),
+    ("Article 32. Remedies for enforcement of rights conferred by this Part. (1) The right to move the Supreme Court by appropriate proceedings for the enforcement of the rights conferred by this Part is guaranteed.",
+     {"part": "III", "article": "32"}),
+    ("Article 44. Uniform civil code for the citizens. The State shall endeavour to secure for the citizens a uniform civil code throughout the territory of India.",
+     {"part": "IV", "article": "44"}),
+    ("Article 51A. Fundamental duties. It shall be the duty of every citizen of India (a) to abide by the Constitution and respect its ideals and institutions, the National Flag and the National Anthem.",
+     {"part": "IVA", "article": "51A"}),
+    ("Article 324. Superintendence, direction and control of elections to be vested in an Election Commission.",
+     {"part": "XV", "article": "324"}),
+    ("Article 352. Proclamation of Emergency. (1) If the President is satisfied that a grave emergency exists whereby the security of India or of any part of the territory thereof is threatened, whether by war or external aggression or armed rebellion, he may, by Proclamation, make a declaration to that effect.",
+     {"part": "XVIII", "article": "352"}),
+    ("Article 356. Provisions in case of failure of constitutional machinery in States. (1) If the President, on receipt of a report from the Governor of a State or otherwise, is satisfied that a situation has arisen in which the Government of the State cannot be carried on in accordance with the provisions of this Constitution, the President may by Proclamation assume to himself all or any of the functions of the Government of the State.",
+     {"part": "XVIII", "article": "356"}),
+    ("Article 368. Power of Parliament to amend the Constitution and procedure therefor. (1) Notwithstanding anything in this Constitution, Parliament may in exercise of its constituent power amend by way of addition, variation or repeal any provision of this Constitution.",
+     {"part": "XX", "article": "368"}),
+    ("SEVENTH SCHEDULE (Article 246). List I - Union List. 1. Defence of India and every part thereof. List II - State List. 1. Public order. List III - Concurrent List. 1. Criminal law.",
+     {"part": "", "article": "", "schedule": "Seventh"}),
+]
+
+class FakeChatModel(BaseChatModel):
+    """Deterministic chat model that echoes the question after a configurable delay"""
+
+    latency: float = 0.0
+    tokens_per_second: float = 0.0
+    calls: int = 0
+
+    @property
+    def _llm_type(self):
+        return "legal-ease-fake"
+
+    def _answer(self, messages):
+        prompt = messages[-1].content
+        question = prompt.rsplit("User's Question:", 1)[-1].split("Your Answer", 1)[0].strip()
+        return f"Stand-in answer to: {question}"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        text = self._answer(messages)
+        time.sleep(self.latency + (len(text.split()) / self.tokens_per_second if self.tokens_per_second else 0.0))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency)
+        for word in self._answer(messages).split(" "):
+            if self.tokens_per_second:
+                time.sleep(1 / self.tokens_per_second)
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=word + " "))
+            if run_manager:
+                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+            yield chunk
+
+class RateLimitError(Exception):
+    """What the provider returns (HTTP 429) when a per-minute limit is exceeded"""
+
+class RateLimitedFakeChatModel(FakeChatModel):
+    """FakeChatModel that rejects calls beyond `max_requests` / `max_tokens` per `window` seconds"""
+
+    max_requests: int = 30
+    max_tokens: int = 6000
+    window: float = 60.0
+    rejected: int = 0
+
+    def __init__(self, **kwargs):
+        from llm_scheduler import TokenBucket
+
+        super().__init__(**kwargs)
+        # Provider-side buckets that refill continuously, like Groq's limits
+        self._requests = TokenBucket(self.max_requests, self.window)
+        self._tokens = TokenBucket(self.max_tokens, self.window)
+        self._limit_lock = threading.Lock()
+
+    def _check(self, messages):
+        # Same four-characters-per-token estimate as the scheduler
+        tokens = len(messages[-1].content) // 4 + len(self._answer(messages)) // 4
+        with self._limit_lock:
+            now = time.monotonic()
+            if self._requests.delay(1, now) > 0 or self._tokens.delay(tokens, now) > 0:
+                self.rejected += 1
+                raise RateLimitError("429 Too Many Requests: rate limit exceeded")
+            self._requests.take(1)
+            self._tokens.take(tokens)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self._check(messages)
+        return super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        self._check(messages)
+        yield from super()._stream(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+def build_standin_engine(chunks=SAMPLE_CHUNKS, latency=0.0, tokens_per_second=0.0, llm=None,
+                         embeddings=None, vectorstore=None, **engine_kwargs):
+    """Return a QAEngine over an in-memory vector store and the fake chat model"""
+    if embeddings is None:
+        embeddings = DeterministicFakeEmbedding(size=384)
+    if vectorstore is None:
+        vectorstore = InMemoryVectorStore(embeddings)
+        vectorstore.add_texts([text for text, _ in chunks], metadatas=[meta for _, meta in chunks])
+    if llm is None:
+        llm = FakeChatModel(latency=latency, tokens_per_second=tokens_per_second)
+    engine_kwargs.setdefault("index_fingerprint", lambda: "standin")
+    engine_kwargs.setdefault("model_name", "standin")
+    return QAEngine(embeddings, vectorstore, llm, **engine_kwargs)
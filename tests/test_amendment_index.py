@@ -0,0 +1,29 @@
+# test_amendment_index.py - Attributing amendment footnotes to the provisions they changed
+
+from amendment_index import AmendmentIndex
+from ingest import chunk_sections, split_sections
+
+PAGE = """PART III
+FUNDAMENTAL RIGHTS
+21. Protection of life and personal liberty.—No person shall be deprived of his life.
+1[21A. Right to education.—The State shall provide free and compulsory education.]
+22. Protection against arrest and detention in certain cases.—(1) No person who is arrested
+shall be detained 2*** without being informed of the grounds.
+1. Ins. by the Constitution (Eighty-sixth Amendment) Act, 2002, s. 2.
+2. The words "in custody" omitted by the Constitution (Forty-fourth Amendment) Act, 1978, s. 3.
+3. Subs. by the Constitution (Forty-fourth Amendment) Act, 1978, s. 4.
+"""
+
+def build():
+    return AmendmentIndex.from_chunks(chunk_sections(split_sections(PAGE, "page.txt")))
+
+def test_footnote_goes_to_the_article_carrying_its_marker():
+    index = build()
+    assert index.changed_articles(86) == ["21A"]
+    assert [item["amendment"] for item in index.article_history("21A")] == [86]
+    assert index.article_history("21") == []
+
+def test_footnote_without_a_marker_goes_to_the_article_it_follows():
+    index = build()
+    assert [(item["amendment"], item["action"]) for item in index.article_history("22")] == [(44, "omitted"), (44, "substituted")]
+    assert [item["article"] for item in index.part_history("III")] == ["22", "22", "21A"]
@@ -0,0 +1,83 @@
+# test_answer_cache.py - Exact-match answers: TTL, LRU eviction and index versions
+
+import pytest
+
+import answer_cache
+from answer_cache import AnswerCache, cache_key
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self):
+        self.now += 1.0
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(answer_cache, "time", clock)
+    return clock
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    return AnswerCache(str(tmp_path / "answers.sqlite3"), max_entries=10, ttl_seconds=100)
+
+def question(i):
+    return f"What does Article {i} say?"
+
+def test_repeated_prompt_is_a_hit(cache):
+    cache.put("chat", "What does  Article 14 say?", "llama", "v1", "Equality before law.", [{"page_content": "14."}])
+    hit = cache.get("chat", "what does article 14 say?", "llama", "v1")
+    assert hit == {"answer": "Equality before law.", "sources": [{"page_content": "14."}]}
+    assert cache.get("explorer", "What does Article 14 say?", "llama", "v1") is None
+    assert cache.get("chat", "What does Article 14 say?", "other-model", "v1") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+def test_entries_expire_after_the_ttl(cache, clock):
+    cache.put("chat", question(14), "llama", "v1", "Equality before law.")
+    assert cache.get("chat", question(14), "llama", "v1") is not None
+    clock.now += 100
+    assert cache.get("chat", question(14), "llama", "v1") is None
+    assert cache.stats()["entries"] == 0
+
+def test_least_recently_used_entries_are_evicted(cache):
+    for i in range(10):
+        cache.put("chat", question(i), "llama", "v1", f"answer {i}")
+    # Reading the oldest two makes them recent
+    assert cache.get("chat", question(0), "llama", "v1") is not None
+    assert cache.get("chat", question(1), "llama", "v1") is not None
+    cache.put("chat", question(10), "llama", "v1", "answer 10")
+    # Trimmed to 90% of the cap, dropping the least recently used
+    assert cache.stats()["entries"] == 9
+    assert cache.get("chat", question(2), "llama", "v1") is None
+    assert cache.get("chat", question(3), "llama", "v1") is None
+    for i in (0, 1, 4, 10):
+        assert cache.get("chat", question(i), "llama", "v1") is not None
+
+def test_a_new_index_version_invalidates_older_answers(cache):
+    cache.put("chat", question(14), "llama", "v1", "old")
+    cache.put("chat", question(15), "llama", "v2", "new")
+    assert cache.invalidate("v2") == 1
+    assert cache.get("chat", question(14), "llama", "v1") is None
+    assert cache.get("chat", question(15), "llama", "v2")["answer"] == "new"
+
+def test_grounding_is_part_of_the_key():
+    assert cache_key("explorer", "Explain Article 21.", "llama", "v1") != \
+        cache_key("explorer", "Explain Article 21.", "llama", "v1", grounding="abc")
+
+def test_engine_invalidates_the_cache_when_the_index_changes(tmp_path, monkeypatch):
+    import config
+    from standins import build_standin_engine
+
+    monkeypatch.setattr(config, "INDEX_VERSION_REFRESH_SECONDS", -1)
+    version = ["v1"]
+    cache = AnswerCache(str(tmp_path / "answers.sqlite3"))
+    engine = build_standin_engine(answer_cache=cache, index_fingerprint=lambda: version[0])
+    engine.invoke("chat", question(21))
+    engine.invoke("chat", question(21))
+    assert engine.llm.calls == 1
+    version[0] = "v2"
+    engine.invoke("chat", question(21))
+    assert engine.llm.calls == 2
+    assert cache.stats()["entries"] == 1
@@ -0,0 +1,67 @@
+# test_bm25.py - Keyword scoring and reciprocal rank fusion
+
+import math
+
+import pytest
+from langchain_core.documents import Document
+
+from bm25 import BM25Index, reciprocal_rank_fusion, tokenize
+
+TEXTS = [
+    "Article 51A. Fundamental duties of every citizen.",
+    "Article 21. Protection of life and personal liberty. No person shall be deprived of his life.",
+    "Article 21A. Right to education. The State shall provide free and compulsory education.",
+    "Article 243ZH. Definitions for co-operative societies.",
+]
+
+@pytest.fixture
+def index():
+    return BM25Index.build([f"c{i}" for i in range(len(TEXTS))], TEXTS, [{"row": i} for i in range(len(TEXTS))])
+
+def test_tokens_keep_article_ids_and_drop_stopwords():
+    assert tokenize("What does Article 243ZH say about the State?") == ["article", "243zh", "say"]
+
+def test_scores_follow_okapi_bm25(index):
+    (row, score), = index.search("liberty")
+    assert row == 1
+    n, df, tf = len(TEXTS), 1, 1
+    length = len(tokenize(TEXTS[1]))
+    average = sum(len(tokenize(text)) for text in TEXTS) / n
+    idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+    expected = idf * tf * 2.5 / (tf + 1.5 * (1 - 0.75 + 0.75 * length / average))
+    assert score == pytest.approx(expected, rel=1e-5)
+
+def test_repeated_and_rare_terms_rank_higher(index):
+    # "life" appears twice in Article 21; "education" twice in 21A
+    assert [row for row, _ in index.search("life education", k=4)][:2] in ([1, 2], [2, 1])
+    assert index.search("education")[0][0] == 2
+    assert index.search("243zh")[0][0] == 3
+    assert index.search("unrelated words only") == []
+
+def test_documents_carry_metadata_and_score(index):
+    doc = index.documents("duties", k=1)[0]
+    assert doc.id == "c0" and doc.metadata["row"] == 0 and doc.metadata["bm25"] > 0
+
+def test_rrf_rewards_agreement_between_rankings():
+    a, b, c, d = (Document(page_content=text) for text in "abcd")
+    fused = reciprocal_rank_fusion([[a, b, c], [d, b, c]], k=4)
+    # Found by both retrievers, b and c outrank the documents only one of them ranked first
+    assert [doc.page_content for doc in fused] == ["b", "c", "a", "d"]
+
+def test_rrf_scores_are_reciprocal_ranks():
+    a, b = Document(page_content="a"), Document(page_content="b")
+    # a: 1/61 + 1/62; b: 1/61 (first in the second list only) -> a first
+    assert [doc.page_content for doc in reciprocal_rank_fusion([[a], [b, a]], k=2, rrf_k=60)] == ["a", "b"]
+    assert len(reciprocal_rank_fusion([[a, b], [b, a]], k=1)) == 1
+
+def test_hybrid_retriever_fuses_dense_and_keyword_results(index):
+    from bm25 import HybridRetriever
+
+    class Dense:
+        def invoke(self, query):
+            # Semantic neighbours that miss the exact article id
+            return [Document(page_content=TEXTS[1]), Document(page_content=TEXTS[0])]
+
+    retriever = HybridRetriever(dense=Dense(), bm25=index, k=2, candidates=3)
+    docs = retriever.invoke("right to education")
+    assert [doc.page_content for doc in docs] == [TEXTS[1], TEXTS[2]]
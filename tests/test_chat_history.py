@@ -0,0 +1,56 @@
+# test_chat_history.py - Bounded chat history: spilling older turns and reading pages back
+
+import gc
+import os
+
+import pytest
+
+from chat_history import ChatHistory
+
+@pytest.fixture
+def history(tmp_path):
+    history = ChatHistory(memory=3, directory=str(tmp_path))
+    for i in range(1, 11):
+        history.append(f"question {i}", f"answer {i}", asked_at=float(i))
+    return history
+
+def test_only_the_newest_turns_stay_in_memory(history):
+    assert len(history) == 10
+    assert [turn[2] for turn in history.recent] == ["question 8", "question 9", "question 10"]
+    assert len(history.offsets) == 7
+    with open(history.path, encoding="utf-8") as f:
+        assert sum(1 for _ in f) == 7
+
+def test_entries_span_the_spill_file_and_memory(history):
+    turns = history.entries(5, 9)
+    assert [turn[2] for turn in turns] == ["question 6", "question 7", "question 8", "question 9"]
+    assert turns[0] == (6.0, "typed", "question 6", "answer 6")
+
+def test_pages_are_newest_first_with_turn_numbers(history):
+    assert history.pages(size=4) == 3
+    assert [(n, turn[2]) for n, turn in history.page(0, size=4)] == \
+        [(10, "question 10"), (9, "question 9"), (8, "question 8"), (7, "question 7")]
+    assert [n for n, _ in history.page(1, size=4)] == [6, 5, 4, 3]
+    # The oldest page is partial and read entirely from disk
+    assert [(n, turn[3]) for n, turn in history.page(2, size=4)] == [(2, "answer 2"), (1, "answer 1")]
+    assert history.page(3, size=4) == []
+
+def test_an_empty_history_has_one_empty_page(tmp_path):
+    history = ChatHistory(memory=3, directory=str(tmp_path))
+    assert history.pages() == 1 and history.page(0) == []
+
+def test_unicode_answers_survive_the_spill(tmp_path):
+    history = ChatHistory(memory=1, directory=str(tmp_path))
+    history.append("अनुच्छेद 21?", "प्राण और दैहिक स्वतंत्रता का संरक्षण")
+    history.append("Article 22?", "Protection against arrest.")
+    assert history.entries(0, 1)[0][3] == "प्राण और दैहिक स्वतंत्रता का संरक्षण"
+
+def test_the_spill_file_is_removed_with_the_session(tmp_path):
+    history = ChatHistory(memory=1, directory=str(tmp_path))
+    history.append("Article 14?", "Equality before law.")
+    history.append("Article 15?", "Prohibition of discrimination.")
+    path = history.path
+    assert os.path.exists(path)
+    del history
+    gc.collect()
+    assert not os.path.exists(path)
@@ -0,0 +1,49 @@
+# test_constitution.py - The article table before and after ingestion
+
+import pytest
+
+import config
+from article_index import ArticleIndex, get_article_index, reload_article_index
+from constitution import ConstitutionTable, expand_range, get_constitution, reload_constitution
+from standins import build_standin_engine
+
+def test_catalogue_lists_lettered_articles():
+    table = ConstitutionTable.from_catalogue()
+    assert table.get("21A") == {"article": "21A", "title": "", "part": "III"}
+    assert table.get("31") == {"article": "31", "title": "Omitted", "part": "III"}
+    assert [table.ids[row] for row in table.filter(article_range="243P-243ZG")] == expand_range("243P-243ZG")
+    assert len(expand_range("243P-243ZG")) == 18
+    assert table.part_count("IXA") == 18
+    assert table.part_count("IV") == 20
+
+def test_ingested_titles_are_merged_into_the_catalogue():
+    index = ArticleIndex({"21A": {"title": "Right to education", "part": "III"}})
+    table = ConstitutionTable.from_article_index(index)
+    assert table.get("21A")["title"] == "Right to education"
+    assert table.get("21")["part"] == "III"
+    assert len(table) == len(ConstitutionTable.from_catalogue())
+
+@pytest.fixture
+def articles_path(tmp_path, monkeypatch):
+    # An unversioned index directory: articles.json at the top level
+    path = str(tmp_path / config.ARTICLE_INDEX_FILE)
+    monkeypatch.setattr(config, "LOCAL_INDEX_DIR", str(tmp_path))
+    monkeypatch.setattr(config, "INDEX_VERSION_REFRESH_SECONDS", -1)
+    yield path
+    # Leave no process-wide table built from this test's file behind
+    reload_article_index()
+    reload_constitution()
+
+def test_reingestion_reloads_the_article_table(articles_path):
+    version = ["v1"]
+    engine = build_standin_engine(index_fingerprint=lambda: version[0])
+    ArticleIndex({"21A": {"title": "Right to education", "part": "III"}}).save(articles_path)
+    engine.index_version()
+    assert get_constitution().get("21A")["title"] == "Right to education"
+    ArticleIndex({"21A": {"title": "Right to free and compulsory education", "part": "III"}}).save(articles_path)
+    engine.index_version()
+    assert get_constitution().get("21A")["title"] == "Right to education"
+    version[0] = "v2"
+    engine.index_version()
+    assert get_article_index().articles["21A"]["title"] == "Right to free and compulsory education"
+    assert get_constitution().get("21A")["title"] == "Right to free and compulsory education"
@@ -0,0 +1,141 @@
+# test_embeddings.py - Query embedding LRU (hits, eviction, float32 storage) and micro-batching
+
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from embeddings import CachedEmbeddings, MicroBatchingEmbeddings
+
+class Recorder:
+    def __init__(self):
+        self.queries = []
+
+    def embed_query(self, text):
+        self.queries.append(text)
+        return [len(text) / 3, 1.0, 0.1]
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+@pytest.fixture
+def base():
+    return Recorder()
+
+def test_repeated_query_is_served_from_the_cache(base):
+    cache = CachedEmbeddings(base, "minilm")
+    first = cache.embed_query("What does Article 21 say?")
+    second = cache.embed_query("  what does   article 21 SAY? ")
+    assert second == first
+    assert base.queries == ["What does Article 21 say?"]
+    assert cache.stats() == {"entries": 1, "hits": 1, "misses": 1, "hit_rate": 0.5}
+
+def test_vectors_are_stored_as_float32(base):
+    cache = CachedEmbeddings(base, "minilm")
+    vector = cache.embed_query("Article 14")
+    stored = next(iter(cache._vectors.values()))
+    assert stored.dtype == np.float32
+    assert vector == pytest.approx([10 / 3, 1.0, 0.1], rel=1e-6)
+    assert isinstance(vector[0], float)
+
+def test_least_recently_used_entry_is_evicted(base):
+    cache = CachedEmbeddings(base, "minilm", max_entries=2)
+    cache.embed_query("Article 14")
+    cache.embed_query("Article 19")
+    cache.embed_query("Article 14")
+    cache.embed_query("Article 21")
+    assert cache.stats()["entries"] == 2
+    cache.embed_query("Article 14")
+    cache.embed_query("Article 19")
+    assert base.queries == ["Article 14", "Article 19", "Article 21", "Article 19"]
+
+def test_model_name_is_part_of_the_key(base):
+    fp32 = CachedEmbeddings(base, "minilm")
+    fp32.embed_query("Article 14")
+    int8 = CachedEmbeddings(base, "minilm-int8")
+    int8._vectors = fp32._vectors
+    int8.embed_query("Article 14")
+    assert int8.misses == 1
+    assert len(fp32._vectors) == 2
+
+def test_documents_bypass_the_cache(base):
+    cache = CachedEmbeddings(base, "minilm")
+    cache.embed_documents(["Article 14", "Article 14"])
+    assert cache.stats()["entries"] == 0
+    assert len(base.queries) == 2
+
+# ------------------ Micro-batching ------------------
+
+class Gate(Recorder):
+    """Holds the first batch until released so later queries pile up in the queue"""
+
+    def __init__(self, error=None):
+        super().__init__()
+        self.batches = []
+        self.error = error
+        self.release = threading.Event()
+
+    def embed_documents(self, texts):
+        self.batches.append(list(texts))
+        if len(self.batches) == 1:
+            self.release.wait(5)
+        if self.error:
+            raise self.error
+        return super().embed_documents(texts)
+
+def call_concurrently(batcher, base, count):
+    results = {}
+
+    def ask(i):
+        try:
+            results[i] = batcher.embed_query(f"Article {i}")
+        except Exception as exc:
+            results[i] = exc
+
+    first = threading.Thread(target=ask, args=(0,))
+    first.start()
+    while not base.batches:
+        time.sleep(0.001)
+    threads = [threading.Thread(target=ask, args=(i,)) for i in range(1, count + 1)]
+    for thread in threads:
+        thread.start()
+    while batcher._queue.qsize() < count:
+        time.sleep(0.001)
+    base.release.set()
+    for thread in [first, *threads]:
+        thread.join(5)
+    return results
+
+def test_concurrent_queries_share_one_batch():
+    base = Gate()
+    batcher = MicroBatchingEmbeddings(base, max_wait=0.5, max_batch_size=32)
+    results = call_concurrently(batcher, base, 8)
+    assert sorted(map(len, base.batches)) == [1, 8]
+    assert results[5] == base.embed_query("Article 5")
+    stats = batcher.stats()
+    assert stats["batch_sizes"] == {1: 1, 8: 1}
+    assert stats["mean_batch_size"] == 4.5
+
+def test_batches_are_split_at_max_batch_size():
+    base = Gate()
+    batcher = MicroBatchingEmbeddings(base, max_wait=0.05, max_batch_size=4)
+    results = call_concurrently(batcher, base, 10)
+    assert [len(batch) for batch in base.batches] == [1, 4, 4, 2]
+    assert len(results) == 11
+
+def test_a_lone_query_is_not_held_for_the_window():
+    base = Recorder()
+    batcher = MicroBatchingEmbeddings(base, max_wait=5)
+    started = time.perf_counter()
+    assert batcher.embed_query("Article 14") == base.embed_query("Article 14")
+    assert time.perf_counter() - started < 1
+
+def test_a_failed_batch_raises_for_every_caller():
+    error = RuntimeError("model unavailable")
+    base = Gate(error=error)
+    batcher = MicroBatchingEmbeddings(base, max_wait=0.5)
+    results = call_concurrently(batcher, base, 3)
+    assert all(result is error for result in results.values())
+    assert len(results) == 4
+    assert batcher.stats()["batches"] == 0
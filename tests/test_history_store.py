@@ -0,0 +1,27 @@
+# test_history_store.py - Reusing a user's earlier answers
+
+import pytest
+
+from history_store import HistoryStore
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(str(tmp_path / "history.sqlite3"), flush_seconds=0.01)
+    store.add("alice", "s1", "What does Article 14 of the Indian Constitution say?", "Equality before law.")
+    store.add("alice", "s1", "What is Part IVA of the Constitution about?", "Fundamental duties.")
+    store.flush()
+    return store
+
+def test_same_question_is_reused(store):
+    prior = store.find_prior("alice", "what does article 14 of the Indian Constitution say")
+    assert prior is not None and prior["answer"] == "Equality before law."
+
+def test_different_article_with_identical_wording_is_not_reused(store):
+    assert store.find_prior("alice", "What does Article 15 of the Indian Constitution say?") is None
+    assert store.find_prior("alice", "What does Article 21 of the Indian Constitution say?") is None
+
+def test_different_part_is_not_reused(store):
+    assert store.find_prior("alice", "What is Part IV of the Constitution about?") is None
+
+def test_other_users_history_is_not_reused(store):
+    assert store.find_prior("bob", "What does Article 14 of the Indian Constitution say?") is None
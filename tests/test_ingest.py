@@ -0,0 +1,146 @@
+# test_ingest.py - Incremental ingestion into the versioned local index
+
+import os
+import sys
+import types
+
+import pytest
+from langchain_core.embeddings import DeterministicFakeEmbedding
+
+import ingest
+from amendment_index import load_amendment_index
+from article_index import load_article_index
+from bm25 import load_bm25
+from local_index import LocalVectorIndex, current_version, version_file
+
+ORIGINAL = """PART III
+FUNDAMENTAL RIGHTS
+14. Equality before law.—The State shall not deny to any person equality before the law.
+15. Prohibition of discrimination.—The State shall not discriminate against any citizen.
+16. Equality of opportunity in matters of public employment.—There shall be equality of opportunity.
+"""
+
+def write(tmp_path, text):
+    path = tmp_path / "constitution.txt"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+@pytest.fixture
+def index_dir(tmp_path):
+    return str(tmp_path / "index")
+
+def run(tmp_path, index_dir, text, **kwargs):
+    return ingest.ingest([write(tmp_path, text)], DeterministicFakeEmbedding(size=8), index_dir=index_dir,
+                         log=lambda message: None, **kwargs)
+
+def test_reingestion_embeds_only_added_and_changed_chunks(tmp_path, index_dir):
+    first = run(tmp_path, index_dir, ORIGINAL)
+    assert first["added"] == first["chunks"] and first["removed"] == 0
+    assert run(tmp_path, index_dir, ORIGINAL)["added"] == 0
+    amended = ORIGINAL.replace("any citizen.", "any citizen on grounds only of religion.")
+    amended = amended.replace("16. Equality of opportunity", "17. Abolition of Untouchability")
+    summary = run(tmp_path, index_dir, amended)
+    # Article 15 changed, 16 was replaced by 17, 14 is reused
+    assert (summary["added"], summary["removed"]) == (2, 2)
+    assert summary["chunks"] == first["chunks"]
+
+def test_a_different_model_reembeds_every_chunk(tmp_path, index_dir):
+    run(tmp_path, index_dir, ORIGINAL)
+    summary = run(tmp_path, index_dir, ORIGINAL, model_name="other-model")
+    assert summary["added"] == summary["chunks"]
+    assert LocalVectorIndex.load(index_dir).info["model"] == "other-model"
+
+def test_derived_indexes_are_written_into_the_current_version(tmp_path, index_dir):
+    run(tmp_path, index_dir, ORIGINAL)
+    version = current_version(index_dir)
+    for name in ("articles.json", "amendments.json", "bm25.npz"):
+        assert os.path.dirname(version_file(index_dir, name)) == version
+        assert not os.path.exists(os.path.join(index_dir, name))
+    assert "15" in load_article_index(version_file(index_dir, "articles.json"))
+    assert load_amendment_index(version_file(index_dir, "amendments.json")) is not None
+    bm25 = load_bm25(index_dir)
+    assert "Prohibition of discrimination" in bm25.texts[bm25.search("discrimination")[0][0]]
+
+def test_an_empty_parse_is_refused(tmp_path, index_dir):
+    with pytest.raises(ValueError):
+        run(tmp_path, index_dir, "")
+
+def test_a_running_engine_picks_up_a_reingested_local_index(tmp_path, index_dir, monkeypatch):
+    import config
+    from qa_engine import build_retriever, build_vectorstore
+    from standins import build_standin_engine
+
+    monkeypatch.setattr(config, "LOCAL_INDEX_DIR", index_dir)
+    monkeypatch.setattr(config, "VECTOR_BACKEND", "local")
+    monkeypatch.setattr(config, "RETRIEVAL_MODE", "hybrid")
+    monkeypatch.setattr(config, "INDEX_VERSION_REFRESH_SECONDS", -1)
+    embeddings = DeterministicFakeEmbedding(size=8)
+    run(tmp_path, index_dir, ORIGINAL)
+    vectorstore, fingerprint = build_vectorstore(embeddings)
+    retriever = build_retriever(vectorstore)
+    engine = build_standin_engine(embeddings=embeddings, vectorstore=vectorstore, retriever=retriever,
+                                  index_fingerprint=fingerprint)
+    before = engine.index_version()
+
+    run(tmp_path, index_dir, ORIGINAL.replace("16. Equality of opportunity", "17. Abolition of Untouchability"))
+    assert engine.index_version() != before
+    assert any("Untouchability" in text for text in vectorstore.index.texts)
+    assert any("Untouchability" in text for text in retriever.bm25.texts)
+    assert any("Untouchability" in doc.page_content for doc in retriever.invoke("Untouchability"))
+
+class FakePinecone:
+    """The slice of the Pinecone client sync_pinecone uses, over a dict of vectors"""
+
+    def __init__(self, stored):
+        self.stored = stored
+        self.upserted = []
+
+    def __call__(self, api_key):
+        return self
+
+    def Index(self, name):
+        return self
+
+    def list(self):
+        yield list(self.stored)
+
+    def upsert(self, vectors):
+        self.upserted.extend(vector["id"] for vector in vectors)
+        self.stored.update((vector["id"], vector) for vector in vectors)
+
+    def delete(self, ids):
+        for chunk_id in ids:
+            del self.stored[chunk_id]
+
+@pytest.fixture
+def pinecone(monkeypatch):
+    # Vectors from an upload made before ingest.py kept a manifest
+    fake = FakePinecone({"legacy-1": {}, "legacy-2": {}})
+    monkeypatch.setitem(sys.modules, "pinecone", types.SimpleNamespace(Pinecone=fake))
+    return fake
+
+def test_pinecone_is_diffed_against_its_manifest(tmp_path, index_dir, pinecone):
+    first = run(tmp_path, index_dir, ORIGINAL, target="pinecone")
+    # Without a manifest the stored ids are listed, so the legacy vectors are replaced
+    assert (first["pinecone_upserted"], first["pinecone_deleted"]) == (first["chunks"], 2)
+    assert set(pinecone.stored) == set(LocalVectorIndex.load(index_dir).ids)
+    assert os.path.exists(os.path.join(index_dir, "pinecone.json"))
+
+    pinecone.upserted.clear()
+    unchanged = run(tmp_path, index_dir, ORIGINAL, target="both")
+    assert (unchanged["pinecone_upserted"], unchanged["pinecone_deleted"]) == (0, 0)
+
+    amended = run(tmp_path, index_dir, ORIGINAL.replace("any citizen.", "any citizen on grounds of religion."),
+                  target="pinecone")
+    assert (amended["pinecone_upserted"], amended["pinecone_deleted"]) == (1, 1)
+    assert any("religion" in vector["metadata"]["text"] for vector in pinecone.stored.values())
+
+def test_pinecone_is_fully_replaced_for_a_new_model(tmp_path, index_dir, pinecone):
+    run(tmp_path, index_dir, ORIGINAL, target="pinecone")
+    summary = run(tmp_path, index_dir, ORIGINAL, target="pinecone", model_name="other-model")
+    assert summary["pinecone_upserted"] == summary["chunks"] and summary["pinecone_deleted"] == 0
+
+def test_the_local_index_alone_does_not_touch_pinecone(tmp_path, index_dir, pinecone):
+    run(tmp_path, index_dir, ORIGINAL)
+    assert set(pinecone.stored) == {"legacy-1", "legacy-2"}
+    assert not os.path.exists(os.path.join(index_dir, "pinecone.json"))
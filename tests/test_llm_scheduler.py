@@ -0,0 +1,81 @@
+# test_llm_scheduler.py - Rate budgets and priorities of the LLM scheduler
+
+import threading
+import time
+
+import pytest
+
+from llm_scheduler import BACKGROUND, BULK, INTERACTIVE, Busy, LLMScheduler
+
+def test_budget_stays_below_provider_limits():
+    scheduler = LLMScheduler(30, 6000)
+    assert scheduler.requests.capacity == pytest.approx(27)
+    assert scheduler.tokens.capacity == pytest.approx(5400)
+    admitted = 0
+    scheduler.max_wait = 0.0
+    try:
+        while True:
+            scheduler.acquire(1, INTERACTIVE)
+            admitted += 1
+    except Busy:
+        pass
+    assert admitted == 27
+
+def test_interactive_request_is_admitted_before_waiting_background_work():
+    # One request per 0.2 s, none available at the start
+    scheduler = LLMScheduler(1, 10 ** 6, period=0.2, headroom=1.0, reserve=0.0)
+    scheduler.acquire(1, INTERACTIVE)
+    order = []
+
+    def ask(priority):
+        scheduler.acquire(1, priority)
+        order.append(priority)
+
+    background = threading.Thread(target=ask, args=(BACKGROUND,))
+    background.start()
+    time.sleep(0.05)
+    interactive = threading.Thread(target=ask, args=(INTERACTIVE,))
+    interactive.start()
+    background.join(2)
+    interactive.join(2)
+    assert order == [INTERACTIVE, BACKGROUND]
+
+def test_full_queue_sheds_the_lowest_priority_waiter():
+    scheduler = LLMScheduler(1, 10 ** 6, max_queue=1, period=60.0, headroom=1.0, reserve=0.0)
+    scheduler.acquire(1, INTERACTIVE)
+    outcome = {}
+
+    def wait_in_background():
+        try:
+            scheduler.acquire(1, BACKGROUND)
+        except Busy as e:
+            outcome["background"] = e.reason
+
+    background = threading.Thread(target=wait_in_background)
+    background.start()
+    time.sleep(0.05)
+    scheduler.max_wait = 0.05
+    with pytest.raises(Busy):
+        # Takes the queue slot from the background waiter, then times out itself
+        scheduler.acquire(1, INTERACTIVE)
+    background.join(2)
+    assert outcome["background"] == "evicted"
+
+def test_background_work_cannot_spend_the_interactive_reserve():
+    scheduler = LLMScheduler(30, 6000)
+    # A full-context background answer would leave too little for the next question
+    with pytest.raises(Busy) as shed:
+        scheduler.acquire(5000, BACKGROUND)
+    assert shed.value.reason == "reserve"
+    scheduler.max_wait = 0.0
+    assert scheduler.acquire(5000, INTERACTIVE) == 5000
+
+def test_bulk_work_waits_while_the_buckets_are_below_the_reserve():
+    scheduler = LLMScheduler(30, 6000, period=1.0)
+    scheduler.acquire(4000, INTERACTIVE)
+    # 1400 tokens left; 1000 more would dip into the 1350-token reserve
+    scheduler.max_wait = 0.0
+    with pytest.raises(Busy):
+        scheduler.acquire(1000, BULK)
+    scheduler.max_wait = 2.0
+    assert scheduler.acquire(1000, BULK) == 1000
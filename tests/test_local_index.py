@@ -0,0 +1,77 @@
+# test_local_index.py - Vector search and versioned builds of the local index
+
+import os
+
+import numpy as np
+import pytest
+
+from local_index import KEEP_VERSIONS, LocalVectorIndex, LocalVectorStore, current_version, read_info
+
+IDS = ["a", "b", "c"]
+TEXTS = ["Article 14. Equality before law.", "Article 15. Prohibition of discrimination.", "Article 21. Life."]
+METADATAS = [{"article": "14"}, {"article": "15"}, {"article": "21"}]
+VECTORS = np.array([[1, 0, 0], [0.6, 0.8, 0], [0, 0, 2]], dtype=np.float32)
+
+@pytest.fixture
+def directory(tmp_path):
+    return str(tmp_path / "index")
+
+def build(directory, texts=TEXTS, **kwargs):
+    return LocalVectorIndex.build(directory, IDS, texts, METADATAS, VECTORS, model_name="mini", **kwargs)
+
+def test_search_ranks_by_cosine_similarity(directory):
+    index = build(directory)
+    results = index.search([2.0, 0.1, 0.0], k=2)
+    assert [row for row, _ in results] == [0, 1]
+    assert results[0][1] == pytest.approx(2.0 / np.linalg.norm([2.0, 0.1]), rel=1e-5)
+    # Vectors are stored normalized, so a longer one does not win on length
+    assert index.search([0, 0, 1], k=1)[0][1] == pytest.approx(1.0)
+
+def test_store_returns_documents_with_metadata_and_score(directory):
+    store = LocalVectorStore(build(directory), embeddings=None)
+    docs = store.similarity_search_by_vector([0, 1, 0], k=1)
+    assert docs[0].page_content == TEXTS[1]
+    assert docs[0].metadata["article"] == "15" and docs[0].metadata["score"] == pytest.approx(0.8)
+    assert docs[0].id == "b"
+
+def test_reload_memory_maps_the_same_index(directory):
+    built = build(directory)
+    loaded = LocalVectorIndex.load(directory)
+    assert isinstance(loaded.vectors, np.memmap)
+    assert loaded.info == built.info == read_info(directory)
+    assert loaded.info["fingerprint"] == built.fingerprint and loaded.info["model"] == "mini"
+
+def test_a_rebuild_switches_current_and_keeps_the_last_versions(directory):
+    first = build(directory)
+    old_version = current_version(directory)
+    reader = LocalVectorIndex.load(directory)
+    second = build(directory, texts=TEXTS[:2] + ["Article 21. Protection of life and personal liberty."])
+    assert second.fingerprint != first.fingerprint
+    assert current_version(directory) != old_version
+    assert read_info(directory)["fingerprint"] == second.fingerprint
+    # A reader that loaded the old version keeps searching it
+    assert reader.texts[2] == "Article 21. Life." and reader.search([0, 0, 1], k=1)[0][0] == 2
+    for _ in range(KEEP_VERSIONS):
+        build(directory)
+    assert len(os.listdir(os.path.join(directory, "versions"))) == KEEP_VERSIONS
+    assert not os.path.exists(old_version)
+
+def test_artifacts_are_written_before_the_switch(directory):
+    seen = {}
+
+    def save(path):
+        seen["current_at_save"] = read_info(directory)
+        with open(path, "w") as f:
+            f.write("{}")
+
+    build(directory, artifacts={"articles.json": save})
+    assert seen["current_at_save"] is None
+    assert os.path.exists(os.path.join(current_version(directory), "articles.json"))
+
+def test_an_unversioned_directory_still_loads(directory):
+    build(directory)
+    version = current_version(directory)
+    for name in os.listdir(version):
+        os.replace(os.path.join(version, name), os.path.join(directory, name))
+    os.remove(os.path.join(directory, "CURRENT"))
+    assert LocalVectorIndex.load(directory).texts == TEXTS
@@ -0,0 +1,59 @@
+# test_precompute.py - Resumable batch generation of the explorer catalogue
+
+import pytest
+
+from precompute import PrecomputedAnswers, run
+from standins import build_standin_engine
+
+PROMPTS = [("part:Part III", "Explain Part III of the Indian Constitution."),
+           ("right:Right to Equality", "Explain the Right to Equality in the Indian Constitution.")]
+
+@pytest.fixture
+def store(tmp_path):
+    return PrecomputedAnswers(str(tmp_path / "precomputed.sqlite3"))
+
+def quiet(message):
+    pass
+
+def test_a_run_without_pruning_keeps_other_versions(store):
+    store.put("part:Part IV", "explorer", "Explain Part IV.", "llama", "real-index", "Directive principles.")
+    run(build_standin_engine(), store, prompts=PROMPTS, prune=False, log=quiet)
+    assert store.done_keys("real-index") == {"part:Part IV"}
+    assert store.done_keys("standin") == {key for key, _ in PROMPTS}
+
+def test_a_rerun_only_generates_missing_answers(store):
+    engine = build_standin_engine()
+    first = run(engine, store, prompts=PROMPTS[:1], log=quiet)
+    assert first["generated"] == 1 and engine.llm.calls == 1
+    second = run(engine, store, prompts=PROMPTS, log=quiet)
+    assert second["generated"] == 1 and engine.llm.calls == 2
+    assert store.done_keys("standin") == {key for key, _ in PROMPTS}
+
+def test_stored_answers_are_found_by_the_engine(store):
+    key, prompt = PROMPTS[0]
+    engine = build_standin_engine(precomputed=store)
+    run(engine, store, prompts=PROMPTS, log=quiet)
+    calls = engine.llm.calls
+    assert engine.invoke("explorer", prompt)["result"] == store.get("explorer", prompt, engine.model_name, "standin")["answer"]
+    assert engine.llm.calls == calls
+
+def test_a_new_index_version_regenerates_and_prunes_the_old_one(store):
+    store.put("part:Part III", "explorer", PROMPTS[0][1], "standin", "old-index", "stale answer")
+    summary = run(build_standin_engine(), store, prompts=PROMPTS, log=quiet)
+    assert summary["generated"] == 2
+    assert store.done_keys("old-index") == set()
+    assert store.prune("standin") == 0
+
+def test_failed_prompts_are_reported_and_retried_on_the_next_run(store):
+    engine = build_standin_engine()
+    broken = engine.answer
+
+    def answer(profile, prompt, **kwargs):
+        if "Equality" in prompt:
+            raise RuntimeError("provider error")
+        return broken(profile, prompt, **kwargs)
+
+    engine.answer = answer
+    assert run(engine, store, prompts=PROMPTS, log=quiet)["failed"] == ["right:Right to Equality"]
+    engine.answer = broken
+    assert run(engine, store, prompts=PROMPTS, log=quiet)["generated"] == 1
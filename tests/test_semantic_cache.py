@@ -0,0 +1,52 @@
+# test_semantic_cache.py - Paraphrase lookups: similarity threshold and reference guard
+
+import numpy as np
+import pytest
+
+from semantic_cache import SemanticCache, references
+
+def unit(*values):
+    vector = np.zeros(8, dtype=np.float32)
+    vector[:len(values)] = values
+    return vector
+
+@pytest.fixture
+def cache():
+    cache = SemanticCache(capacity=4, threshold=0.9)
+    cache.add("chat", "What does Article 21 say?", unit(1.0), "Protection of life.", latency=2.0)
+    return cache
+
+def test_a_close_paraphrase_is_a_hit(cache):
+    hit = cache.lookup("chat", "What is stated in Article 21?", unit(1.0, 0.2))
+    assert hit["answer"] == "Protection of life."
+    assert hit["similarity"] == pytest.approx(1 / np.sqrt(1.04), rel=1e-5)
+    assert cache.stats()["chat"]["saved_seconds"] == 2.0
+
+def test_similarity_below_the_threshold_is_a_miss(cache):
+    # cos = 1 / sqrt(1.36) ~ 0.857
+    assert cache.lookup("chat", "What is stated in Article 21?", unit(1.0, 0.6)) is None
+    assert cache.stats()["chat"] == {"hits": 0, "misses": 1, "saved_seconds": 0.0, "entries": 1, "hit_rate": 0.0}
+
+def test_a_different_article_is_never_a_hit(cache):
+    assert cache.lookup("chat", "What does Article 22 say?", unit(1.0)) is None
+    assert cache.lookup("chat", "What does Article 21A say?", unit(1.0)) is None
+
+def test_a_different_part_is_never_a_hit():
+    cache = SemanticCache(threshold=0.9)
+    cache.add("explorer", "Explain Part IV of the Constitution", unit(1.0), "Directive principles.")
+    assert cache.lookup("explorer", "Explain Part IVA of the Constitution", unit(1.0)) is None
+    assert cache.lookup("explorer", "Explain part iv of the constitution", unit(1.0)) is not None
+
+def test_profiles_do_not_share_answers(cache):
+    assert cache.lookup("explorer", "What does Article 21 say?", unit(1.0)) is None
+
+def test_least_recently_used_slot_is_reused(cache):
+    for i in range(2, 5):
+        cache.add("chat", f"What does Article {i} say?", unit(0.0, *([0.0] * (i - 2)), 1.0), f"answer {i}")
+    cache.lookup("chat", "What does Article 21 say?", unit(1.0))
+    cache.add("chat", "What does Article 5 say?", unit(0.0, 0.0, 0.0, 0.0, 1.0), "answer 5")
+    assert cache.lookup("chat", "What does Article 21 say?", unit(1.0)) is not None
+    assert cache.lookup("chat", "What does Article 2 say?", unit(0.0, 1.0)) is None
+
+def test_references():
+    assert references("Compare Article 14 and article 21A of Part III") == {"14", "21a", "part iii"}
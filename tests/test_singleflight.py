@@ -0,0 +1,129 @@
+# test_singleflight.py - Leader/follower combinations of coalesced questions
+
+import threading
+import time
+
+import pytest
+
+from llm_scheduler import BROWSE, INTERACTIVE, LLMScheduler
+from singleflight import Abandoned, SingleFlight
+from standins import build_standin_engine
+
+QUESTION = "What does Article 21 of the Indian Constitution say?"
+
+@pytest.fixture
+def engine():
+    # No caches, so a second caller can only get the answer by following the flight
+    return build_standin_engine(latency=0.3, tokens_per_second=100)
+
+def start(target, *args, **kwargs):
+    """Run target on a thread; returns a dict that receives its result"""
+    box = {}
+
+    def run():
+        try:
+            box["result"] = target(*args, **kwargs)
+        except Exception as e:
+            box["error"] = e
+
+    box["thread"] = threading.Thread(target=run, daemon=True)
+    box["thread"].start()
+    return box
+
+def wait_for_flight(engine, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while engine.flights.stats()["in_flight"] == 0:
+        assert time.monotonic() < deadline, "no flight started"
+        time.sleep(0.005)
+
+def finish(box):
+    box["thread"].join(10)
+    if "error" in box:
+        raise box["error"]
+    return box["result"]
+
+def test_invoke_leader_stream_follower(engine):
+    leader = start(engine.invoke, "chat", QUESTION)
+    wait_for_flight(engine)
+    streamed = "".join(engine.stream("chat", QUESTION))
+    assert streamed == finish(leader)["result"]
+    assert streamed.startswith("Stand-in answer")
+    assert engine.llm.calls == 1
+
+def test_stream_leader_invoke_follower(engine):
+    leader = start(lambda: "".join(engine.stream("chat", QUESTION)))
+    wait_for_flight(engine)
+    followed = engine.invoke("chat", QUESTION)
+    assert followed["result"] == finish(leader)
+    assert engine.llm.calls == 1
+
+def test_stream_leader_stream_follower(engine):
+    leader = start(lambda: "".join(engine.stream("chat", QUESTION)))
+    wait_for_flight(engine)
+    assert "".join(engine.stream("chat", QUESTION)) == finish(leader)
+    assert engine.llm.calls == 1
+
+def test_invoke_leader_invoke_follower(engine):
+    leader = start(engine.invoke, "chat", QUESTION)
+    wait_for_flight(engine)
+    assert engine.invoke("chat", QUESTION)["result"] == finish(leader)["result"]
+    assert engine.llm.calls == 1
+
+def test_prefetch_leader_stream_follower(engine):
+    cancel = threading.Event()
+    leader = start(engine.prefetch, "explorer", QUESTION, cancel=cancel)
+    wait_for_flight(engine)
+    parts = engine.stream("explorer", QUESTION)
+    first = next(parts)
+    # The selection moved on, but a session is following: the prefetch must finish
+    cancel.set()
+    streamed = first + "".join(parts)
+    assert finish(leader) == "generated"
+    assert streamed.startswith("Stand-in answer")
+    assert engine.llm.calls == 1
+
+def test_prefetch_leader_invoke_follower(engine):
+    leader = start(engine.prefetch, "explorer", QUESTION, cancel=threading.Event())
+    wait_for_flight(engine)
+    assert engine.invoke("explorer", QUESTION)["result"].startswith("Stand-in answer")
+    assert finish(leader) == "generated"
+    assert engine.llm.calls == 1
+
+def test_unfollowed_prefetch_is_abandoned(engine):
+    cancel = threading.Event()
+    leader = start(engine.prefetch, "explorer", QUESTION, cancel=cancel)
+    wait_for_flight(engine)
+    cancel.set()
+    assert finish(leader) == "abandoned"
+    assert engine.flights.stats()["in_flight"] == 0
+
+def test_stream_follower_sees_leader_error():
+    flights = SingleFlight()
+    flight, leader = flights.join("key")
+    follower, is_leader = flights.join("key")
+    assert leader and not is_leader and follower is flight
+    flight.append("partial ")
+    flight.fail(Abandoned())
+    with pytest.raises(Abandoned):
+        list(follower.follow())
+
+def test_following_a_prefetch_raises_its_priority():
+    # One request per 0.5 s, and the first one is used up
+    scheduler = LLMScheduler(1, 10 ** 6, period=0.5, headroom=1.0, reserve=0.0)
+    scheduler.acquire(1, INTERACTIVE)
+    engine = build_standin_engine(scheduler=scheduler)
+    prefetch = start(engine.prefetch, "explorer", QUESTION, cancel=threading.Event())
+    wait_for_flight(engine)
+    while not scheduler.stats()["queued"]:
+        time.sleep(0.005)
+    # Another session's explorer question queues ahead of the background prefetch
+    other = start(engine.invoke, "explorer", "What does Article 14 say?", priority=BROWSE)
+    while scheduler.stats()["queued"] < 2:
+        time.sleep(0.005)
+    streamed = "".join(engine.stream("explorer", QUESTION, priority=INTERACTIVE))
+    # The click is answered first; the other question waits for the next slot
+    assert streamed.startswith("Stand-in answer")
+    assert other["thread"].is_alive()
+    assert finish(prefetch) == "generated"
+    finish(other)
+    assert scheduler.stats()["admitted"].get(INTERACTIVE) == 2
@@ -0,0 +1,39 @@
+# test_tracing.py - Collector stats in the Prometheus export
+
+import pytest
+
+import tracing
+
+@pytest.fixture
+def collect(monkeypatch):
+    monkeypatch.setattr(tracing.tracer, "collectors", {})
+
+    def register(prefix, stats, labels=None):
+        tracing.register_collector(prefix, lambda: stats, labels)
+        return tracing.tracer.prometheus().splitlines()
+    return register
+
+def test_flat_numbers_become_gauges(collect):
+    lines = collect("prefetch", {"running": 1, "hit_rate": 0.5, "enabled": True, "name": "x"})
+    assert "legal_ease_prefetch_running 1" in lines
+    assert "legal_ease_prefetch_hit_rate 0.5" in lines
+    assert not any("enabled" in line or "name" in line for line in lines)
+
+def test_nested_dicts_become_labelled_gauges(collect):
+    lines = collect("semantic_cache", {"chat": {"hits": 3, "hit_rate": 0.75}, "explorer": {"hits": 1, "hit_rate": 0.5}},
+                    {"": "profile"})
+    assert 'legal_ease_semantic_cache_hits{profile="chat"} 3' in lines
+    assert 'legal_ease_semantic_cache_hits{profile="explorer"} 1' in lines
+    assert lines.count("# TYPE legal_ease_semantic_cache_hits gauge") == 1
+
+def test_unlabelled_nesting_extends_the_metric_name(collect):
+    lines = collect("embeddings", {"hits": 2, "batching": {"batches": 4, "batch_sizes": {1: 2, 3: 2}}},
+                    {"batching.batch_sizes": "size"})
+    assert "legal_ease_embeddings_batching_batches 4" in lines
+    assert 'legal_ease_embeddings_batching_batch_sizes{size="3"} 2' in lines
+
+def test_scheduler_counters_by_label(collect):
+    lines = collect("scheduler", {"queued": 0, "admitted": {0: 5}, "shed": {"timeout": 2}},
+                    {"admitted": "priority", "shed": "reason"})
+    assert 'legal_ease_scheduler_admitted{priority="0"} 5' in lines
+    assert 'legal_ease_scheduler_shed{reason="timeout"} 2' in lines
@@ -0,0 +1,29 @@
+# test_transcriber.py - Silence trimming before transcription
+
+import numpy as np
+
+from transcriber import SAMPLE_RATE, trim_silence
+
+def tone(seconds, amplitude=0.3, hz=220):
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * hz * t)).astype(np.float32)
+
+def test_leading_and_trailing_silence_is_trimmed():
+    silence = np.zeros(SAMPLE_RATE, dtype=np.float32)
+    trimmed = trim_silence(np.concatenate([silence, tone(1.0), silence]))
+    assert SAMPLE_RATE * 1.0 <= len(trimmed) <= SAMPLE_RATE * 1.5
+
+def test_continuous_tone_is_kept():
+    assert len(trim_silence(tone(2.0))) >= SAMPLE_RATE * 1.9
+
+def test_speech_without_pauses_is_kept():
+    # Syllable-like loudness changes, but no quiet frames anywhere in the clip
+    t = np.arange(SAMPLE_RATE * 2) / SAMPLE_RATE
+    envelope = 0.8 + 0.2 * np.sin(2 * np.pi * 4 * t)
+    clip = (tone(2.0) * envelope).astype(np.float32)
+    assert len(trim_silence(clip)) >= SAMPLE_RATE * 1.9
+
+def test_silence_is_empty():
+    assert len(trim_silence(np.zeros(SAMPLE_RATE, dtype=np.float32))) == 0
+    quiet = np.random.default_rng(0).normal(0, 0.002, SAMPLE_RATE).astype(np.float32)
+    assert len(trim_silence(quiet)) == 0
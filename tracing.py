@@ -0,0 +1,294 @@
+# tracing.py - Per-stage latency tracing for every question, without external services
+#
+# A trace covers one question from the page that asked it to the last rendered
+# token. Stages (cache lookup, embedding, retrieval, prompt filling, scheduler
+# queue, generation, rendering) are recorded as spans on the current trace and
+# aggregated per stage. Finished traces are appended as JSON lines to a rotating
+# log; aggregates are served in Prometheus text format by a small HTTP thread
+# (http://127.0.0.1:9464/metrics by default) and shown on the admin page.
+
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import config
+
+_current = contextvars.ContextVar("legal_ease_trace", default=None)
+_scope = contextvars.ContextVar("legal_ease_trace_scope", default=None)
+
+class Trace:
+    """One question: who asked it, where from, and the spans of every stage"""
+
+    def __init__(self, page, **attrs):
+        self.id = uuid.uuid4().hex[:16]
+        self.page = page
+        self.attrs = attrs
+        self.spans = []
+        self.timestamp = time.time()
+        self.started = time.perf_counter()
+        self.seconds = None
+
+    def to_dict(self):
+        return {
+            "trace_id": self.id,
+            "page": self.page,
+            "timestamp": self.timestamp,
+            "seconds": self.seconds,
+            **self.attrs,
+            "spans": self.spans,
+        }
+
+class Tracer:
+    """Process-wide per-stage samples, counters, recent traces and the rotating trace log"""
+
+    def __init__(self, log_path=config.TRACE_LOG_PATH, samples=config.TRACE_SAMPLES):
+        self.log_path = log_path
+        self.samples = samples
+        self.stages = {}
+        self.totals = {}
+        self.counters = {}
+        self.collectors = {}
+        self.recent = deque(maxlen=200)
+        self._logger = None
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            samples = self.stages.get(stage)
+            if samples is None:
+                samples = self.stages[stage] = deque(maxlen=self.samples)
+                self.totals[stage] = [0, 0.0]
+            samples.append(seconds)
+            self.totals[stage][0] += 1
+            self.totals[stage][1] += seconds
+
+    def increment(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def finish(self, trace):
+        self.observe("total", trace.seconds)
+        self.recent.append(trace)
+        try:
+            self.logger().info(json.dumps(trace.to_dict(), default=str))
+        except OSError:
+            pass
+
+    def logger(self):
+        if self._logger is None:
+            with self._lock:
+                if self._logger is None:
+                    os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+                    handler = logging.handlers.RotatingFileHandler(
+                        self.log_path, maxBytes=config.TRACE_LOG_MAX_BYTES,
+                        backupCount=config.TRACE_LOG_BACKUPS, encoding="utf-8")
+                    handler.setFormatter(logging.Formatter("%(message)s"))
+                    logger = logging.getLogger("legal_ease.traces")
+                    logger.setLevel(logging.INFO)
+                    logger.propagate = False
+                    logger.addHandler(handler)
+                    self._logger = logger
+        return self._logger
+
+    def summary(self):
+        """Return count, p50, p95 and p99 seconds for every stage"""
+        with self._lock:
+            stages = {stage: sorted(samples) for stage, samples in self.stages.items()}
+            totals = {stage: list(total) for stage, total in self.totals.items()}
+        summary = {}
+        for stage, ordered in stages.items():
+            if ordered:
+                summary[stage] = {
+                    "count": totals[stage][0],
+                    "p50": _quantile(ordered, 0.50),
+                    "p95": _quantile(ordered, 0.95),
+                    "p99": _quantile(ordered, 0.99),
+                }
+        return summary
+
+    def prometheus(self):
+        """Render stage latencies, counters and registered gauges in Prometheus text format"""
+        lines = [
+            "# HELP legal_ease_stage_seconds Latency of each stage of answering a question",
+            "# TYPE legal_ease_stage_seconds summary",
+        ]
+        with self._lock:
+            stages = {stage: sorted(samples) for stage, samples in self.stages.items()}
+            totals = {stage: list(total) for stage, total in self.totals.items()}
+            counters = dict(self.counters)
+            collectors = dict(self.collectors)
+        for stage, ordered in sorted(stages.items()):
+            for q in (0.5, 0.95, 0.99):
+                lines.append(f'legal_ease_stage_seconds{{stage="{stage}",quantile="{q}"}} {_quantile(ordered, q):.6f}')
+            lines.append(f'legal_ease_stage_seconds_sum{{stage="{stage}"}} {totals[stage][1]:.6f}')
+            lines.append(f'legal_ease_stage_seconds_count{{stage="{stage}"}} {totals[stage][0]}')
+
+        names = sorted({name for name, _ in counters})
+        for name in names:
+            lines.append(f"# TYPE legal_ease_{name} counter")
+            for (counter, labels), value in sorted(counters.items()):
+                if counter == name:
+                    lines.append(f"legal_ease_{name}{_labels(labels)} {value}")
+
+        for prefix, (collect, label_names) in sorted(collectors.items()):
+            try:
+                values = collect()
+            except Exception:
+                continue
+            gauges = {}
+            for name, labels, value in _gauges(values, label_names, (prefix,)):
+                gauges.setdefault("_".join(_METRIC_CHARS.sub("_", part) for part in name), []).append((labels, value))
+            for name, samples in sorted(gauges.items()):
+                lines.append(f"# TYPE legal_ease_{name} gauge")
+                lines.extend(f"legal_ease_{name}{_labels(labels)} {value}" for labels, value in samples)
+        return "\n".join(lines) + "\n"
+
+def _quantile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] if ordered else 0.0
+
+_METRIC_CHARS = re.compile(r"[^a-zA-Z0-9_]")
+
+def _gauges(values, label_names, name, path="", labels=()):
+    """Yield (name parts, labels, number) for each number in a collector's nested stats"""
+    # The keys of a dict whose path is in `label_names` become values of that
+    # label; the keys of any other nested dict are appended to the metric name
+    label = label_names.get(path)
+    for key, value in values.items():
+        if label:
+            child_name, child_path, child_labels = name, f"{path}.*".lstrip("."), labels + ((label, key),)
+        else:
+            child_name, child_path, child_labels = name + (str(key),), f"{path}.{key}".lstrip("."), labels
+        if isinstance(value, dict):
+            yield from _gauges(value, label_names, child_name, child_path, child_labels)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            yield child_name, child_labels, value
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+tracer = Tracer()
+
+# ------------------ Recording ------------------
+@contextmanager
+def trace(page, **attrs):
+    """Start a trace for one question asked from `page` (chat, explorer, ...)"""
+    scope = _scope.get()
+    current = Trace(page, **(dict(scope, **attrs) if scope else attrs))
+    token = _current.set(current)
+    try:
+        yield current
+    finally:
+        current.seconds = time.perf_counter() - current.started
+        try:
+            _current.reset(token)
+        except ValueError:
+            # A streaming generator closed from another context
+            pass
+        tracer.finish(current)
+
+@contextmanager
+def trace_attrs(**attrs):
+    """Record `attrs` on every trace started inside the block (e.g. one page run)"""
+    token = _scope.set(dict(_scope.get() or {}, **attrs))
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+
+def current_trace():
+    """Return the trace of the question being answered, or None"""
+    return _current.get()
+
+@contextmanager
+def span(stage, **attrs):
+    """Time one stage; attributes can be added to the yielded dict while it runs"""
+    record = dict(attrs)
+    started = time.perf_counter()
+    try:
+        yield record
+    finally:
+        observe(stage, time.perf_counter() - started, started=started, **record)
+
+def observe(stage, seconds, started=None, **attrs):
+    """Record a stage duration measured elsewhere"""
+    tracer.observe(stage, seconds)
+    current = _current.get()
+    if current is not None:
+        offset = (started if started is not None else time.perf_counter() - seconds) - current.started
+        current.spans.append({"stage": stage, "start": round(offset, 6), "seconds": round(seconds, 6), **attrs})
+
+def annotate(**attrs):
+    """Attach attributes (cache result, k, prompt tokens...) to the current trace"""
+    current = _current.get()
+    if current is not None:
+        current.attrs.update(attrs)
+
+def increment(name, amount=1, **labels):
+    """Bump a Prometheus counter"""
+    tracer.increment(name, amount, **labels)
+
+def register_collector(prefix, collect, labels=None):
+    """Export the numbers in collect() as legal_ease_<prefix>_<key> gauges, nested ones included"""
+    # `labels` maps the path of a nested dict to the label its keys become:
+    # {"": "profile"} turns {"chat": {"hits": 3}} into <prefix>_hits{profile="chat"},
+    # {"shed": "reason"} turns {"shed": {"timeout": 2}} into <prefix>_shed{reason="timeout"}
+    tracer.collectors[prefix] = (collect, labels or {})
+
+def timed_stream(parts, stage="render"):
+    """Pass a token stream through, timing how long the consumer spends rendering each part"""
+    rendering = 0.0
+    started = time.perf_counter()
+    for part in parts:
+        resumed = time.perf_counter()
+        yield part
+        rendering += time.perf_counter() - resumed
+    observe(stage, rendering, started=started)
+
+# ------------------ Metrics Endpoint ------------------
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = tracer.prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+_server = None
+_server_lock = threading.Lock()
+
+def start_metrics_server(port=config.METRICS_PORT, host=config.METRICS_HOST):
+    """Serve /metrics on a daemon thread (idempotent; port 0 disables it)"""
+    global _server
+    if not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            except OSError as e:
+                # Another server process already owns the port
+                logging.getLogger(__name__).warning("Metrics endpoint not started: %s", e)
+                _server = False
+                return None
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+    return _server or None
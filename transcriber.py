@@ -0,0 +1,208 @@
+# transcriber.py - Local speech-to-text for voice questions, on a bounded worker pool
+#
+# Usage:
+#   python transcriber.py download        # fetch the Whisper model once; runtime stays offline
+#
+# The browser records the question (st.audio_input) and uploads a WAV clip.
+# Leading and trailing silence is trimmed with a simple energy-based voice
+# activity check, then a faster-whisper model runs on CPU (int8) on one of
+# TRANSCRIBE_WORKERS background threads. At most TRANSCRIBE_QUEUE_SIZE clips
+# wait; beyond that a clip is refused at once rather than queued behind minutes
+# of audio. Queue wait and transcription time are recorded by the tracing layer.
+
+import argparse
+import io
+import queue
+import threading
+import time
+import wave
+from collections import deque
+from concurrent.futures import Future
+
+import numpy as np
+
+import config
+import tracing
+
+SAMPLE_RATE = 16000
+
+class TranscriberBusy(Exception):
+    """Every worker is busy and the queue is full"""
+
+class NoSpeech(Exception):
+    """The clip contains no voice activity"""
+
+# ------------------ Audio ------------------
+def decode_wav(data):
+    """Return mono float32 samples at 16 kHz from WAV bytes"""
+    try:
+        with wave.open(io.BytesIO(data)) as clip:
+            channels, width, rate = clip.getnchannels(), clip.getsampwidth(), clip.getframerate()
+            frames = clip.readframes(clip.getnframes())
+    except (wave.Error, EOFError) as e:
+        raise ValueError(f"Unsupported audio clip: {e}") from e
+    if width == 1:
+        samples = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 2:
+        samples = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768
+    elif width == 4:
+        samples = np.frombuffer(frames, dtype="<i4").astype(np.float32) / 2147483648
+    else:
+        raise ValueError(f"Unsupported sample width: {width * 8} bits")
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    if rate != SAMPLE_RATE and len(samples):
+        # Linear resampling is plenty for speech recognition
+        positions = np.arange(0, len(samples), rate / SAMPLE_RATE)
+        samples = np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+    return samples
+
+def trim_silence(samples, rate=SAMPLE_RATE, frame_ms=30, min_rms=config.VAD_MIN_RMS, pad_ms=200):
+    """Cut leading and trailing frames quieter than the clip's noise floor (energy VAD)"""
+    frame = int(rate * frame_ms / 1000)
+    count = len(samples) // frame
+    if count == 0:
+        return samples[:0]
+    energy = np.sqrt(np.mean(samples[:count * frame].reshape(count, frame) ** 2, axis=1))
+    # Voice is well above the quietest tenth of the clip, and above an absolute floor.
+    # A clip with no pause at all has no quiet tenth, so the relative part is capped
+    # at half the loudest frame: continuous speech is kept rather than trimmed away.
+    threshold = max(min_rms, min(3 * float(np.percentile(energy, 10)), 0.5 * float(energy.max())))
+    voiced = np.flatnonzero(energy > threshold)
+    if not voiced.size:
+        return samples[:0]
+    pad = pad_ms // frame_ms
+    start = max(voiced[0] - pad, 0) * frame
+    stop = min(voiced[-1] + pad + 1, count) * frame
+    return samples[start:stop]
+
+# ------------------ Worker Pool ------------------
+class Transcriber:
+    """Runs a local Whisper model on a fixed number of worker threads fed by a bounded queue"""
+
+    def __init__(self, model=config.TRANSCRIBE_MODEL, workers=2, max_queue=8,
+                 model_dir=config.TRANSCRIBE_MODEL_DIR, local_only=True):
+        self.model_name = model
+        self.model_dir = model_dir
+        self.local_only = local_only
+        self.workers = workers
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._model = None
+        self._lock = threading.Lock()
+        self._threads = []
+        self.transcribed = 0
+        self.rejected = 0
+        self.no_speech = 0
+        self.failed = 0
+        self.latencies = deque(maxlen=1000)
+        self.waits = deque(maxlen=1000)
+
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from faster_whisper import WhisperModel
+
+                    # One model serves every worker; num_workers lets them run in parallel
+                    self._model = WhisperModel(self.model_name, device="cpu", compute_type="int8",
+                                               cpu_threads=config.TRANSCRIBE_CPU_THREADS,
+                                               num_workers=self.workers, download_root=self.model_dir,
+                                               local_files_only=self.local_only)
+        return self._model
+
+    def submit(self, data):
+        """Queue a WAV clip; returns a Future of its transcript"""
+        if not self._threads:
+            with self._lock:
+                if not self._threads:
+                    for i in range(self.workers):
+                        thread = threading.Thread(target=self._run, name=f"transcriber-{i}", daemon=True)
+                        thread.start()
+                        self._threads.append(thread)
+        future = Future()
+        try:
+            self._queue.put_nowait((data, future, time.perf_counter()))
+        except queue.Full:
+            self.rejected += 1
+            raise TranscriberBusy("Voice input is busy right now. Please try again in a moment or type your question.")
+        return future
+
+    def transcribe(self, data, timeout=None):
+        """Transcript of a WAV clip; raises NoSpeech, TranscriberBusy or TimeoutError"""
+        return self.submit(data).result(timeout=timeout)
+
+    def _run(self):
+        while True:
+            data, future, queued = self._queue.get()
+            started = time.perf_counter()
+            self.waits.append(started - queued)
+            tracing.observe("transcription_queue", started - queued, started=queued)
+            try:
+                future.set_result(self._transcribe(data))
+            except NoSpeech as e:
+                self.no_speech += 1
+                future.set_exception(e)
+            except Exception as e:
+                self.failed += 1
+                future.set_exception(e)
+            else:
+                self.transcribed += 1
+                seconds = time.perf_counter() - started
+                self.latencies.append(seconds)
+                tracing.observe("transcription", seconds, started=started)
+
+    def _transcribe(self, data):
+        samples = trim_silence(decode_wav(data))
+        if len(samples) < SAMPLE_RATE * 0.2:
+            raise NoSpeech("No speech was detected in the recording.")
+        segments, _ = self.model().transcribe(samples, language=config.TRANSCRIBE_LANGUAGE, beam_size=1,
+                                              vad_filter=False, condition_on_previous_text=False)
+        text = " ".join(segment.text.strip() for segment in segments).strip()
+        if not text:
+            raise NoSpeech("No speech was recognised in the recording.")
+        return text
+
+    def stats(self):
+        """Queue depth, outcomes and p50/p95 of queue wait and transcription time"""
+        latencies, waits = sorted(self.latencies), sorted(self.waits)
+        return {
+            "workers": self.workers,
+            "queue_depth": self._queue.qsize(),
+            "max_queue": self._queue.maxsize,
+            "transcribed": self.transcribed,
+            "rejected": self.rejected,
+            "no_speech": self.no_speech,
+            "failed": self.failed,
+            "latency_p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else 0.0,
+            "latency_p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000 if latencies else 0.0,
+            "wait_p50_ms": waits[len(waits) // 2] * 1000 if waits else 0.0,
+            "wait_p95_ms": waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000 if waits else 0.0,
+        }
+
+# ------------------ Process-wide Instance ------------------
+_shared = None
+_shared_lock = threading.Lock()
+
+def get_transcriber():
+    """Return the process-wide transcriber shared by every session"""
+    global _shared
+    if _shared is None:
+        with _shared_lock:
+            if _shared is None:
+                _shared = Transcriber(workers=config.TRANSCRIBE_WORKERS, max_queue=config.TRANSCRIBE_QUEUE_SIZE)
+                tracing.register_collector("transcriber", _shared.stats)
+    return _shared
+
+def main():
+    parser = argparse.ArgumentParser(description="Local speech-to-text model for voice questions")
+    parser.add_argument("command", choices=["download"])
+    parser.add_argument("--model", default=config.TRANSCRIBE_MODEL)
+    parser.add_argument("--model-dir", default=config.TRANSCRIBE_MODEL_DIR)
+    args = parser.parse_args()
+
+    # Loading with downloads allowed fetches the model into --model-dir
+    Transcriber(args.model, workers=1, model_dir=args.model_dir, local_only=False).model()
+    print(f"Whisper model {args.model} is ready in {args.model_dir}")
+
+if __name__ == "__main__":
+    main()